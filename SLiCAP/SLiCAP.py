@@ -14,25 +14,16 @@ import SLiCAP.SLiCAPconfigure as ini
 from datetime import datetime
 from shutil import copy2
 from SLiCAP.SLiCAPyacc import _initializeParser
-from scipy.optimize import newton, fsolve
-from scipy.integrate import quad
 from SLiCAP.SLiCAPdesignData import *
 from SLiCAP.SLiCAPinstruction import instruction
 from SLiCAP.SLiCAPmath import *
 from SLiCAP.SLiCAPtraces import *
-from SLiCAP.SLiCAPplots import *
 from SLiCAP.SLiCAPrst import RSTformatter
 from SLiCAP.SLiCAPlatex import LaTeXformatter, sub2rm, exprLatex, symbolLatex
 from SLiCAP.SLiCAPtxt import TXTformatter
-from SLiCAP.SLiCAPngspice import (MOS, ngspice2traces, selectTraces,
-                                   make_netlist,
-                                   op, ac, dc, tran, noise, ngspice_control,
-                                   NGspiceRaw2dict, RawFile, Analysis,
-                                   instr2dataset)
 from SLiCAP.SLiCAPshell import *
 from SLiCAP.SLiCAPhtml import *
 from SLiCAP.SLiCAPhtml import _startHTML
-from SLiCAP.SLiCAPkicad import backAnnotateSchematic
 from SLiCAP.SLiCAPstateSpace import doStateSpace
 
 # Increase width for display of numpy arrays:
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SLiCAP module with helpers for the cache directories in the project results
+directory: the disk tier of the determinant cache (SLiCAPmath) and the
+NGspice result cache (SLiCAPngspice).
+"""
+import os
+import pickle
+import tempfile
+from shutil import rmtree
+
+def _pickleAtomic(fileName, obj):
+    """
+    Pickles 'obj' to 'fileName' through a unique temporary file in the same
+    directory, which is then renamed. Concurrent writers of the same file
+    (step workers, scripts in the same project) never see or leave a
+    partial file. Errors are ignored: a cache is an optimization only.
+
+    :param fileName: Name of the cache file
+    :type fileName: str
+
+    :param obj: Object to be stored
+    :type obj: any picklable object
+
+    :return: Size of the file in bytes, or None if it could not be written
+    :rtype: int, NoneType
+    """
+    tmp = None
+    try:
+        os.makedirs(os.path.dirname(fileName), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(fileName),
+                                   suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(obj, f)
+        os.replace(tmp, fileName)
+        return os.path.getsize(fileName)
+    except Exception:
+        if tmp is not None:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+    return None
+
+def _evictLRU(cacheDir, maxBytes):
+    """
+    Removes the least recently used entries (files or directories, by their
+    modification time) of the cache directory 'cacheDir' until it holds at
+    most 'maxBytes'. Entries with the suffix '.tmp' are being written and
+    are skipped.
+
+    :param cacheDir: Cache directory
+    :type cacheDir: str, pathlib.Path
+
+    :param maxBytes: Maximum size of the cache in bytes
+    :type maxBytes: int, float
+
+    :return: Remaining size of the cache in bytes
+    :rtype: int
+    """
+    entries = []
+    try:
+        names = os.listdir(cacheDir)
+    except OSError:
+        return 0
+    for name in names:
+        if name.endswith('.tmp'):
+            continue
+        path = os.path.join(cacheDir, name)
+        try:
+            if os.path.isdir(path):
+                size = sum(entry.stat().st_size for entry in os.scandir(path))
+            else:
+                size = os.path.getsize(path)
+            entries.append((os.path.getmtime(path), size, path))
+        except OSError:
+            pass # removed by another process
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries, key=lambda e: e[0]):
+        if total <= maxBytes:
+            break
+        try:
+            if os.path.isdir(path):
+                rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+        except OSError:
+            pass
+        total -= size
+    return total
@@ -13,8 +13,8 @@ import os
 import platform
 import re
 import inspect
-import requests
 import shutil
+import ctypes.util
 from os.path import expanduser
 from datetime import datetime
 from sympy import Symbol
@@ -55,6 +55,7 @@ def _get_latest_version(timeout=3):
     String Version.
     """
     try:
+        import requests
         response = requests.get(
             "https://api.github.com/repos/SLiCAP/SLiCAP_python/releases/latest",
             timeout=timeout)
@@ -137,6 +138,17 @@ def _generate_project_config():
                                     "factor"                : True,
                                     "maxrecsubst"           : 15,
                                     "reducematrix"          : True,
+                                    "detservers"            : 1,
+                                    "dettimeout"            : 0,
+                                    "eigpz"                 : False,
+                                    "numerictime"           : False,
+                                    "stepworkers"           : 1,
+                                    "detcache"              : 256,
+                                    "detdiskcache"          : False,
+                                    "detdiskcachesize"      : 256,
+                                    "ngspiceworkers"        : 1,
+                                    "ngspicecache"          : 256,
+                                    "ngspiceshared"         : False,
                                     }
     project_config['balancing']    = {"update_srcnames"       : True,
                                     "pair_ext"              : "P,N",
@@ -216,6 +228,8 @@ def _generate_main_config():
     # Optional fast determinant engine (see SLiCAP_GiNAC.md); empty = not
     # installed, det(method='MECPP') then falls back to the Python 'ME'.
     commands.setdefault('slicap_det', shutil.which('slicap_det') or '')
+    # Optional shared NGspice library, used if ini.ngspice_shared == True
+    commands.setdefault('libngspice', ctypes.util.find_library('ngspice') or '')
     main_config = configparser.ConfigParser()
     # The latest release is fetched on demand only (check_for_updates());
     # generating the configuration must work offline.
@@ -245,6 +259,7 @@ def _generate_default_config():
                                   'lepton-eda'       : '',
                                   'ngspice'          : '',
                                   'slicap_det'       : '',
+                                  'libngspice'       : '',
                                   'pdflatex'         : '',
                                   'dvisvgm'          : ''}
                       }
@@ -500,6 +515,7 @@ def dump(section="all"):
         print('ini.lepton_eda             =', lepton_eda)
         print('ini.ngspice                =', ngspice)
         print('ini.slicap_det             =', slicap_det)
+        print('ini.libngspice             =', libngspice)
     if section == 'ALL' or section == "PROJECT":
         print("\nPROJECT")
         print("-------")
@@ -560,6 +576,17 @@ def dump(section="all"):
         print('ini.factor                 =', factor)
         print('ini.max_rec_subst          =', max_rec_subst)
         print('ini.reduce_matrix          =', reduce_matrix)
+        print('ini.det_servers            =', det_servers)
+        print('ini.det_timeout            =', det_timeout)
+        print('ini.eig_pz                 =', eig_pz)
+        print('ini.numeric_time           =', numeric_time)
+        print('ini.step_workers           =', step_workers)
+        print('ini.det_cache              =', det_cache)
+        print('ini.det_disk_cache         =', det_disk_cache)
+        print('ini.det_disk_cache_size    =', det_disk_cache_size)
+        print('ini.ngspice_workers        =', ngspice_workers)
+        print('ini.ngspice_cache          =', ngspice_cache)
+        print('ini.ngspice_shared         =', ngspice_shared)
         #print('ini.reduce_circuit         =', reduce_circuit)
     if section == 'ALL' or section == "PLOT":        
         print("\nPLOT")
@@ -618,6 +645,7 @@ gnetlist              = main_config['commands']['geda']
 lepton_eda            = main_config['commands']['lepton-eda']
 ngspice               = main_config['commands']['ngspice']
 slicap_det            = main_config['commands'].get('slicap_det', '')
+libngspice            = main_config['commands'].get('libngspice', '')
 # LaTeX toolchain (absolute paths, like ngspice) — the migration in
 # _update_ini_files() adds these keys to older configs; .get keeps a transient
 # or corrupted config from raising here.
@@ -678,6 +706,29 @@ step_function         = eval(project_config['math']['stepfunction'])
 factor                = eval(project_config['math']['factor'])
 max_rec_subst         = eval(project_config['math']['maxrecsubst'])
 reduce_matrix         = eval(project_config['math']['reducematrix'])
+# slicap_det co-processes for det(method='MECPP') and their response timeout
+# in seconds (0: no timeout); .get(): older project files lack these keys
+det_servers           = eval(project_config['math'].get('detservers', '1'))
+det_timeout           = eval(project_config['math'].get('dettimeout', '0'))
+# Numeric stepped pole-zero analysis from float generalized eigenvalues
+eig_pz                = eval(project_config['math'].get('eigpz', 'False'))
+# Numeric impulse, step and time responses from state-space realizations
+numeric_time          = eval(project_config['math'].get('numerictime', 'False'))
+# Worker processes for parameter stepping with step_function = False
+step_workers          = eval(project_config['math'].get('stepworkers', '1'))
+# Determinant cache: number of determinants kept in memory, and a disk tier
+# in the results directory
+det_cache             = eval(project_config['math'].get('detcache', '256'))
+det_disk_cache        = eval(project_config['math'].get('detdiskcache', 'False'))
+# Size in MB of the disk tier of the determinant cache; 0: no limit
+det_disk_cache_size   = eval(project_config['math'].get('detdiskcachesize', '256'))
+# NGspice processes for a stepped NGspice run
+ngspice_workers       = eval(project_config['math'].get('ngspiceworkers', '1'))
+# Size in MB of the NGspice result cache in the results directory; 0: off.
+# Results are keyed by the deck, its include files and the ngspice executable
+ngspice_cache         = eval(project_config['math'].get('ngspicecache', '256'))
+# Run NGspice in-process with the shared library ini.libngspice
+ngspice_shared        = eval(project_config['math'].get('ngspiceshared', 'False'))
 
 gain_colors_gain      = project_config['gaincolors']['gain']
 gain_colors_asymptotic= project_config['gaincolors']['asymptotic']
@@ -3,15 +3,23 @@
 SLiCAP scripts for execution of an instruction.
 """
 import sympy as sp
-from copy import deepcopy
+import pickle
+from copy import copy, deepcopy
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import SLiCAP.SLiCAPconfigure as ini
 from SLiCAP.SLiCAPyacc import _updateCirData
 from SLiCAP.SLiCAPprotos import element
 from SLiCAP.SLiCAPmatrices import _makeMatrices, _makeSrcVector#, _reduceCircuit
 from SLiCAP.SLiCAPmath import float2rational, normalizeRational, det, _Roots 
+from SLiCAP.SLiCAPmath import _detList, _cofactors, _stepList
 from SLiCAP.SLiCAPmath import _cancelPZ, _zeroValue, ilt, assumeRealParams
 from SLiCAP.SLiCAPlex import _sympify
 from SLiCAP.SLiCAPmath import  clearAssumptions, fullSubs
+from SLiCAP.SLiCAPstateSpace import mna_pz, pz_dc_value, mna_coeff_function
+from SLiCAP.SLiCAPstateSpace import numeric_state, source_realization
+from SLiCAP.SLiCAPstateSpace import detector_realization, _stateResponse
+import numpy as np
 
 def _doInstruction(instr):
     """
@@ -23,7 +31,7 @@ def _doInstruction(instr):
     :return: instr of the execution of the instruction.
     :rtype: SLiCAPinstruction.instruction
     """
-    instr = deepcopy(instr) # For compatibility with SLiCAP V3
+    instr = _copyInstruction(instr) # For compatibility with SLiCAP V3
     if instr.errors == 0:
         instr = _makeInstrParDict(instr)
         instr.clear()
@@ -70,10 +78,11 @@ def _doInstruction(instr):
                     elif instr.gainType == 'loopgain' or instr.gainType == 'servo' or instr.gainType == 'direct':
                         # Store the value of the loop gain reference
                         instr.lgValue[i] = instr.circuit.elements[instr.lgRef[i]].params['value']
+                        lgRefElement = instr.circuit._ownElement(instr.lgRef[i])
                         if instr.gainType == 'direct':
-                            instr.circuit.elements[instr.lgRef[i]].params['value'] = sp.N(0)
+                            lgRefElement.params['value'] = sp.N(0)
                         else:
-                            instr.circuit.elements[instr.lgRef[i]].params['value'] = sp.Symbol("_LGREF_" + str(i+1))
+                            lgRefElement.params['value'] = sp.Symbol("_LGREF_" + str(i+1))
                     instr.circuit = _updateCirData(instr.circuit)
         if instr.errors == 0:
             if instr.dataType == 'numer':
@@ -127,6 +136,30 @@ def _doInstruction(instr):
                     instr.circuit.elements[instr.lgRef[i]].params['value'] = instr.lgValue[i]           
     return instr
 
+def _copyInstruction(instr):
+    """
+    Returns a copy of the instruction that can be executed without changing
+    the instruction or its circuit.
+
+    The circuit of the copy is a copy-on-write view of the circuit of the
+    instruction (see SLiCAPprotos.circuit._view()), and the parameter
+    definitions and loop gain values are copied. All other attributes are
+    shared: the results are reset with instr.clear() before execution.
+
+    :param instr: SLiCAP instruction object that holds instruction data.
+    :type instr: SLiCAPinstruction.instruction
+
+    :return: Copy of the instruction.
+    :rtype: SLiCAPinstruction.instruction
+    """
+    newInstr = copy(instr)
+    if instr.circuit != None:
+        newInstr.circuit = instr.circuit._view()
+    if type(instr.parDefs) == dict:
+        newInstr.parDefs = dict(instr.parDefs)
+    newInstr.lgValue = list(instr.lgValue)
+    return newInstr
+
 def _doNumer(instr):
     """
     Returns the numerator of a transfer function, or of the Laplace Transform
@@ -152,29 +185,26 @@ def _doNumer(instr):
             numer  = instr.numer[0]
             instr.numer = _stepFunctions(instr.stepDict, numer)
         else:
-            stepVars = list(instr.stepDict.keys())
-            numSteps = len(instr.stepDict[stepVars[0]])
-            for i in range(numSteps):
-                for j in range(len(stepVars)):
-                    instr.parDefs[stepVars[j]] = instr.stepDict[stepVars[j]][i]
-                if instr.gainType == 'loopgain' or instr.gainType == 'servo':
-                    instr = _makeAllMatrices(instr)
-                    instr = _doPyLoopGainServo(instr)
-                else:
-                    instr = _makeAllMatrices(instr)
-                    instr = _doPyNumer(instr)
-                instr.numer[-1] = instr.numer[-1]
+            instr = _doSteps(instr, _stepNumer)
     else:
-        if instr.gainType == 'loopgain' or instr.gainType == 'servo':
-            instr = _makeAllMatrices(instr)
-            instr = _doPyLoopGainServo(instr)
-        else:
-            instr = _makeAllMatrices(instr)
-            instr = _doPyNumer(instr)
+        instr = _stepNumer(instr)
         instr.numer = instr.numer[0]
     instr = _correctDMcurrentinstr(instr)
     return instr
 
+def _stepNumer(instr):
+    """
+    Appends the numerator for the present parameter definitions to
+    instr.numer.
+    """
+    if instr.gainType == 'loopgain' or instr.gainType == 'servo':
+        instr = _makeAllMatrices(instr)
+        instr = _doPyLoopGainServo(instr)
+    else:
+        instr = _makeAllMatrices(instr)
+        instr = _doPyNumer(instr)
+    return instr
+
 def _doDenom(instr):
     """
     Returns the denominator of a transfer function, or of the Laplace Transform
@@ -200,18 +230,7 @@ def _doDenom(instr):
             denom = instr.denom[0]
             instr.denom = _stepFunctions(instr.stepDict, denom)
         else:
-            stepVars = list(instr.stepDict.keys())
-            numSteps = len(instr.stepDict[stepVars[0]])
-            for i in range(numSteps):
-                for j in range(len(stepVars)):
-                    instr.parDefs[stepVars[j]] = instr.stepDict[stepVars[j]][i]
-                if instr.gainType == 'loopgain' or instr.dataType == 'servo':
-                    instr = _makeAllMatrices(instr)
-                    instr = _doPyLoopGainServo(instr)
-                else:
-                    instr = _makeAllMatrices(instr)
-                    instr = _doPyDenom(instr)
-                instr.denom[-1] = instr.denom[-1]
+            instr = _doSteps(instr, _stepDenom)
     else:
         if instr.gainType == 'loopgain' or instr.gainType == 'servo':
             instr = _makeAllMatrices(instr)
@@ -223,6 +242,19 @@ def _doDenom(instr):
         instr.denom = instr.denom[0]
     return instr
 
+def _stepDenom(instr):
+    """
+    Appends the denominator for the present parameter definitions to
+    instr.denom.
+    """
+    if instr.gainType == 'loopgain' or instr.dataType == 'servo':
+        instr = _makeAllMatrices(instr)
+        instr = _doPyLoopGainServo(instr)
+    else:
+        instr = _makeAllMatrices(instr)
+        instr = _doPyDenom(instr)
+    return instr
+
 def _doLaplace(instr):
     """
     Returns a transfer function, or the Laplace Transform of a detector voltage or current.
@@ -251,31 +283,29 @@ def _doLaplace(instr):
             denomFunc = instr.denom[0]
             instr.denom = _stepFunctions(instr.stepDict, denomFunc)
         else:
-            stepVars = list(instr.stepDict.keys())
-            numSteps = len(instr.stepDict[stepVars[0]])
-            for i in range(numSteps):
-                for j in range(len(stepVars)):
-                    instr.parDefs[stepVars[j]] = instr.stepDict[stepVars[j]][i]
-                if instr.gainType == 'loopgain' or instr.gainType == 'servo':
-                    instr = _makeAllMatrices(instr)
-                    instr = _doPyLoopGainServo(instr)
-                else:
-                    instr = _makeAllMatrices(instr)
-                    instr = _doPyLaplace(instr)
-                instr.laplace[-1] = instr.laplace[-1]
+            instr = _doSteps(instr, _stepLaplace)
     else:
-        if instr.gainType == 'loopgain' or instr.gainType == 'servo':
-            instr = _makeAllMatrices(instr)
-            instr = _doPyLoopGainServo(instr)
-        else:
-            instr = _makeAllMatrices(instr)
-            instr = _doPyLaplace(instr)
+        instr = _stepLaplace(instr)
         instr.laplace = instr.laplace[0]
         instr.numer = instr.numer[0]
         instr.denom = instr.denom[0]
     instr = _correctDMcurrentinstr(instr)
     return instr
 
+def _stepLaplace(instr):
+    """
+    Appends the transfer function, its numerator and its denominator for the
+    present parameter definitions to instr.laplace, instr.numer and
+    instr.denom, respectively.
+    """
+    if instr.gainType == 'loopgain' or instr.gainType == 'servo':
+        instr = _makeAllMatrices(instr)
+        instr = _doPyLoopGainServo(instr)
+    else:
+        instr = _makeAllMatrices(instr)
+        instr = _doPyLaplace(instr)
+    return instr
+
 def _doPoles(instr):
     """
     Adds the instr of a poles analysis to instr.
@@ -286,6 +316,10 @@ def _doPoles(instr):
     :return: instr of the execution of the instruction.
     :rtype: SLiCAPinstruction.instruction
     """
+    if ini.eig_pz and instr.step and instr.numeric:
+        eigInstr = _doEigPZ(instr)
+        if eigInstr != None:
+            return eigInstr
     instr.dataType = "denom"
     instr.dataType = "denom"
     instr = _doDenom(instr)
@@ -308,6 +342,10 @@ def _doZeros(instr):
     :return: instr of the execution of the instruction.
     :rtype: SLiCAPinstruction.instruction
     """
+    if ini.eig_pz and instr.step and instr.numeric:
+        eigInstr = _doEigPZ(instr)
+        if eigInstr != None:
+            return eigInstr
     instr.dataType = "numer"
     instr.dataType = "numer"
     instr = _doNumer(instr)
@@ -330,6 +368,10 @@ def _doPZ(instr):
     :return: instr of the execution of the instruction.
     :rtype: SLiCAPinstruction.instruction
     """
+    if ini.eig_pz and instr.step and instr.numeric:
+        eigInstr = _doEigPZ(instr)
+        if eigInstr != None:
+            return eigInstr
     instr.dataType = "laplace"
     instr.dataType = "laplace"
     instr = _doLaplace(instr)
@@ -356,6 +398,82 @@ def _doPZ(instr):
     instr.dataType = 'pz'
     return instr
 
+def _doEigPZ(instr):
+    """
+    Numeric stepped pole-zero analysis with float eigenvalue solvers.
+
+    The MNA matrix is built once with the step parameters as symbols. For each
+    step, the coefficient matrices of the Laplace variable are evaluated as
+    floats, and the poles and the zeros are found from the generalized
+    eigenvalues of the matrix pencil and of the Rosenbrock pencil,
+    respectively (see SLiCAPstateSpace.mna_pz()). No determinants are
+    calculated: the attributes numer, denom and laplace remain empty.
+
+    :param instr: SLiCAP instruction object that holds instruction data.
+    :type instr: SLiCAPinstruction.instruction
+
+    :return: instr of the execution of the instruction, or None if the fast
+             path cannot be used (loop gain or servo function, entries that
+             are not polynomial in the Laplace variable, or parameters
+             without a numeric value); the caller then proceeds with the
+             symbolic determinants.
+    :rtype: SLiCAPinstruction.instruction
+    """
+    if instr.gainType == 'loopgain' or instr.gainType == 'servo':
+        return None
+    stepVars = list(instr.stepDict.keys())
+    parDefs = instr.parDefs
+    instr.parDefs = {}
+    for key in parDefs.keys():
+        if key not in stepVars:
+            instr.parDefs[key] = parDefs[key]
+    instr = _makeAllMatrices(instr)
+    instr.parDefs = parDefs
+    findZeros = instr.dataType != 'poles'
+    if findZeros:
+        detP, detN = _makeDetPos(instr)
+        c = [0 for i in range(instr.M.shape[0])]
+        if detP != None:
+            c[detP] = 1
+        if detN != None:
+            c[detN] = -1
+        findZeros = not instr.Iv.is_zero_matrix and any(c)
+    # Coefficient matrices of the Laplace variable, with the source vector
+    # as an extra column for the zeros
+    dim = instr.M.shape[0]
+    M = instr.M.row_join(instr.Iv) if findZeros else instr.M
+    try:
+        evaluate = mna_coeff_function(M, stepVars)
+    except ValueError:
+        return None
+    numSteps = len(instr.stepDict[stepVars[0]])
+    for step in range(numSteps):
+        values = [float(instr.stepDict[var][step]) for var in stepVars]
+        matrices = evaluate(*values)
+        A = [matrix[:, :dim] for matrix in matrices]
+        if findZeros:
+            Iv = [matrix[:, dim] for matrix in matrices]
+            poles, zeros, H = mna_pz(A, Iv, np.array(c, dtype=float))
+        else:
+            poles, zeros, H = mna_pz(A)
+        if instr.dataType == 'poles':
+            instr.poles.append(poles)
+        elif instr.dataType == 'zeros':
+            instr.zeros.append(zeros if findZeros else [])
+        elif findZeros:
+            instr.DCvalue.append(pz_dc_value(poles, zeros, H))
+            try:
+                poles, zeros = _cancelPZ(poles, zeros)
+            except:
+                pass
+            instr.poles.append(poles)
+            instr.zeros.append(zeros)
+        else:
+            instr.DCvalue.append(sp.N(0))
+            instr.poles.append(poles)
+            instr.zeros.append([])
+    return instr
+
 def _doNoise(instr):
     """
     Adds the instr of a noise analysis to instr.
@@ -375,12 +493,7 @@ def _doNoise(instr):
                 instr.onoiseTerms[srcName] = _stepFunctions(instr.stepDict, noiseinstr.onoiseTerms[srcName][0])
                 instr.inoiseTerms[srcName] = _stepFunctions(instr.stepDict, noiseinstr.inoiseTerms[srcName][0])
         else:
-            stepVars = list(instr.stepDict.keys())
-            numSteps = len(instr.stepDict[stepVars[0]])
-            for i in range(numSteps):
-                for j in range(len(stepVars)):
-                    instr.parDefs[stepVars[j]]=instr.stepDict[stepVars[j]][i]
-                instr = _doPyNoise(instr)
+            instr = _doSteps(instr, _doPyNoise)
     else:
         instr = _doPyNoise(instr)
         instr.onoise = instr.onoise[0]
@@ -434,27 +547,7 @@ def _doDCvar(instr):
                 instr.Dv = Dv
                 instr = _convertDCsolve(instr)
         else:
-            stepVars = list(instr.stepDict.keys())
-            numSteps = len(instr.stepDict[stepVars[0]])
-            M  = []
-            Iv = []
-            Dv = []
-            for i in range(numSteps):
-                instr.convType = None
-                for j in range(len(stepVars)):
-                    instr.parDefs[stepVars[j]]=instr.stepDict[stepVars[j]][i]
-                instr.dataType = 'dcsolve'
-                instr = _doDCsolve(instr)
-                M.append(instr.M)
-                Iv.append(instr.Iv)
-                Dv.append(instr.Dv)
-                _addDCvarSources(instr, instr.dcSolve[-1])
-                instr.convType = conv_type
-                instr.dataType = 'dcvar'
-                instr = _doPyDCvar(instr)
-                _delDCvarSources(instr)
-                if instr.convType != None:
-                    raise NotImplementedError("DC solution not converted to CM and DM variables with ini.stepFunction=False.")
+            instr = _doSteps(instr, _stepDCvar)
     else:
         instr.convType = None
         #instr = _makeAllMatrices(instr, reduce=False)
@@ -487,6 +580,24 @@ def _doDCvar(instr):
     instr = _updateSRCnames(instr)
     return instr
 
+def _stepDCvar(instr):
+    """
+    Appends the DC solution and the detector-referred and source-referred
+    variances for the present parameter definitions to the instruction.
+    """
+    conv_type = instr.convType
+    instr.convType = None
+    instr.dataType = 'dcsolve'
+    instr = _stepDCsolve(instr)
+    _addDCvarSources(instr, instr.dcSolve[-1])
+    instr.convType = conv_type
+    instr.dataType = 'dcvar'
+    instr = _doPyDCvar(instr)
+    _delDCvarSources(instr)
+    if instr.convType != None:
+        raise NotImplementedError("DC solution not converted to CM and DM variables with ini.stepFunction=False.")
+    return instr
+
 def _convertDCsolve(instr):
     """
     At the start of a dc variance analysis, the DC solution is calculated from 
@@ -593,7 +704,7 @@ def _updateSRCnames(instr):
         for srcName in srcNames:
             baseName = srcName[:-1]
             if (srcName[-1] == instr.pairExt[0] and baseName + instr.pairExt[1] in srcNames) or (srcName[-1] == instr.pairExt[1] and baseName + instr.pairExt[0] in srcNames):
-                if type(sTerms[srcName]) == list:
+                if isinstance(sTerms[srcName], list):
                     nsteps = len(sTerms[srcName])
                 else:
                     nsteps = 0
@@ -848,38 +959,30 @@ def _doDC(instr):
                 dcFunc = instr.laplace[0]
             instr.laplace = _stepFunctions(instr.stepDict, dcFunc)
         else:
-            stepVars = list(instr.stepDict.keys())
-            numSteps = len(instr.stepDict[stepVars[0]])
-            for i in range(numSteps):
-                for j in range(len(stepVars)):
-                    instr.parDefs[stepVars[j]] = instr.stepDict[stepVars[j]][i]
-                if instr.gainType == 'loopgain' or instr.gainType == 'servo':
-                    instr = _makeAllMatrices(instr, inductors=True)
-                    instr.Iv = instr.Iv.xreplace({ini.laplace: 0})
-                    instr.M = instr.M.xreplace({ini.laplace: 0})
-                    instr = _doPyLoopGainServo(instr)
-                else:
-                    instr = _makeAllMatrices(instr, inductors=True)
-                    instr.Iv = instr.Iv.xreplace({ini.laplace: 0})
-                    instr.M = instr.M.xreplace({ini.laplace: 0})
-                    instr = _doPyLaplace(instr)
+            instr = _doSteps(instr, _stepDC)
     else:
-        if instr.gainType == 'loopgain' or instr.gainType == 'servo':
-            instr = _makeAllMatrices(instr, inductors=True)
-            instr.Iv = instr.Iv.xreplace({ini.laplace: 0})
-            instr.M = instr.M.xreplace({ini.laplace: 0})
-            instr = _doPyLoopGainServo(instr)
-        else:
-            instr = _makeAllMatrices(instr, inductors=True)
-            instr.Iv = instr.Iv.xreplace({ini.laplace: 0})
-            instr.M = instr.M.xreplace({ini.laplace: 0})
-            instr = _doPyLaplace(instr)
+        instr = _stepDC(instr)
         instr.laplace = instr.laplace[0]
         instr.numer = instr.numer[0]
         instr.denom = instr.denom[0]
     instr = _correctDMcurrentinstr(instr)
     return instr
 
+def _stepDC(instr):
+    """
+    Appends the zero-frequency transfer, its numerator and its denominator for
+    the present parameter definitions to instr.laplace, instr.numer and
+    instr.denom, respectively.
+    """
+    instr = _makeAllMatrices(instr, inductors=True)
+    instr.Iv = instr.Iv.xreplace({ini.laplace: 0})
+    instr.M = instr.M.xreplace({ini.laplace: 0})
+    if instr.gainType == 'loopgain' or instr.gainType == 'servo':
+        instr = _doPyLoopGainServo(instr)
+    else:
+        instr = _doPyLaplace(instr)
+    return instr
+
 def _doImpulse(instr):
     """
     Calculates the inverse Laplace transform of the source-detector transfer.
@@ -898,6 +1001,10 @@ def _doImpulse(instr):
     :return: instr of the execution of the instruction.
     :rtype: SLiCAPinstruction.instruction
     """
+    if ini.numeric_time and instr.numeric:
+        result = _doStateTime(instr)
+        if result != None:
+            return result
     instr.dataType = 'laplace'
     instr = _doLaplace(instr)
     if instr.step:
@@ -930,6 +1037,10 @@ def _doStep(instr):
     :return: instr of the execution of the instruction.
     :rtype: SLiCAPinstruction.instruction
     """
+    if ini.numeric_time and instr.numeric:
+        result = _doStateTime(instr)
+        if result != None:
+            return result
     instr.dataType = 'laplace'
     instr = _doLaplace(instr)
     if instr.step:
@@ -951,6 +1062,10 @@ def _doTime(instr):
     :return: instr of the execution of the instruction.
     :rtype: SLiCAPinstruction.instruction
     """
+    if ini.numeric_time and instr.numeric:
+        result = _doStateTime(instr)
+        if result != None:
+            return result
     instr.dataType = 'laplace'
     instr = _doLaplace(instr)
     if instr.step:
@@ -965,6 +1080,73 @@ def _doTime(instr):
     instr.dataType = 'time'
     return instr
 
+def _doStateTime(instr):
+    """
+    Numeric impulse, step or time response from state-space realizations
+    (ini.numeric_time = True).
+
+    The MNA matrix is built once with the step parameters as symbols. For each
+    step, its coefficient matrices are evaluated as floats and reduced to a
+    state-space realization (see SLiCAPstateSpace.numeric_state()), which is
+    connected with the realizations of the source values. No inverse Laplace
+    transform is calculated, and the attributes numer, denom and laplace
+    remain empty: the attribute impulse, stepResp or time holds the
+    realizations of the runs (SLiCAPstateSpace._stateResponse), which
+    sweepData() and plotSweep() simulate on their time grid.
+
+    :param instr: SLiCAP instruction object that holds instruction data.
+    :type instr: SLiCAPinstruction.instruction
+
+    :return: instr of the execution of the instruction, or None if the
+             numeric path cannot be used (loop gain or servo function,
+             entries that are not polynomial in the Laplace variable,
+             parameters without a numeric value, source values that are not
+             proper rational functions, or a circuit without a proper
+             state-space realization); the caller then proceeds with the
+             inverse Laplace transform.
+    :rtype: SLiCAPinstruction.instruction
+    """
+    if instr.gainType == 'loopgain' or instr.gainType == 'servo':
+        return None
+    stepVars = list(instr.stepDict.keys()) if instr.step else []
+    parDefs = instr.parDefs
+    instr.parDefs = {}
+    for key in parDefs.keys():
+        if key not in stepVars:
+            instr.parDefs[key] = parDefs[key]
+    instr = _makeAllMatrices(instr)
+    instr.parDefs = parDefs
+    detP, detN = _makeDetPos(instr)
+    if detP == None and detN == None:
+        return None
+    if stepVars:
+        numSteps = len(instr.stepDict[stepVars[0]])
+        steps = [[float(instr.stepDict[var][step]) for var in stepVars]
+                 for step in range(numSteps)]
+    else:
+        steps = [[]]
+    realizations = []
+    try:
+        coeffs = mna_coeff_function(instr.M, stepVars)
+        for values in steps:
+            substitutions = dict(zip(stepVars, values))
+            sources = [None if instr.Iv[i] == 0 else
+                       source_realization(sp.sympify(instr.Iv[i]).xreplace(substitutions))
+                       for i in range(instr.M.shape[0])]
+            realizations.append(detector_realization(
+                numeric_state(coeffs(*values)), detP, detN, sources))
+    except ValueError:
+        return None
+    kind = 'step' if instr.dataType == 'step' else 'impulse'
+    result = _stateResponse(realizations, kind)
+    if instr.dataType == 'step':
+        instr.stepResp = result
+    elif instr.dataType == 'impulse':
+        instr.impulse = result
+    else:
+        instr.time = result
+    return instr
+
 def _doSolve(instr):
     """
     Solves the network: calculates the Laplace transform of all dependent
@@ -982,18 +1164,20 @@ def _doSolve(instr):
             sol = _doPySolve(instr).solve[0]
             instr.solve = _stepFunctions(instr.stepDict, sol)
         else:
-            stepVars = list(instr.stepDict.keys())
-            numSteps = len(instr.stepDict[stepVars[0]])
-            for i in range(numSteps):
-                for j in range(len(stepVars)):
-                    instr.parDefs[stepVars[j]]=instr.stepDict[stepVars[j]][i]
-                instr = _makeAllMatrices(instr, reduce=False)
-                instr = _doPySolve(instr)
+            instr = _doSteps(instr, _stepSolve)
     else:
-        instr = _makeAllMatrices(instr, reduce=False)
-        instr.solve = _doPySolve(instr).solve[0]
+        instr = _stepSolve(instr)
+        instr.solve = instr.solve[0]
     return instr
 
+def _stepSolve(instr):
+    """
+    Appends the network solution for the present parameter definitions to
+    instr.solve.
+    """
+    instr = _makeAllMatrices(instr, reduce=False)
+    return _doPySolve(instr)
+
 def _doDCsolve(instr):
     """
     Finds the DC solution of the network using the .dc attribute of independent
@@ -1017,16 +1201,7 @@ def _doDCsolve(instr):
             sol = sp.simplify(instr.solve[-1])
             instr.dcSolve = _stepFunctions(instr.stepDict, sol)
         else:
-            stepVars = list(instr.stepDict.keys())
-            numSteps = len(instr.stepDict[stepVars[0]])
-            for i in range(numSteps):
-                for j in range(len(stepVars)):
-                    instr.parDefs[stepVars[j]]=instr.stepDict[stepVars[j]][i]
-                instr = _makeAllMatrices(instr, reduce=False)
-                instr.M = instr.M.xreplace({ini.laplace: 0})
-                instr.Iv = instr.Iv.xreplace({ini.laplace: 0})
-                instr = _doPySolve(instr)
-                instr.dcSolve.append(sp.simplify(instr.solve[-1]))
+            instr = _doSteps(instr, _stepDCsolve)
     else:
         instr = _makeAllMatrices(instr, reduce=False)
         instr.M = instr.M.xreplace({ini.laplace: 0})
@@ -1035,6 +1210,18 @@ def _doDCsolve(instr):
         instr.dcSolve = sp.simplify(instr.solve[0])
     return instr
 
+def _stepDCsolve(instr):
+    """
+    Appends the DC solution for the present parameter definitions to
+    instr.dcSolve.
+    """
+    instr = _makeAllMatrices(instr, reduce=False)
+    instr.M = instr.M.xreplace({ini.laplace: 0})
+    instr.Iv = instr.Iv.xreplace({ini.laplace: 0})
+    instr = _doPySolve(instr)
+    instr.dcSolve.append(sp.simplify(instr.solve[-1]))
+    return instr
+
 def _doTimeSolve(instr):
     """
     Calculates the time-domain solution of the circuit.
@@ -1211,24 +1398,147 @@ def _makeInstrParDict(instr):
                     parDefs[key] = instr.parDefs[key]
         instr.parDefs = parDefs
     elif not instr.ignoreCircuitParams:
-        instr.parDefs = deepcopy(instr.circuit.parDefs)
+        instr.parDefs = dict(instr.circuit.parDefs)
     return instr
 
 def _stepFunctions(stepDict, function):
     """
-    Substitutes values for step parameters in *function* and returns a list
-    of functions with these substitutions.
+    Returns a list of functions in which the values of the step parameters
+    have been substituted in *function*.
+
+    The list holds *function* as template: the function for a step is built
+    when it is accessed, and all steps can be evaluated numerically at once
+    (see SLiCAPmath._stepList).
     """
-    stepVars = list(stepDict.keys())
-    numSteps = len(stepDict[stepVars[0]])
-    functions = []
+    return _stepList(function, stepDict)
+
+# Result attributes to which the step functions append their results
+_STEP_RESULTS = ['numer', 'denom', 'laplace', 'onoise', 'inoise', 'ovar',
+                 'ivar', 'solve', 'dcSolve']
+_STEP_TERMS   = ['onoiseTerms', 'inoiseTerms', 'ovarTerms', 'ivarTerms']
+
+def _doSteps(instr, stepFunction):
+    """
+    Executes *stepFunction(instr)* for all steps of instr.stepDict (used if
+    ini.step_function == False). The step functions append their results to
+    the result attributes of the instruction.
+
+    If instr.stepWorkers (or ini.step_workers if it is None) is larger than
+    one, the steps are distributed over a pool of worker processes.
+
+    :param instr: SLiCAP instruction object that holds instruction data.
+    :type instr: SLiCAPinstruction.instruction
+
+    :param stepFunction: Function that executes one step.
+    :type stepFunction: function
+
+    :return: instr of the execution of the instruction.
+    :rtype: SLiCAPinstruction.instruction
+    """
+    stepVars = list(instr.stepDict.keys())
+    numSteps = len(instr.stepDict[stepVars[0]])
+    workers = instr.stepWorkers
+    if workers == None:
+        workers = ini.step_workers
+    workers = min(int(workers), numSteps)
+    data = None
+    if workers > 1:
+        try:
+            data = pickle.dumps(instr)
+        except (pickle.PicklingError, TypeError, AttributeError) as error:
+            print("Warning: cannot pickle the instruction for parallel " \
+                  "parameter stepping ({0}), continuing serially.".format(error))
+    if data != None:
+        try:
+            return _doParallelSteps(instr, stepFunction, data, numSteps,
+                                    workers)
+        except BrokenProcessPool as error:
+            print("Warning: parallel parameter stepping failed ({0}), " \
+                  "continuing serially.".format(error))
     for i in range(numSteps):
-        newFunction = function
         for j in range(len(stepVars)):
-            newFunction = newFunction.xreplace({stepVars[j]: stepDict[stepVars[j]][i]})
-        newFunction = _sympify(str(sp.N(newFunction)), rational=True)
-        functions.append(newFunction)
-    return functions
+            instr.parDefs[stepVars[j]] = instr.stepDict[stepVars[j]][i]
+        instr = stepFunction(instr)
+    return instr
+
+# Instruction held by a step worker process, see _initStepWorker()
+_stepInstr = None
+
+def _iniState():
+    """
+    Returns the picklable settings of SLiCAPconfigure, so that worker
+    processes started with 'spawn' or 'forkserver' use the settings of the
+    main process, and not those read from the configuration files.
+    """
+    state = {}
+    for key, value in vars(ini).items():
+        if key.startswith('_') or callable(value) or \
+           type(value) == type(ini):
+            continue
+        try:
+            pickle.dumps(value)
+        except Exception:
+            continue
+        state[key] = value
+    return state
+
+def _initStepWorker(data, iniState):
+    """
+    Initializer of a step worker process: restores the settings and unpickles
+    the instruction once per process.
+    """
+    global _stepInstr
+    for key, value in iniState.items():
+        setattr(ini, key, value)
+    _stepInstr = pickle.loads(data)
+
+def _runStep(stepFunction, step, last):
+    """
+    Executes step number *step* on a copy of the instruction of the worker
+    process and returns the results appended by *stepFunction*. For the last
+    step the complete instruction is returned as well.
+    """
+    instr = deepcopy(_stepInstr)
+    for stepVar in instr.stepDict.keys():
+        instr.parDefs[stepVar] = instr.stepDict[stepVar][step]
+    instr = stepFunction(instr)
+    results = {}
+    for attr in _STEP_RESULTS:
+        results[attr] = getattr(instr, attr)[len(getattr(_stepInstr, attr)):]
+    for attr in _STEP_TERMS:
+        terms = getattr(_stepInstr, attr)
+        results[attr] = {key: value[len(terms.get(key, [])):]
+                         for key, value in getattr(instr, attr).items()}
+    if not last:
+        instr = None
+    return results, instr
+
+def _doParallelSteps(instr, stepFunction, data, numSteps, workers):
+    """
+    Distributes the steps over *workers* processes and merges the results in
+    the order of the steps, as if they were executed serially. *data* is the
+    pickled instruction, which is sent once to each worker.
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=_initStepWorker,
+                             initargs=(data, _iniState())) as pool:
+        futures = [pool.submit(_runStep, stepFunction, i, i == numSteps - 1)
+                   for i in range(numSteps)]
+        steps = [future.result() for future in futures]
+    results = {attr: list(getattr(instr, attr)) for attr in _STEP_RESULTS}
+    terms = {attr: {key: list(value) for key, value in
+                    getattr(instr, attr).items()} for attr in _STEP_TERMS}
+    for stepResults, lastInstr in steps:
+        for attr in _STEP_RESULTS:
+            results[attr] += stepResults[attr]
+        for attr in _STEP_TERMS:
+            for key, value in stepResults[attr].items():
+                terms[attr].setdefault(key, []).extend(value)
+    instr = lastInstr
+    for attr in _STEP_RESULTS:
+        setattr(instr, attr, results[attr])
+    for attr in _STEP_TERMS:
+        setattr(instr, attr, terms[attr])
+    return instr
 
 # Functions for converting the MNA matrix and the vecors with independent and
 # dependent variables into equivalent common-mode and differential-mode variables.
@@ -1512,12 +1822,13 @@ def _doPyDenom(instr):
     instr.denom.append(denom)
     return instr
 
-def _doCramer(M, rowVector, rowNumber):
-    newMatrix = sp.zeros(M.rows)
-    for i in range(M.rows):
-        for j in range(M.cols):
-            newMatrix[i,j] = M[i,j]
+def _cramerMatrix(M, rowVector, rowNumber):
+    newMatrix = M.copy()
     newMatrix[:,rowNumber] = rowVector
+    return newMatrix
+
+def _doCramer(M, rowVector, rowNumber):
+    newMatrix = _cramerMatrix(M, rowVector, rowNumber)
     num = det(newMatrix, method=ini.numer)
     num = sp.collect(num, ini.laplace)
     return num
@@ -1536,6 +1847,56 @@ def _doPyNumer(instr):
         instr.numer.append(num)
     return instr
 
+def _doPyNumers(instr, IvList):
+    """
+    Appends the numerators for each of the source vectors in IvList to
+    instr.numer, in the order of IvList.
+
+    A numerator is linear in the source vector: it equals the sum of the
+    products of the source vector entries and the cofactors of M along the
+    detector column(s). These cofactors are calculated once and each
+    numerator is obtained as a sparse dot product:
+
+    - with method 'ME' for more than one source vector: _cofactors() obtains
+      all cofactors from one minor expansion;
+    - with other methods if the source vectors together have fewer nonzero
+      rows than there are Cramer matrices, because each cofactor then costs
+      a determinant.
+
+    Otherwise, the Cramer matrices are used. All determinants are passed to
+    _detList() at once, so that the 'MECPP' engine computes them in a single
+    round trip.
+    """
+    detP, detN = None, None
+    if not all([Iv.is_zero_matrix for Iv in IvList]):
+        detP, detN = _makeDetPos(instr)
+    cols = [col for col in (detP, detN) if col != None]
+    nonZero = [Iv for Iv in IvList if not Iv.is_zero_matrix]
+    rows = sorted(set([i for Iv in nonZero for i in range(len(Iv)) if Iv[i] != 0]))
+    # dets[k][n]: numerator of the k-th nonzero source vector for cols[n]
+    if (ini.numer == "ME" and len(nonZero) > 1) or len(rows) < len(nonZero):
+        cofactors = _cofactors(instr.M, rows, cols, method=ini.numer)
+        dets = [[sp.expand(sum([Iv[i]*cofactors[(i, col)] for i in rows if Iv[i] != 0]))
+                 for col in cols] for Iv in nonZero]
+    else:
+        matrices = [_cramerMatrix(instr.M, Iv, col) for Iv in nonZero for col in cols]
+        dets = _detList(matrices, method=ini.numer)
+        dets = [dets[k*len(cols): (k+1)*len(cols)] for k in range(len(nonZero))]
+    dets = iter(dets)
+    for Iv in IvList:
+        if Iv.is_zero_matrix:
+            instr.numer.append(sp.N(0))
+        else:
+            colDets = next(dets)
+            num = 0
+            if detP != None:
+                num += sp.collect(colDets[0], ini.laplace)
+            if detN != None:
+                num -= sp.collect(colDets[-1], ini.laplace)
+            num = sp.collect(num, ini.laplace)
+            instr.numer.append(num)
+    return instr
+
 def _doPyLaplace(instr, normalize=False):
     instr = _doPyNumer(instr)
     instr = _doPyDenom(instr)
@@ -1616,7 +1977,7 @@ def _doPyNoise(instr):
     instr.gainType = 'gain'
     instr = _makeAllMatrices(instr, reduce=True, inductors=False)
     den = _doPyDenom(instr)
-    den = assumeRealParams(den.denom[0].xreplace({ini.laplace: s2f}))
+    den = assumeRealParams(den.denom[-1].xreplace({ini.laplace: s2f}))
     den_sq = sp.Abs(den * sp.conjugate(den))
     if instr.source != [None, None] and instr.source != None:   
         instr = _doPyNumer(instr)
@@ -1632,10 +1993,9 @@ def _doPyNoise(instr):
     Dv_noise = instr.Dv
     onoise = 0
     inoise = 0   
+    # Source vectors with a single input, one for each noise source
+    IvList = []
     for src in instr.snoiseTerms.keys():
-        if src not in instr.onoiseTerms.keys():
-            instr.onoiseTerms[src] = []
-            instr.inoiseTerms[src] = []
         Iv = Iv_noise
         for el in instr.snoiseTerms.keys():
             name = sp.Symbol(el)
@@ -1643,10 +2003,15 @@ def _doPyNoise(instr):
                 Iv = Iv.xreplace({name: 1})
             else:
                 Iv = Iv.xreplace({name: 0})
-        # Modify source and source vector (reduce to single input)
-        instr.Iv = Iv
-        instr = _doPyNumer(instr)
-        num = assumeRealParams(instr.numer[-1].xreplace({ini.laplace: s2f}))
+        IvList.append(Iv)
+    # Calculate all numerators at once
+    instr = _doPyNumers(instr, IvList)
+    numers = instr.numer[-len(IvList):]
+    for k, src in enumerate(instr.snoiseTerms.keys()):
+        if src not in instr.onoiseTerms.keys():
+            instr.onoiseTerms[src] = []
+            instr.inoiseTerms[src] = []
+        num = assumeRealParams(numers[k].xreplace({ini.laplace: s2f}))
         if num != None:
             num_sq = sp.Abs(num * sp.conjugate(num))
             gain_sq = num_sq/den_sq
@@ -1661,10 +2026,10 @@ def _doPyNoise(instr):
                     inoiseTerm = sp.factor(inoiseTerm)
                 instr.inoiseTerms[src].append(inoiseTerm)
                 inoise += instr.inoiseTerms[src][-1]
-        # Restore full matrices
-        instr.M  = M_noise
-        instr.Iv = Iv_noise
-        instr.Dv = Dv_noise
+    # Restore full matrices
+    instr.M  = M_noise
+    instr.Iv = Iv_noise
+    instr.Dv = Dv_noise
     instr.onoise.append(onoise)
     if inoise == 0:
         inoise = None
@@ -1683,7 +2048,7 @@ def _doPyDCvar(instr):
     instr.gainType = 'gain'
     instr = _makeAllMatrices(instr, inductors=True)
     instr.M = instr.M.xreplace({ini.laplace: 0})
-    den = _doPyDenom(instr).denom[0]
+    den = _doPyDenom(instr).denom[-1]
     den_sq = den**2
     if instr.source != [None, None] and instr.source != None:
         instr = _doPyNumer(instr)
@@ -1697,10 +2062,9 @@ def _doPyDCvar(instr):
     Dv_var = instr.Dv
     ovar = 0
     ivar = 0
+    # Source vectors with a single input, one for each variance source
+    IvList = []
     for src in instr.svarTerms.keys():
-        if src not in instr.ovarTerms.keys():
-            instr.ovarTerms[src] = []
-            instr.ivarTerms[src] = []
         Iv = Iv_var
         for el in instr.svarTerms.keys():
             name = sp.Symbol(el)
@@ -1708,12 +2072,16 @@ def _doPyDCvar(instr):
                 Iv = Iv.xreplace({name: 1})
             else:
                 Iv = Iv.xreplace({name: 0})
-        # Modify source and source vector (reduce to single input)
-        instr.Iv = Iv
-        # Remove unused independent voltage sources
-        #instr.M, instr.Iv, instr.Dv = _reduceCircuit(instr.M, instr.Iv, instr.Dv, [src], instr.detector, instr.references, inductors=True)
-        instr = _doPyNumer(instr)
-        num = instr.numer[-1]
+        IvList.append(Iv)
+    # Calculate all numerators at once
+    instr.M = M_var
+    instr = _doPyNumers(instr, IvList)
+    numers = instr.numer[-len(IvList):]
+    for k, src in enumerate(instr.svarTerms.keys()):
+        if src not in instr.ovarTerms.keys():
+            instr.ovarTerms[src] = []
+            instr.ivarTerms[src] = []
+        num = numers[k]
         if num != None:
             num_sq = num**2
             gain_sq = num_sq/den_sq
@@ -1728,10 +2096,10 @@ def _doPyDCvar(instr):
                     ivarTerm = sp.factor(ivarTerm)
                 instr.ivarTerms[src].append(ivarTerm)
                 ivar += instr.ivarTerms[src][-1]
-        # Restore full matrices
-        instr.M = M_var
-        instr.Iv = Iv_var
-        instr.Dv = Dv_var
+    # Restore full matrices
+    instr.M = M_var
+    instr.Iv = Iv_var
+    instr.Dv = Dv_var
     instr.ovar.append(ovar)
     if ivar == 0:
         ivar = None
@@ -4,13 +4,13 @@
 SLiCAP module with functions for creating a basic HTML report.
 """
 
+import atexit as _atexit
 import sympy as sp
 import SLiCAP.SLiCAPconfigure as ini
 from shutil import copy2
 from SLiCAP.SLiCAPmath import roundN, fullSubs, _checkNumeric, ENG, units2TeX, normalizeRational
 from SLiCAP.SLiCAPlatex import exprLatex, exprLatex as _latex_ENG
 from SLiCAP.SLiCAPlex import _sympify
-from IPython.core.display import HTML
 
 _HTMLINSERT = '<!-- INSERT -->' # pattern to be replaced in html files
 _LABELTYPES = ['heading', 'data', 'fig', 'eqn', 'analysis']
@@ -65,9 +65,10 @@ def _startHTML(projectName):
     """
     toc = '<h2>Table of contents</h2>'
     html = _HTMLhead(projectName) + toc + '<ol>' + _HTMLINSERT + '</ol>' + _HTMLfoot(ini.html_index)
-    _writeFile(ini.html_path + ini.html_index, html)
+    _PAGES.new(ini.html_path + ini.html_index, html)
     ini.html_page = ini.html_index
     ini.html_pages.append(ini.html_page)
+    _PAGES.flush()
     return
 
 def _HTMLhead(pageTitle):
@@ -116,6 +117,9 @@ def _insertHTML(fileName, htmlInsert):
     Inserts html in the file specified by 'fileName' at the location of the
     string 'htmlInsert'.
 
+    The insert is kept in the page buffer; the file is written when the page
+    buffer is flushed (see _HTMLbuffer).
+
     :param fileName: name of the file
     :type fileName: str
     
@@ -123,13 +127,75 @@ def _insertHTML(fileName, htmlInsert):
     :type htmlInsert: str
     """
     if ini.notebook:
+        from IPython.core.display import HTML
         htmlInsert = HTML(htmlInsert)
     else:
-        html = _readFile(fileName)
-        html = html.replace(_HTMLINSERT, htmlInsert + _HTMLINSERT)
-        _writeFile(fileName, html)
+        _PAGES.insert(fileName, htmlInsert)
     return htmlInsert
 
+class _HTMLbuffer(object):
+    """
+    HTML pages with inserts that have not yet been written to disk.
+
+    A page is read once, split at _HTMLINSERT, and the inserts are collected
+    in a list. flush() writes each page once and updates the project
+    configuration file once, instead of rewriting both for every insert. The
+    written pages equal those of repeated html.replace(_HTMLINSERT,
+    htmlInsert + _HTMLINSERT).
+
+    The buffer is flushed by htmlPage() before it switches pages, by
+    _startHTML() and at interpreter exit.
+    """
+    def __init__(self):
+        self.pages = {}
+
+    def new(self, fileName, html):
+        """
+        Buffers a new page 'html' that will be written to 'fileName'.
+        """
+        self.pages[fileName] = [html.split(_HTMLINSERT), []]
+
+    def insert(self, fileName, htmlInsert):
+        """
+        Inserts 'htmlInsert' at the insert location(s) of the page
+        'fileName'; the page is read from disk if it is not buffered.
+        """
+        if fileName not in self.pages:
+            self.new(fileName, _readFile(fileName))
+        if _HTMLINSERT in htmlInsert:
+            # The insert places a new insert location: apply it to the text
+            html = self.text(fileName).replace(_HTMLINSERT,
+                                               htmlInsert + _HTMLINSERT)
+            self.new(fileName, html)
+        else:
+            self.pages[fileName][1].append(htmlInsert)
+
+    def text(self, fileName):
+        """
+        Returns the buffered text of the page 'fileName'.
+        """
+        parts, inserts = self.pages[fileName]
+        return (''.join(inserts) + _HTMLINSERT).join(parts)
+
+    def flush(self):
+        """
+        Writes all buffered pages and updates the project configuration file.
+        """
+        if not self.pages:
+            return
+        pages = self.pages
+        self.pages = {}
+        for fileName in pages:
+            parts, inserts = pages[fileName]
+            _writeFile(fileName, (''.join(inserts) + _HTMLINSERT).join(parts))
+        # Update project configuration file. In this way the HTML info is
+        # preserved with next import of SLiCAP in the same project; it is only
+        # reset with initProject()
+        ini._update_project_config()
+
+_PAGES = _HTMLbuffer()
+_atexit.register(_PAGES.flush)
+
 def _readFile(fileName):
     """
     Returns the contents of a file as a string.
@@ -162,10 +228,6 @@ def _writeFile(fileName, txt):
     f = open(fileName, 'w')
     f.write(txt)
     f.close()
-    # Update project configuration file. In this way the HTML info is preserved
-    # with next import of SLiCAP in the same project; it is only reset with
-    # initProject()
-    ini._update_project_config()
     return
 
 ### User Functions ###########################################################
@@ -191,6 +253,8 @@ def htmlPage(pageTitle, index = False, label = ''):
     
     """   
     if not ini.notebook:
+        # Write the pages of the previous page switch
+        _PAGES.flush()
         if index == True:
             # The page is a  new index page
             fileName = ini.html_prefix + 'index.html'
@@ -200,7 +264,7 @@ def htmlPage(pageTitle, index = False, label = ''):
             # Create the new HTML file
             toc = '<h2>Table of contents</h2>'
             html = _HTMLhead(pageTitle) + toc + '<ol>' + _HTMLINSERT + '</ol>' + _HTMLfoot(ini.html_index)
-            _writeFile(ini.html_path + fileName, html)
+            _PAGES.new(ini.html_path + fileName, html)
             # Make this page the new index page
             ini.html_index = fileName
         else:
@@ -213,7 +277,7 @@ def htmlPage(pageTitle, index = False, label = ''):
                 ini.html_labels[label] = _Label(label, 'heading', fileName, pageTitle)
                 label = '<a id="' + label + '"></a>'
             html = label + _HTMLhead(pageTitle) + _HTMLINSERT + _HTMLfoot(ini.html_index)
-            _writeFile(ini.html_path + fileName, html)
+            _PAGES.new(ini.html_path + fileName, html)
         # Make this page the active HTML page
         ini.html_page = fileName
         ini.html_pages.append(fileName)
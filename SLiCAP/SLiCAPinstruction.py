@@ -281,6 +281,12 @@ class instruction(object):
         key:   name of a step parameter (*sympy.Symbol*)
         value: list with values for this parameter
         """
+
+        self.stepWorkers = None
+        """
+        Number of worker processes over which the steps are distributed if
+        ini.step_function == False. If None, ini.step_workers will be used.
+        """
         
         self.ignoreCircuitParams = False
         """
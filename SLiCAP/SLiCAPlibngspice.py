@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SLiCAP interface to the shared NGspice library (libngspice) through ctypes.
+
+One library instance per Python process runs the simulations in-process: a
+circuit is sent line by line (ngSpice_Circ), commands are executed with
+ngSpice_Command, and the vectors of a plot are copied into numpy arrays
+(ngGet_Vec_Info), without decks, raw files or ngspice processes.
+
+The library is used when ini.ngspice_shared == True and the library
+ini.libngspice (main configuration file [commands]) can be loaded; otherwise
+SLiCAPngspice runs ngspice as a process, as it does by default.
+"""
+import ctypes
+import threading
+import numpy as np
+import SLiCAP.SLiCAPconfigure as ini
+
+# Vector types of sharedspice.h / sim.h that name a sweep variable or need
+# the v(...) / i(...) spelling of the raw file.
+_SV_TIME      = 1
+_SV_FREQUENCY = 2
+_SV_VOLTAGE   = 3
+_SV_CURRENT   = 4
+
+# Plot names as written in a raw file, by the prefix of the plot
+_PLOT_NAMES = {"op"   : "Operating Point",
+               "tran" : "Transient Analysis",
+               "ac"   : "AC Analysis",
+               "dc"   : "DC transfer characteristic",
+               "noise": "Noise Spectral Density Curves",
+               "sp"   : "Spectrum"}
+
+class _NGcomplex(ctypes.Structure):
+    _fields_ = [("cx_real", ctypes.c_double),
+                ("cx_imag", ctypes.c_double)]
+
+class _VectorInfo(ctypes.Structure):
+    _fields_ = [("v_name",     ctypes.c_char_p),
+                ("v_type",     ctypes.c_int),
+                ("v_flags",    ctypes.c_short),
+                ("v_realdata", ctypes.POINTER(ctypes.c_double)),
+                ("v_compdata", ctypes.POINTER(_NGcomplex)),
+                ("v_length",   ctypes.c_int)]
+
+_SendChar       = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_char_p, ctypes.c_int,
+                                   ctypes.c_void_p)
+_SendStat       = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_char_p, ctypes.c_int,
+                                   ctypes.c_void_p)
+_ControlledExit = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_int, ctypes.c_bool,
+                                   ctypes.c_bool, ctypes.c_int,
+                                   ctypes.c_void_p)
+
+class _NGspiceShared(object):
+    """
+    The initialized shared NGspice library of this process.
+
+    All calls must hold 'lock': the library has one circuit and one set of
+    plots for the whole process.
+
+    :param path: Name or path of the library, e.g. 'libngspice.so.0'.
+    :type path: str
+    """
+    def __init__(self, path):
+        self.lock   = threading.RLock()
+        self.lines  = []
+        self.exited = False
+        lib = ctypes.CDLL(path)
+        lib.ngSpice_Init.restype      = ctypes.c_int
+        lib.ngSpice_Init.argtypes     = [_SendChar, _SendStat, _ControlledExit,
+                                         ctypes.c_void_p, ctypes.c_void_p,
+                                         ctypes.c_void_p, ctypes.c_void_p]
+        lib.ngSpice_Command.restype   = ctypes.c_int
+        lib.ngSpice_Command.argtypes  = [ctypes.c_char_p]
+        lib.ngSpice_Circ.restype      = ctypes.c_int
+        lib.ngSpice_Circ.argtypes     = [ctypes.POINTER(ctypes.c_char_p)]
+        lib.ngSpice_CurPlot.restype   = ctypes.c_char_p
+        lib.ngSpice_CurPlot.argtypes  = []
+        lib.ngSpice_AllVecs.restype   = ctypes.POINTER(ctypes.c_char_p)
+        lib.ngSpice_AllVecs.argtypes  = [ctypes.c_char_p]
+        lib.ngGet_Vec_Info.restype    = ctypes.POINTER(_VectorInfo)
+        lib.ngGet_Vec_Info.argtypes   = [ctypes.c_char_p]
+        # The callbacks must live as long as the library
+        self._callbacks = (_SendChar(self._sendChar),
+                           _SendStat(self._sendStat),
+                           _ControlledExit(self._controlledExit))
+        lib.ngSpice_Init(*self._callbacks, None, None, None, None)
+        self.lib = lib
+
+    def _sendChar(self, text, ident, user):
+        line = text.decode("utf-8", errors="replace")
+        # ngspice prefixes 'stdout ' or 'stderr '
+        for prefix in ("stdout ", "stderr "):
+            if line.startswith(prefix):
+                line = line[len(prefix):]
+                break
+        self.lines.append(line)
+        return 0
+
+    def _sendStat(self, text, ident, user):
+        return 0
+
+    def _controlledExit(self, status, unload, quit, ident, user):
+        # 'quit' or a fatal error: the library cannot be used again
+        self.exited = True
+        return 0
+
+    def command(self, cmd):
+        """
+        Executes one ngspice command; returns True on success.
+        """
+        if self.exited:
+            return False
+        return self.lib.ngSpice_Command(cmd.encode()) == 0 and not self.exited
+
+    def circuit(self, lines):
+        """
+        Loads the netlist 'lines' (a list of str, without '.end'); returns
+        True on success.
+        """
+        if self.exited:
+            return False
+        lines = [line.encode() for line in lines] + [b".end", None]
+        array = (ctypes.c_char_p * len(lines))(*lines)
+        return self.lib.ngSpice_Circ(array) == 0 and not self.exited
+
+    def curPlot(self):
+        """
+        Returns the name of the current plot, e.g. 'tran3'.
+        """
+        name = self.lib.ngSpice_CurPlot()
+        return name.decode() if name else ""
+
+    def vectors(self, plot):
+        """
+        Returns the vectors of 'plot' as a list of (name, type, array); the
+        arrays are copies, complex for complex vectors.
+        """
+        names = self.lib.ngSpice_AllVecs(plot.encode())
+        out = []
+        i = 0
+        while names and names[i]:
+            name = names[i].decode()
+            i += 1
+            info = self.lib.ngGet_Vec_Info((plot + "." + name).encode())
+            if not info:
+                continue
+            info = info.contents
+            n = info.v_length
+            if info.v_compdata:
+                data = np.ctypeslib.as_array(
+                    ctypes.cast(info.v_compdata, ctypes.POINTER(ctypes.c_double)),
+                    shape=(2 * n,)).copy().view(np.complex128)
+            elif info.v_realdata:
+                data = np.ctypeslib.as_array(info.v_realdata, shape=(n,)).copy()
+            else:
+                data = np.zeros(n)
+            out.append((name, info.v_type, data))
+        return out
+
+    def output(self):
+        """
+        Returns and clears the console output collected since the last call.
+        """
+        text = "\n".join(self.lines)
+        self.lines = []
+        return text
+
+_shared = {"checked": False, "instance": None}
+
+def instance():
+    """
+    Returns the shared NGspice library of this process, loaded and
+    initialized on the first call, or None if ini.ngspice_shared is False or
+    the library cannot be used (a warning is printed once).
+
+    :return: The library instance or None
+    :rtype: _NGspiceShared, NoneType
+    """
+    if not ini.ngspice_shared:
+        return None
+    if not _shared["checked"]:
+        _shared["checked"] = True
+        try:
+            if ini.libngspice == "":
+                raise OSError("no 'libngspice' configured in the main "
+                              "configuration file [commands]")
+            _shared["instance"] = _NGspiceShared(ini.libngspice)
+        except (OSError, AttributeError) as err:
+            print("Warning: shared NGspice library not available ({}); "
+                  "NGspice runs as a process.".format(err))
+    ng = _shared["instance"]
+    if ng is not None and ng.exited:
+        print("Warning: the shared NGspice library exited; NGspice runs as "
+              "a process.")
+        _shared["instance"] = ng = None
+    return ng
+
+def rawName(name, vtype):
+    """
+    Returns the name of an in-memory vector as NGspice writes it in a raw
+    file: v(out) for the node voltage 'out', i(v1) for the branch current
+    'v1#branch'.
+
+    :param name: Vector name
+    :type name: str
+
+    :param vtype: Vector type
+    :type vtype: int
+
+    :return: Raw-file name
+    :rtype: str
+    """
+    if name.endswith("#branch"):
+        return "i(" + name[:-len("#branch")] + ")"
+    if vtype == _SV_VOLTAGE and "(" not in name and "-sweep" not in name:
+        return "v(" + name + ")"
+    if vtype == _SV_CURRENT and not name.lower().startswith("i("):
+        return "i(" + name + ")"
+    return name
+
+def plotData(ng, plot):
+    """
+    Returns the plot name as written in a raw file, the name of the sweep
+    variable ('' for an operating point) and the vectors of 'plot' as a list
+    of (raw-file name, array), the sweep variable first.
+
+    :param ng: The library instance
+    :type ng: _NGspiceShared
+
+    :param plot: Name of the plot, e.g. 'tran3'
+    :type plot: str
+
+    :return: (plot name, sweep variable name, vectors)
+    :rtype: tuple
+    """
+    prefix = plot.rstrip("0123456789")
+    title  = _PLOT_NAMES.get(prefix, plot)
+    vecs   = ng.vectors(plot)
+    scale  = ""
+    if prefix != "op":
+        for i, (name, vtype, data) in enumerate(vecs):
+            if vtype in (_SV_TIME, _SV_FREQUENCY) or name.endswith("-sweep"):
+                scale = name
+                vecs.insert(0, vecs.pop(i))
+                break
+    out = [(rawName(name, vtype), data) for name, vtype, data in vecs]
+    if scale:
+        scale = out[0][0]
+    return title, scale, out
@@ -3,8 +3,15 @@
 """
 SLiCAP module with math functions.
 """
-import numbers
+import os
 import sys
+import pickle as _pickle
+import hashlib as _hashlib
+import numbers
+import time as _time
+import queue as _queue
+import atexit as _atexit
+import threading as _threading
 import subprocess
 import sympy as sp
 import numpy as np
@@ -14,11 +21,10 @@ np.seterr(all = 'ignore')
 import SLiCAP.SLiCAPconfigure as ini
 from numpy.polynomial import Polynomial
 from numpy import trapezoid
-from scipy.integrate import quad
-from scipy.optimize import fsolve
 from SLiCAP.SLiCAPlex import _replaceScaleFactors, _sympify
-from pytexit import py2tex
 from copy import deepcopy
+from collections import OrderedDict as _OrderedDict
+from SLiCAP.SLiCAPcache import _evictLRU, _pickleAtomic
 
 def det(M, method="ME"):
     """
@@ -37,16 +43,34 @@ def det(M, method="ME"):
                      'slicap_det' (see SLiCAP_GiNAC.md). The command is
                      configured in the main configuration file [commands]; if it is not
                      available, det() falls back to 'ME' (same result,
-                     computed in Python).
+                     computed in Python). Protocol 2 engines run as a
+                     persistent co-process that is reused by all calls.
                    - BS: deprecated (removed); redirected to 'ME'
                    - LU: Sympy built-in LU method
                    - bareiss: Sympy built-in Bareis method
 
+    Determinants are cached by a hash of the matrix, the method and
+    ini.reduce_matrix: in memory for the last ini.det_cache determinants and,
+    if ini.det_disk_cache == True, in the project results directory, see
+    _detCacheGet().
+
     :return: Determinant of 'M'
     :rtype:  sympy.Expr
     """
     M = float2rational(
         sp.Matrix(M))  # Have a Mutable Matrix with rational numbers
+    key = _detKey(M, method)
+    D = _detCacheGet(key)
+    if D is None:
+        D = _det(M, method)
+        _detCachePut(key, D)
+    return D
+
+def _det(M, method):
+    """
+    Returns the determinant of the square matrix 'M' with rational numbers,
+    without using the determinant cache; see det().
+    """
     factor = 1
     if M.shape[0] != M.shape[1]:
         print("ERROR: Cannot determine determinant of non-square matrix.")
@@ -83,11 +107,262 @@ def det(M, method="ME"):
         D = None
     return D
 
+def _detList(matrices, method="ME"):
+    """
+    Returns the list with determinants of a list of square matrices.
+
+    With method 'MECPP' all matrices are sent to the slicap_det engine in one
+    round trip (see _detMECPPlist); other methods call det() per matrix.
+
+    :param matrices: List with sympy matrices
+    :type matrices: list
+
+    :param method: Method used, see det()
+    :type method: str
+
+    :return: List with determinants
+    :rtype: list
+    """
+    if method == "MECPP" and len(matrices) > 1:
+        Ms = [float2rational(sp.Matrix(M)) for M in matrices]
+        if all([M.shape[0] == M.shape[1] for M in Ms]):
+            keys = [_detKey(M, method) for M in Ms]
+            dets = [_detCacheGet(key) for key in keys]
+            todo = [i for i in range(len(Ms)) if dets[i] is None]
+            if len(todo) > 0:
+                newDets = _detMECPPlist([Ms[i] for i in todo])
+                if newDets is not None:
+                    for i, D in zip(todo, newDets):
+                        dets[i] = D
+                        _detCachePut(keys[i], D)
+            if all([D is not None for D in dets]):
+                return dets
+            method = "ME" # engine unavailable or failed; warning already printed
+    return [det(M, method=method) for M in matrices]
+
+# In-memory tier of the determinant cache: key -> determinant
+_det_cache = _OrderedDict()
+
+def _detKey(M, method):
+    """
+    Returns the key of the determinant of 'M' in the determinant cache: a
+    hash of the shape and the entries of 'M' (sympy.srepr, hence including
+    the assumptions of the symbols), the method, and ini.reduce_matrix.
+    Returns None if the cache is disabled or 'M' is not square.
+
+    :param M: Sympy matrix with rational numbers
+    :type M: sympy.Matrix
+
+    :param method: Method used, see det()
+    :type method: str
+
+    :return: Key
+    :rtype: str, NoneType
+    """
+    if (ini.det_cache <= 0 and not ini.det_disk_cache) or \
+       M.shape[0] != M.shape[1]:
+        return None
+    h = _hashlib.sha256()
+    h.update(repr((method, ini.reduce_matrix, M.shape)).encode())
+    for value in M:
+        h.update(sp.srepr(value).encode())
+        h.update(b';')
+    return h.hexdigest()
+
+def _detCacheFile(key):
+    """
+    Returns the name of the file of the disk tier of the determinant cache
+    for 'key'.
+    """
+    return os.path.join(ini.results_path, 'det_cache', key + '.pkl')
+
+def _detCacheGet(key):
+    """
+    Returns the determinant for 'key' from the determinant cache, or None.
+
+    The disk tier is a directory 'det_cache' in the project results
+    directory with one pickle file per determinant. It is used if
+    ini.det_disk_cache == True, so that repeated runs of a script skip the
+    determinants that have been calculated before. ini.det_disk_cache_size
+    bounds its size in MB (0: no limit); the least recently used files are
+    removed first, see _detCacheEvict(). Delete the directory to clear it.
+    """
+    if key is None:
+        return None
+    if key in _det_cache:
+        _det_cache.move_to_end(key)
+        return _det_cache[key]
+    if ini.det_disk_cache:
+        fileName = _detCacheFile(key)
+        try:
+            with open(fileName, 'rb') as f:
+                D = _pickle.load(f)
+            os.utime(fileName) # most recently used
+        except (OSError, EOFError, _pickle.UnpicklingError):
+            return None
+        _detCachePut(key, D, disk=False)
+        return D
+    return None
+
+def _detCachePut(key, D, disk=True):
+    """
+    Stores the determinant 'D' for 'key' in the determinant cache.
+    """
+    if key is None or D is None:
+        return
+    if ini.det_cache > 0:
+        _det_cache[key] = D
+        _det_cache.move_to_end(key)
+        while len(_det_cache) > ini.det_cache:
+            _det_cache.popitem(last=False)
+    if disk and ini.det_disk_cache:
+        # Step workers and scripts in the same project may store the same
+        # determinant at once
+        size = _pickleAtomic(_detCacheFile(key), D)
+        if size is not None:
+            _detCacheEvict(size)
+
+# Size in bytes of the disk tier of the determinant cache, as far as known
+# by this process: None until _detCacheEvict() has scanned the directory
+_det_disk_bytes = [None]
+
+def _detCacheEvict(size):
+    """
+    Adds 'size' bytes to the size of the disk tier of the determinant cache
+    and removes its least recently used files if it exceeds
+    ini.det_disk_cache_size MB.
+
+    The directory is scanned once per process, and again only if the size
+    counted since then exceeds the limit: other processes may have added or
+    removed files in the mean time.
+
+    :param size: Size in bytes of a file that has been written to the cache
+    :type size: int
+    """
+    maxBytes = ini.det_disk_cache_size * 1e6
+    if maxBytes <= 0:
+        return
+    if _det_disk_bytes[0] is not None:
+        _det_disk_bytes[0] += size
+        if _det_disk_bytes[0] <= maxBytes:
+            return
+    _det_disk_bytes[0] = _evictLRU(os.path.dirname(_detCacheFile('')),
+                                   maxBytes)
+
+def _cofactors(M, rows, cols, method="ME"):
+    """
+    Returns the cofactors of the matrix 'M' for all combinations of the row
+    numbers in 'rows' and the column numbers in 'cols'.
+
+    With method 'ME' all cofactors are obtained from one minor expansion (see
+    _cofactorsME()), at about the cost of one determinant. With other
+    methods the minors are passed to _detList() at once, hence with method
+    'MECPP' they are calculated in a single round trip.
+
+    :param M: Square sympy matrix
+    :type M: sympy.Matrix
+
+    :param rows: Row numbers
+    :type rows: list
+
+    :param cols: Column numbers
+    :type cols: list
+
+    :param method: Method used, see det()
+    :type method: str
+
+    :return: Dictionary with key-value pairs:
+
+             - key  : (row, col)
+             - value: cofactor of M[row, col]
+    :rtype: dict
+    """
+    M = sp.Matrix(M)
+    keys = [(i, j) for j in cols for i in rows]
+    if M.shape[0] == 1:
+        # The minor of a 1x1 matrix is the empty matrix, its determinant is 1
+        return {key: sp.Integer(1) for key in keys}
+    if method == "ME":
+        return _cofactorsME(float2rational(M), rows, cols)
+    minors = _detList([M.minor_submatrix(i, j) for (i, j) in keys],
+                      method=method)
+    cofactors = {}
+    for k in range(len(keys)):
+        if sum(keys[k]) % 2:
+            cofactors[keys[k]] = -minors[k]
+        else:
+            cofactors[keys[k]] = minors[k]
+    return cofactors
+
+def _cofactorsME(M, rows, cols):
+    """
+    Returns the cofactors of the matrix 'M' for all combinations of the row
+    numbers in 'rows' and the column numbers in 'cols' from one minor
+    expansion per column.
+
+    If ini.reduce_matrix == True, the variables are first eliminated with
+    pivots outside 'rows' and 'cols'. This multiplies all these cofactors by
+    the same factor as the determinant (see _eliminate()).
+
+    The cofactors of the entries of column 'col' are the minors of the first
+    level of the expansion of the determinant along the other columns after
+    'col' (see _detME()). They are calculated with the memoized minors of
+    _minorsME(), so that they share their sub-minors: together they cost
+    about as much as the determinant of 'M'.
+
+    :param M: Square sympy matrix with rational numbers and dim >= 2
+    :type M: sympy.Matrix
+
+    :param rows: Row numbers
+    :type rows: list
+
+    :param cols: Column numbers
+    :type cols: list
+
+    :return: Dictionary with key-value pairs:
+
+             - key  : (row, col)
+             - value: cofactor of M[row, col]
+    :rtype: dict
+    """
+    factor = 1
+    rowNums = list(range(M.shape[0]))
+    colNums = list(range(M.shape[1]))
+    if ini.reduce_matrix:
+        M, factor, rowNums, colNums = _eliminate(M, rows, cols)
+    dim = M.shape[0]
+    full = (1 << dim) - 1
+    # Rows with nonzero entries in each column
+    colRows = [[i for i in range(dim) if M[i, j] != 0] for j in range(dim)]
+    cofactors = {}
+    for col in cols:
+        reducedCol = colNums.index(col)
+        order = [j for j in range(dim) if j != reducedCol]
+        order.sort(key=lambda j: len(colRows[j]))
+        minor = _minorsME(M, order, colRows)
+        ranks = sorted(order)
+        sign = _permutationSign([ranks.index(j) for j in order])
+        for row in rows:
+            reducedRow = rowNums.index(row)
+            D = minor(full & ~(1 << reducedRow))
+            if (reducedRow + reducedCol) % 2:
+                D = -D
+            if sign < 0:
+                D = -D
+            if factor != 1:
+                D = sp.expand(factor * D)
+            cofactors[(row, col)] = D
+    return cofactors
+
 def _eliminateVars(M, method):
     """
     Reduces the size of a matrix through division-free elimination of variables.
     Returns matrix with dim >= 1 and a multiplication factor for the determinant.
 
+    The elimination works on a dictionary of keys with the nonzero entries
+    and the numeric pivots are selected with the Markowitz criterion (see
+    _markowitzPivot()) to minimize the fill-in.
+
     :param M: sympy matrix
     :type M: sympy.Matrix()
 
@@ -103,80 +378,376 @@ def _eliminateVars(M, method):
 
     The returned factor 
     """
-    factor = 1  # Scaling factor for determinant
-    dim = M.shape[0]
-    k, l = _find_numeric_entry(M)
-    while k >= 0 and dim > 1:
-        factor *= M[k, l]
-        if (k+l) % 2:
-            factor *= -1
-        for i in range(dim):
-            if M[i, l] != 0 and i != k:  # Test on zero increases speed
-                for j in range(dim):
-                    if M[k, j] != 0 and j != l:  # Test on zero increases speed
-                        M[i, j] = sp.expand(M[i, j] - M[i, l]*M[k, j]/M[k, l])
-        # remove row k and column l
-        M = M.minor_submatrix(k, l)
-        # reduce dimension
-        dim -= 1
-        k, l = _find_numeric_entry(M)
+    M, factor, rows, cols = _eliminate(M)
     return M, factor
 
-def _find_numeric_entry(M):
+def _eliminate(M, keepRows=(), keepCols=()):
     """
-    Returns the (row, col) position of the first numeric entry in the matrix.
+    Eliminates variables as described in _eliminateVars(), without pivots in
+    the rows 'keepRows' and the columns 'keepCols', and returns the reduced
+    matrix, the factor, and the numbers of the remaining rows and columns.
+
+    The cofactors of the reduced matrix for the kept rows and columns, times
+    the factor, equal those of the original matrix: removing a row i and a
+    column c from both matrices changes the sign of a pivot elimination as
+    often as it changes the signs of the cofactor of (i, c).
 
     :param M: sympy matrix
     :type M: sympy.Matrix()
-    
+
+    :param keepRows: Numbers of the rows that may not contain pivots
+    :type keepRows: list, tuple
+
+    :param keepCols: Numbers of the columns that may not contain pivots
+    :type keepCols: list, tuple
+
+    :return: (M, factor, rows, cols)
+    :rtype: tuple
+    """
+    factor = 1  # Scaling factor for determinant
+    dok = M.todok()
+    # Remaining rows and columns, in the order of the original matrix
+    rows = list(range(M.shape[0]))
+    cols = list(range(M.shape[1]))
+    # Sparsity pattern
+    rowCols = {i: set() for i in rows}
+    colRows = {j: set() for j in cols}
+    for (i, j) in dok.keys():
+        rowCols[i].add(j)
+        colRows[j].add(i)
+    k, l = _markowitzPivot(dok, rowCols, colRows, keepRows, keepCols)
+    while k >= 0 and len(rows) > 1:
+        pivot = dok[(k, l)]
+        factor *= pivot
+        if (rows.index(k) + cols.index(l)) % 2:
+            factor *= -1
+        for i in colRows[l] - {k}:
+            ratio = dok[(i, l)]/pivot
+            for j in rowCols[k] - {l}:
+                value = sp.expand(dok.get((i, j), 0) - ratio*dok[(k, j)])
+                if value != 0:
+                    dok[(i, j)] = value
+                    rowCols[i].add(j)
+                    colRows[j].add(i)
+                elif (i, j) in dok:
+                    del dok[(i, j)]
+                    rowCols[i].discard(j)
+                    colRows[j].discard(i)
+        # remove row k and column l
+        for j in rowCols[k]:
+            del dok[(k, j)]
+            colRows[j].discard(k)
+        for i in colRows[l]:
+            if i != k:
+                del dok[(i, l)]
+                rowCols[i].discard(l)
+        del rowCols[k], colRows[l]
+        rows.remove(k)
+        cols.remove(l)
+        k, l = _markowitzPivot(dok, rowCols, colRows, keepRows, keepCols)
+    M = sp.zeros(len(rows))
+    for (i, j), value in dok.items():
+        M[rows.index(i), cols.index(j)] = value
+    return M, factor, rows, cols
+
+def _markowitzPivot(dok, rowCols, colRows, keepRows=(), keepCols=()):
+    """
+    Returns the (row, col) position of the numeric entry with the lowest
+    Markowitz count (r-1)*(c-1), in which r and c are the numbers of nonzero
+    entries in its row and its column, respectively. This count is an upper
+    bound for the fill-in caused by its elimination.
+
+    :param dok: Dictionary with key-value pairs:
+
+                - key  : (row, col)
+                - value: nonzero matrix entry
+    :type dok: dict
+
+    :param rowCols: Dictionary with key-value pairs:
+
+                    - key  : row number
+                    - value: set with column numbers of nonzero entries
+    :type rowCols: dict
+
+    :param colRows: Dictionary with key-value pairs:
+
+                    - key  : column number
+                    - value: set with row numbers of nonzero entries
+    :type colRows: dict
+
+    :param keepRows: Row numbers that may not be selected
+    :type keepRows: list, tuple
+
+    :param keepCols: Column numbers that may not be selected
+    :type keepCols: list, tuple
+
     :return: (row, col)
-    
-             - row (int): row number of first numeric entry (-1 if not found)
-             - col (int): column number of first numeric entry (-1 if not found)
-    :rtype: tuple         
+
+             - row (int): row number of the pivot (-1 if not found)
+             - col (int): column number of the pivot (-1 if not found)
+    :rtype: tuple
     """
-    dim = M.shape[0]
-    r, c = -1, -1
-    for i in range(dim):
-        for j in range(dim):
-            if M[i, j] != 0 and M[i, j].is_number:
-                return i, j
-    return r, c
+    pivot, count = (-1, -1), None
+    for (i, j), value in dok.items():
+        if value.is_number and i not in keepRows and j not in keepCols:
+            c = (len(rowCols[i]) - 1)*(len(colRows[j]) - 1)
+            if count is None or c < count:
+                pivot, count = (i, j), c
+                if c == 0:
+                    break
+    return pivot
+
+# Upper bound for the memory of the minor cache of _detME, expressed in the
+# total number of terms of the cached minors; least recently used minors are
+# dropped first.
+_detME_cache_terms = 2**20
 
 def _detME(M):
+    """
+    Returns the determinant of a square matrix with dim >= 2, calculated by
+    minor expansion along the columns with memoization of the minors.
+
+    Expansion along column 'col' of the minor that consists of the columns
+    col ... dim-1 and the rows in the bitmask 'rows', yields minors of the
+    columns col+1 ... dim-1. Hence, the bitmask of the remaining rows fully
+    identifies a minor and each minor is calculated only once: the cost is
+    about 2^dim*dim multiplications instead of dim!.
+
+    Structurally zero entries are skipped using the sparsity pattern of the
+    columns and no intermediate matrices are created. The columns are
+    expanded in the order of increasing numbers of nonzero entries (minimum
+    degree ordering): sparse columns first keep the number of distinct minors
+    small.
+
+    :param M: Square sympy matrix
+    :type M: sympy.Matrix
+
+    :return: Determinant of 'M'
+    :rtype: sympy.Expr
+    """
     dim = M.shape[0]
-    if dim == 2:
-        D = M[0, 0]*M[1, 1] - M[1, 0]*M[0, 1]
-    else:
-        D = 0
-        for row in range(dim):
-            if M[row, 0] != 0:
-                minor = _detME(M.minor_submatrix(row, 0))
-                if minor != 0:
-                    if row % 2:
-                        D += -M[row, 0] * minor
-                    else:
-                        D += M[row, 0] * minor
-    return sp.expand(D)
+    # Rows with nonzero entries in each column
+    colRows = [[i for i in range(dim) if M[i, j] != 0] for j in range(dim)]
+    order = sorted(range(dim), key=lambda j: len(colRows[j]))
+    D = _minorsME(M, order, colRows)((1 << dim) - 1)
+    if _permutationSign(order) < 0:
+        D = -D
+    return D
+
+def _minorsME(M, order, colRows):
+    """
+    Returns a function that returns the minor of 'M' of the rows in a bitmask
+    and the columns in 'order', in this order, for bitmasks with as many rows
+    as there are columns in 'order'. The minors are calculated by expansion
+    along the columns in 'order' and memoized with the bitmask of the
+    remaining rows as key (see _detME()).
+
+    :param M: Square sympy matrix
+    :type M: sympy.Matrix
+
+    :param order: Column numbers
+    :type order: list
+
+    :param colRows: Lists with the rows of the nonzero entries of each column
+                    of 'M'
+    :type colRows: list
+
+    :return: Function of the row bitmask
+    :rtype: function
+    """
+    dim = M.shape[0]
+    size = len(order)
+    colRows = [colRows[j] for j in order]
+    entries = [[M[i, j] for j in order] for i in range(dim)]
+    cache = _OrderedDict()
+    cache_terms = [0]
+
+    def minor(rows):
+        if rows in cache:
+            cache.move_to_end(rows)
+            return cache[rows][0]
+        col = size - bin(rows).count("1")
+        if col == size:
+            # The minor without rows and columns
+            return sp.Integer(1)
+        elif col == size - 1:
+            return entries[rows.bit_length() - 1][col]
+        elif col == size - 2:
+            r0, r1 = [i for i in range(dim) if rows >> i & 1]
+            D = entries[r0][col]*entries[r1][col+1] - entries[r1][col]*entries[r0][col+1]
+        else:
+            D = 0
+            for row in colRows[col]:
+                if rows >> row & 1:
+                    sub = minor(rows & ~(1 << row))
+                    if sub != 0:
+                        # Sign: position of the row in the minor
+                        if bin(rows & ((1 << row) - 1)).count("1") % 2:
+                            D += -entries[row][col] * sub
+                        else:
+                            D += entries[row][col] * sub
+        D = sp.expand(D)
+        terms = len(D.args) if D.is_Add else 1
+        cache[rows] = (D, terms)
+        cache_terms[0] += terms
+        while cache_terms[0] > _detME_cache_terms and len(cache) > 1:
+            cache_terms[0] -= cache.popitem(last=False)[1][1]
+        return D
+
+    return minor
+
+def _permutationSign(perm):
+    """
+    Returns the sign of a permutation of 0 ... len(perm)-1.
+
+    :param perm: Permutation
+    :type perm: list
+
+    :return: 1 for an even permutation, -1 for an odd permutation
+    :rtype: int
+    """
+    sign = 1
+    visited = [False] * len(perm)
+    for i in range(len(perm)):
+        if not visited[i]:
+            # A cycle of length n consists of n-1 transpositions
+            j = i
+            length = 0
+            while not visited[j]:
+                visited[j] = True
+                j = perm[j]
+                length += 1
+            if length % 2 == 0:
+                sign = -sign
+    return sign
 
 # State for the external C++/GiNaC determinant engine (method 'MECPP') and
-# one-time deprecation warnings; see SLiCAP_GiNAC.md.
-_mecpp_state = {"checked": False, "ok": False,
+# one-time deprecation warnings; see SLiCAP_GiNAC.md. 'protocol' is the
+# engine's protocol number: 1 = one process per determinant, 2 = also a
+# long-lived '--server' co-process (see _DetServer).
+_mecpp_state = {"checked": False, "ok": False, "protocol": 0,
                 "warned_missing": False, "warned_bs": False}
 
-def _detMECPP(M):
+# Running slicap_det --server co-processes, reused by all det() calls of this
+# Python process; started on demand, at most ini.det_servers of them.
+_mecpp_pool = []
+
+class _DetServer(object):
     """
-    Computes the determinant of 'M' with the external C++/GiNaC engine
-    'slicap_det' (source: ginac_det/, see SLiCAP_GiNAC.md), using SLiCAP's
-    own ME algorithm compiled with exact rational arithmetic.
+    A long-lived 'slicap_det --server' co-process (protocol 2).
 
-    Returns the determinant as a sympy expression, or None when the engine
-    is not configured, incompatible, or fails — det() then falls back to
-    the Python 'ME' implementation, which remains the reference.
+    Requests and responses are framed on stdin/stdout (see det_cli.cpp):
 
-    :param M: Square sympy matrix with rational numeric entries
-              (float2rational must have been applied).
-    :type M: sympy.Matrix
+    - request : '@det <count> ME <reduce>' followed by <count> matrices in the
+      single-shot input format;
+    - response: '@ok <count>' followed by <count> determinants, one per line,
+      or a single '@err <message>' line.
+
+    A reader thread moves the output lines into a queue, so that a response
+    can be awaited with a timeout on every platform.
+    """
+    def __init__(self, cmd):
+        self.proc = subprocess.Popen([cmd, "--server"],
+                                     stdin=subprocess.PIPE,
+                                     stdout=subprocess.PIPE,
+                                     stderr=subprocess.DEVNULL,
+                                     text=True, bufsize=1)
+        self.lines = _queue.Queue()
+        reader = _threading.Thread(target=self._read, daemon=True)
+        reader.start()
+
+    def _read(self):
+        for line in self.proc.stdout:
+            self.lines.put(line.rstrip("\r\n"))
+        self.lines.put(None) # EOF: the engine stopped or crashed
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def send(self, payloads, reduce):
+        """
+        Writes one request frame with the matrices in 'payloads'.
+        """
+        self.proc.stdin.write("@det {} ME {}\n".format(len(payloads),
+                                                       int(bool(reduce))))
+        self.proc.stdin.write("".join(payloads))
+        self.proc.stdin.flush()
+
+    def receive(self, deadline):
+        """
+        Returns the list with determinant strings of one response frame.
+        Raises RuntimeError on an '@err' response, a crash, or a timeout
+        (deadline: time.monotonic() value, or None for no timeout).
+        """
+        header = self._line(deadline)
+        if header.startswith("@err"):
+            raise RuntimeError(header[4:].strip() or "no message")
+        if not header.startswith("@ok "):
+            raise RuntimeError("unexpected response: " + header[:60])
+        return [self._line(deadline) for i in range(int(header[4:]))]
+
+    def _line(self, deadline):
+        timeout = None
+        if deadline != None:
+            timeout = max(deadline - _time.monotonic(), 0)
+        try:
+            line = self.lines.get(timeout=timeout)
+        except _queue.Empty:
+            raise RuntimeError("timeout after {} s".format(ini.det_timeout))
+        if line == None:
+            raise RuntimeError("engine stopped")
+        return line
+
+    def close(self):
+        """
+        Stops the co-process politely with '@quit'; used at exit.
+        """
+        try:
+            if self.alive():
+                self.proc.stdin.write("@quit\n")
+                self.proc.stdin.flush()
+                self.proc.wait(timeout=1)
+        except Exception:
+            pass
+        if self.alive():
+            self.kill()
+
+    def kill(self):
+        """
+        Kills the co-process at once; used after a timeout or an error, when
+        it may be busy or out of step with the protocol.
+        """
+        try:
+            self.proc.kill()
+            self.proc.wait()
+        except Exception:
+            pass
+
+def _closeDetServers():
+    """
+    Stops all slicap_det co-processes; registered with atexit. Also usable
+    after changing ini.slicap_det.
+    """
+    while _mecpp_pool:
+        _mecpp_pool.pop().close()
+
+_atexit.register(_closeDetServers)
+
+def _forgetDetServers():
+    """
+    Empties the list with co-processes in a forked child process, such as a
+    step worker, without stopping them: their pipes and reader threads belong
+    to the parent process. The child starts its own servers on demand.
+    """
+    del _mecpp_pool[:]
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forgetDetServers)
+
+def _checkMECPP():
+    """
+    Returns True if the configured slicap_det engine is usable. The engine is
+    probed once ('--version'); warnings are printed once.
     """
     cmd = ini.slicap_det
     if cmd == "":
@@ -185,26 +756,35 @@ def _detMECPP(M):
                   "the main configuration file [commands]; det(method='MECPP') falls "
                   "back to 'ME'.")
             _mecpp_state["warned_missing"] = True
-        return None
+        return False
     if not _mecpp_state["checked"]:
         _mecpp_state["checked"] = True
         try:
             r = subprocess.run([cmd, "--version"], capture_output=True,
                                text=True)
-            _mecpp_state["ok"] = (r.returncode == 0 and
-                                  r.stdout.startswith("slicap_det protocol 1"))
+            words = r.stdout.split()
+            if (r.returncode == 0 and words[0:2] == ["slicap_det", "protocol"]
+                    and words[2].isdigit()):
+                _mecpp_state["protocol"] = int(words[2])
+            _mecpp_state["ok"] = _mecpp_state["protocol"] >= 1
         except Exception:
             _mecpp_state["ok"] = False
         if not _mecpp_state["ok"]:
             print("Warning: '{}' is not a compatible slicap_det "
-                  "(protocol 1); det(method='MECPP') falls back to "
+                  "(protocol 1 or 2); det(method='MECPP') falls back to "
                   "'ME'.".format(cmd))
-    if not _mecpp_state["ok"]:
-        return None
-    # The wire format carries only alias names (sym0, sym1, ...): sympy
-    # symbol names may be unlexable for GiNaC (e.g. the leading underscore
-    # of _LGREF_1 in loop-gain analyses), and mapping the aliases back to
-    # the ORIGINAL symbol objects preserves assumptions exactly.
+    return _mecpp_state["ok"]
+
+def _mecppPayload(M):
+    """
+    Returns the wire format of the (rationalized) matrix 'M' and the
+    dictionary that maps the symbol aliases back to the original symbols.
+
+    The wire format carries only alias names (sym0, sym1, ...): sympy
+    symbol names may be unlexable for GiNaC (e.g. the leading underscore
+    of _LGREF_1 in loop-gain analyses), and mapping the aliases back to
+    the ORIGINAL symbol objects preserves assumptions exactly.
+    """
     syms = sorted(M.free_symbols, key=lambda x: x.name)
     fwd = {s: sp.Symbol("sym{}".format(k)) for k, s in enumerate(syms)}
     rev = {a: s for s, a in fwd.items()}
@@ -214,28 +794,124 @@ def _detMECPP(M):
     for i in range(dim):
         for j in range(dim):
             lines.append(str(M[i, j]).replace("**", "^"))
-    args = [cmd, "--method", "ME"]
-    if not ini.reduce_matrix:
-        args.append("--no-reduce")
+    return "\n".join(lines) + "\n", rev
+
+def _mecppResult(text, rev):
+    """
+    Converts a determinant returned by slicap_det into a sympy expression in
+    the original symbols.
+    """
+    D = _sympify(text.strip().replace("^", "**"),
+                 locals={"Pi": sp.pi, "E": sp.E, "I": sp.I})
+    return D.xreplace({a: rev[a] for a in D.free_symbols if a in rev})
+
+def _detMECPP(M):
+    """
+    Computes the determinant of 'M' with the external C++/GiNaC engine
+    'slicap_det' (source: ginac_det/, see SLiCAP_GiNAC.md), using SLiCAP's
+    own ME algorithm compiled with exact rational arithmetic.
+
+    Returns the determinant as a sympy expression, or None when the engine
+    is not configured, incompatible, or fails — det() then falls back to
+    the Python 'ME' implementation, which remains the reference.
+
+    :param M: Square sympy matrix with rational numeric entries
+              (float2rational must have been applied).
+    :type M: sympy.Matrix
+    """
+    D = _detMECPPlist([M])
+    if D is None:
+        return None
+    return D[0]
+
+def _detMECPPlist(matrices):
+    """
+    Computes the determinants of a list of square matrices with the external
+    engine 'slicap_det' in one round trip: protocol 2 engines receive them as
+    one batch, split over at most ini.det_servers co-processes; protocol 1
+    engines are started once per matrix.
+
+    Returns a list with sympy expressions, or None if the engine is not
+    available or fails; the caller then falls back to 'ME'.
+
+    :param matrices: Square sympy matrices with rational numeric entries
+                     (float2rational must have been applied).
+    :type matrices: list
+    """
+    if not _checkMECPP():
+        return None
+    payloads = [_mecppPayload(M) for M in matrices]
     try:
-        r = subprocess.run(args, input="\n".join(lines) + "\n",
-                           capture_output=True, text=True)
-    except Exception as e:
+        if _mecpp_state["protocol"] >= 2:
+            dets = _mecppServe([p[0] for p in payloads])
+        else:
+            dets = [_mecppRun(p[0]) for p in payloads]
+    except RuntimeError as e:
         print("Warning: slicap_det failed ({}); falling back to 'ME'.".format(e))
         return None
-    if r.returncode != 0:
-        msg = r.stderr.strip().splitlines()
-        msg = msg[0] if msg else "no message"
-        print("Warning: slicap_det returned an error ({}); falling back "
-              "to 'ME'.".format(msg))
-        return None
     try:
-        D = _sympify(r.stdout.strip().replace("^", "**"),
-                     locals={"Pi": sp.pi, "E": sp.E, "I": sp.I})
+        return [_mecppResult(dets[i], payloads[i][1])
+                for i in range(len(dets))]
     except Exception:
         print("Warning: could not parse slicap_det output; falling back to 'ME'.")
         return None
-    return D.xreplace({a: rev[a] for a in D.free_symbols if a in rev})
+
+def _mecppRun(payload):
+    """
+    Protocol 1: runs one slicap_det process for a single matrix and returns
+    its output text.
+    """
+    args = [ini.slicap_det, "--method", "ME"]
+    if not ini.reduce_matrix:
+        args.append("--no-reduce")
+    try:
+        r = subprocess.run(args, input=payload, capture_output=True, text=True,
+                           timeout=ini.det_timeout or None)
+    except subprocess.TimeoutExpired:
+        raise RuntimeError("timeout after {} s".format(ini.det_timeout))
+    except Exception as e:
+        raise RuntimeError(str(e))
+    if r.returncode != 0:
+        msg = r.stderr.strip().splitlines()
+        raise RuntimeError(msg[0] if msg else "no message")
+    return r.stdout
+
+def _mecppServe(payloads):
+    """
+    Protocol 2: sends the matrices to the slicap_det co-processes in
+    contiguous shards, one request frame per co-process, and returns the
+    determinant strings in the order of 'payloads'.
+
+    A co-process that crashed, timed out or returned garbage is killed and
+    removed from the pool; it is restarted on the next call.
+    """
+    nServers = max(1, min(ini.det_servers, len(payloads)))
+    while len(_mecpp_pool) < nServers:
+        try:
+            _mecpp_pool.append(_DetServer(ini.slicap_det))
+        except Exception as e:
+            raise RuntimeError(str(e))
+    size = -(-len(payloads) // nServers)
+    shards = [payloads[i: i + size] for i in range(0, len(payloads), size)]
+    servers = _mecpp_pool[0: len(shards)]
+    deadline = None
+    if ini.det_timeout:
+        deadline = _time.monotonic() + ini.det_timeout
+    dets = []
+    try:
+        for i in range(len(shards)):
+            servers[i].send(shards[i], ini.reduce_matrix)
+        for server in servers:
+            dets += server.receive(deadline)
+    except Exception as e:
+        # A co-process may now be busy or out of step with the protocol:
+        # kill all co-processes of this request, they are restarted on the
+        # next call.
+        for server in servers:
+            server.kill()
+            _mecpp_pool.remove(server)
+        raise RuntimeError(str(e))
+    return dets
 
 def _Roots(expr, var):
     if isinstance(expr, sp.Basic) and isinstance(var, sp.Symbol):
@@ -685,6 +1361,113 @@ def _checkExpression(expr):
         out = None
     return out
 
+# Fully substituted parameter definitions, see _parSubsEntry(); at most
+# _parSubs_cache_size dictionaries with parameter definitions are cached.
+_parSubs_cache = _OrderedDict()
+_parSubs_cache_size = 32
+
+def _parSubsEntry(parDefs):
+    """
+    Returns the cache entry with the fully substituted parameter definitions
+    of the dictionary 'parDefs'.
+
+    The entry is valid as long as 'parDefs' holds the same parameters with the
+    same value objects: any change, such as defPar(), delPar(), defPars() or
+    the substitution of a step value, creates a new entry.
+
+    :param parDefs: Dictionary with key-value pairs:
+
+                    - key (*sympy.Symbol*): parameter name
+                    - value (*sympy object, int, float*): value of the parameter
+
+    :return: Dictionary with the parameter definitions ('parDefs'), a copy of
+             them ('snapshot'), the parsed definitions ('parsed'), the fully
+             substituted definitions ('resolved') and the parameters that
+             cannot be resolved ('unresolved').
+    :rtype: dict
+    """
+    key = id(parDefs)
+    entry = _parSubs_cache.get(key)
+    if entry != None and entry['parDefs'] is parDefs:
+        snapshot = entry['snapshot']
+        if len(snapshot) == len(parDefs) and all(
+                parDefs.get(param, snapshot) is value
+                for param, value in snapshot.items()):
+            _parSubs_cache.move_to_end(key)
+            return entry
+    entry = {'parDefs'   : parDefs,
+             'snapshot'  : dict(parDefs),
+             'parsed'    : {},
+             'resolved'  : {},
+             'unresolved': set()}
+    _parSubs_cache[key] = entry
+    _parSubs_cache.move_to_end(key)
+    while len(_parSubs_cache) > _parSubs_cache_size:
+        _parSubs_cache.popitem(last=False)
+    return entry
+
+def _parsePar(param, entry):
+    """
+    Returns the definition of 'param' as sympy object, as substituted by
+    fullSubs(), and the parameters on which it depends.
+    """
+    parsed = entry['parsed']
+    if param not in parsed:
+        parDefs = entry['parDefs']
+        symval = _sympify(str(parDefs[param]), rational=True)
+        if isinstance(symval, sp.Rational) and not isinstance(symval, sp.Integer):
+            # Non-integer rational (e.g. Rational(7293,10000)): use
+            # Float to prevent rational-power lockup in sp.N().
+            # Integers, pi, E, sqrt(2) are all left untouched.
+            symval = sp.Float(symval, 15)
+        if isinstance(symval, sp.Basic):
+            deps = [dep for dep in symval.atoms(sp.Symbol) if dep in parDefs]
+        else:
+            deps = []
+        parsed[param] = (symval, deps)
+    return parsed[param]
+
+def _resolvePar(param, entry):
+    """
+    Returns the fully substituted definition of 'param', or None if it depends
+    on a circular or invalid definition. The definitions of the parameters in
+    the dependency tree of 'param' are resolved once, in dependency order, and
+    stored in the cache entry.
+    """
+    resolved   = entry['resolved']
+    unresolved = entry['unresolved']
+    stack      = [param]
+    visiting   = set()
+    while stack:
+        par = stack[-1]
+        if par in resolved or par in unresolved:
+            visiting.discard(par)
+            stack.pop()
+            continue
+        try:
+            symval, deps = _parsePar(par, entry)
+        except Exception:
+            unresolved.add(par)
+            continue
+        if par not in visiting:
+            visiting.add(par)
+            for dep in deps:
+                if dep in visiting:
+                    # Circular definition
+                    unresolved.add(dep)
+                elif dep not in resolved and dep not in unresolved:
+                    stack.append(dep)
+        else:
+            visiting.discard(par)
+            stack.pop()
+            if any(dep in unresolved for dep in deps):
+                unresolved.add(par)
+            elif deps:
+                resolved[par] = symval.xreplace({dep: resolved[dep] for dep in deps})
+            else:
+                resolved[par] = symval
+    return resolved.get(param)
+
 def fullSubs(valExpr, parDefs):
     """
     Returns 'valExpr' after all parameters of 'parDefs' have been substituted
@@ -693,6 +1476,11 @@ def fullSubs(valExpr, parDefs):
 
     The maximum number opf recursive substitutions is set by ini.maxRexSubst.
 
+    The fully substituted parameter definitions are cached per dictionary
+    'parDefs' (see _parSubsEntry()), so that they are parsed and substituted
+    only once; recursive substitution is only applied if 'valExpr' depends on
+    circular definitions.
+
     :param valExpr: Eympy expression in which the parameters should be substituted.
     :type valExpr: sympy.Expr, sympy.Symbol, int, float
 
@@ -705,6 +1493,19 @@ def fullSubs(valExpr, parDefs):
              parameter definitions into 'valExpr'.
     :rtype: sympy object, int, float
     """
+    if isinstance(valExpr, sp.Basic):
+        # Substitute the fully substituted parameter values in a single pass
+        entry = _parSubsEntry(parDefs)
+        substDict = {}
+        for param in valExpr.atoms(sp.Symbol):
+            if param in parDefs:
+                value = _resolvePar(param, entry)
+                if value is None:
+                    # Circular or invalid definition: recursive substitution
+                    break
+                substDict[param] = value
+        else:
+            return float2rational(valExpr.xreplace(substDict))
     strValExpr = str(valExpr)
     i = 0
     newvalExpr = 0
@@ -871,13 +1672,23 @@ def phaseMargin(LaplaceExpr):
 
     :rtype: tuple
     """
+    from scipy.optimize import fsolve
     freqs = []
     mrgns = []
-    if type(LaplaceExpr) != list:
+    if not isinstance(LaplaceExpr, list):
         LaplaceExpr = [LaplaceExpr]
-    for expr in LaplaceExpr:
-        #expr = normalizeRational(sp.N(expr))
-        expr = sp.N(expr)
+    # Stepped results: initial guesses for all steps from one evaluation of
+    # the magnitudes over a frequency grid
+    guesses = _stepUnityGainGuesses(LaplaceExpr)
+    for i in range(len(LaplaceExpr)):
+        if guesses != None and guesses[i] != None:
+            freq, mrgn = _stepPhaseMargin(LaplaceExpr, i, guesses[i])
+            if freq != None:
+                freqs.append(freq)
+                mrgns.append(mrgn)
+                continue
+        #expr = normalizeRational(sp.N(LaplaceExpr[i]))
+        expr = sp.N(LaplaceExpr[i])
         if ini.hz == True:
             data = expr.xreplace({ini.laplace: 2*sp.pi*sp.I*ini.frequency})
         else:
@@ -901,6 +1712,59 @@ def phaseMargin(LaplaceExpr):
         freqs = freqs[0]
     return (mrgns, freqs)
 
+def _stepUnityGainGuesses(loopgains):
+    """
+    Returns a list with initial guesses for the unity-gain frequencies of
+    stepped loop gains: the highest frequency at which the magnitude drops
+    below one on a logarithmic grid, or None for steps without such a
+    crossing. All steps are evaluated with one call of the compiled loop
+    gain (see _stepList).
+
+    :param loopgains: Stepped loop gains.
+    :type loopgains: list
+
+    :return: List with guesses or None if the loop gains cannot be evaluated
+             this way.
+    :rtype: list, NoneType
+    """
+    if not isinstance(loopgains, _stepList):
+        return None
+    f = np.geomspace(1e-3, 1e15, 1801)
+    H = loopgains.freqResponse(f)
+    if H is None:
+        return None
+    above = np.abs(H) >= 1
+    guesses = []
+    for row in above:
+        crossings = np.nonzero(row[:-1] & ~row[1:])[0]
+        if len(crossings):
+            k = crossings[-1]
+            guesses.append(float(np.sqrt(f[k]*f[k+1])))
+        else:
+            guesses.append(None)
+    return guesses
+
+def _stepPhaseMargin(loopgains, step, guess):
+    """
+    Returns the unity-gain frequency and the phase margin of step number
+    *step* of stepped loop gains, using the compiled loop gain.
+
+    :return: Tuple with unity-gain frequency and phase margin, or
+             (None, None) if the frequency cannot be determined.
+    :rtype: tuple
+    """
+    from scipy.optimize import fsolve
+    def func(f):
+        return np.abs(loopgains.freqResponse(np.atleast_1d(f), step=step)[0]) - 1
+    try:
+        freq = float(fsolve(func, guess)[0])
+        mrgn = float(np.angle(loopgains.freqResponse([freq], step=step)[0, 0]))
+    except BaseException:
+        return None, None
+    if ini.hz:
+        mrgn = mrgn * 180/np.pi
+    return freq, mrgn
+
 def _makeNumData(yFunc, xVar, x, normalize=False):
     """
     Returns a list of values y, where y[i] = yFunc(x[i]).
@@ -935,6 +1799,214 @@ def _makeNumData(yFunc, xVar, x, normalize=False):
         y = [sp.N(yFunc) for i in range(len(x))]
     return y
 
+class _stepList(list):
+    """
+    List with the results of an instruction with parameter stepping.
+
+    The results are stored as one symbolic template that holds the step
+    parameters, and their values. The expression for a step is built from the
+    template when it is accessed for the first time. Numeric evaluation of all
+    steps over a sweep is done by evaluate() and freqResponse() with one
+    broadcasted call of a compiled (lambdified) function of the step
+    parameters and the sweep variable.
+
+    Any modification of the list converts it into a list with expressions:
+    the template then no longer represents its contents.
+    """
+    def __init__(self, function, stepDict):
+        self.function = function
+        self.stepVars = list(stepDict.keys())
+        self.stepValues = [list(stepDict[var]) for var in self.stepVars]
+        self._kernels = {}
+        list.__init__(self, [None for i in range(len(self.stepValues[0]))])
+
+    def _build(self, i):
+        newFunction = self.function.xreplace(
+            {self.stepVars[j]: self.stepValues[j][i] for j in range(len(self.stepVars))})
+        return _sympify(str(sp.N(newFunction)), rational=True)
+
+    def _materialize(self):
+        if self.function is not None:
+            for i in range(len(self)):
+                self[i]
+            self.function = None
+            self._kernels = {}
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        value = list.__getitem__(self, i)
+        if value is None and self.function is not None:
+            value = self._build(range(len(self))[i])
+            list.__setitem__(self, i, value)
+        return value
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __reversed__(self):
+        for i in reversed(range(len(self))):
+            yield self[i]
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __eq__(self, other):
+        return list(self) == other
+
+    def __ne__(self, other):
+        return list(self) != other
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __reduce__(self):
+        return (_stepList, (self.function, dict(zip(self.stepVars, self.stepValues))),
+                list.copy(self))
+
+    def __setstate__(self, state):
+        list.__setitem__(self, slice(None), state)
+
+    def __setitem__(self, i, value):
+        self._materialize()
+        list.__setitem__(self, i, value)
+
+    def __delitem__(self, i):
+        self._materialize()
+        list.__delitem__(self, i)
+
+    def __iadd__(self, other):
+        self._materialize()
+        return list.__iadd__(self, other)
+
+    def __contains__(self, value):
+        return value in list(self)
+
+    def append(self, value):
+        self._materialize()
+        list.append(self, value)
+
+    def extend(self, values):
+        self._materialize()
+        list.extend(self, values)
+
+    def insert(self, i, value):
+        self._materialize()
+        list.insert(self, i, value)
+
+    def pop(self, i=-1):
+        self._materialize()
+        return list.pop(self, i)
+
+    def remove(self, value):
+        self._materialize()
+        list.remove(self, value)
+
+    def copy(self):
+        return list(self)
+
+    def index(self, *args):
+        return list(self).index(*args)
+
+    def count(self, value):
+        return list(self).count(value)
+
+    def freeSymbols(self):
+        """
+        Returns the set with symbols in the results other than the step
+        parameters.
+        """
+        if self.function is None:
+            symbols = set()
+            for expr in self:
+                symbols |= sp.N(expr).atoms(sp.Symbol)
+            return symbols
+        return sp.N(self.function).atoms(sp.Symbol) - set(self.stepVars)
+
+    def evaluate(self, var, x, subst=None, step=None):
+        """
+        Evaluates the results of all steps over the values *x* of the variable
+        *var* with one call of a compiled function.
+
+        :param var: Sweep variable
+        :type var: sympy.Symbol
+
+        :param x: Values of the sweep variable
+        :type x: list, numpy.array
+
+        :param subst: Expression that replaces the Laplace variable in the
+                      results; defaults to None (no substitution).
+        :type subst: sympy.Expr, NoneType
+
+        :param step: Step number, or None for all steps. Defaults to None.
+        :type step: int, NoneType
+
+        :return: Array with shape (steps, len(x)), (1, len(x)) for a single
+                 step, or None if the results cannot be evaluated this way
+                 (modified list, matrix results, Heaviside functions,
+                 undefined parameters, or non-finite results); the caller
+                 then evaluates the steps one by one.
+        :rtype: numpy.array, NoneType
+        """
+        if self.function is None:
+            return None
+        key = (var, subst)
+        if key not in self._kernels:
+            kernel = None
+            if isinstance(self.function, sp.Expr):
+                expr = self.function
+                if subst is not None:
+                    expr = expr.xreplace({ini.laplace: subst})
+                expr = sp.N(expr)
+                if len(expr.atoms(sp.Heaviside)) == 0 and \
+                   expr.atoms(sp.Symbol).issubset(set(self.stepVars + [var])):
+                    try:
+                        kernel = sp.lambdify(self.stepVars + [var], expr, ini.lambdify)
+                    except BaseException:
+                        kernel = None
+            self._kernels[key] = kernel
+        kernel = self._kernels[key]
+        if kernel is None:
+            return None
+        if step is None:
+            values = [np.array(vals, dtype=float)[:, None] for vals in self.stepValues]
+        else:
+            values = [np.array([vals[step]], dtype=float)[:, None] for vals in self.stepValues]
+        x = np.asarray(x, dtype=float)[None, :]
+        try:
+            with np.errstate(all='ignore'):
+                y = np.asarray(kernel(*values, x))
+            y = np.broadcast_to(y, (values[0].shape[0], x.shape[1])).copy()
+            if y.dtype == object:
+                y = y.astype(complex)
+        except BaseException:
+            return None
+        if not np.all(np.isfinite(y)):
+            return None
+        return y
+
+    def freqResponse(self, f, step=None):
+        """
+        Returns the complex frequency responses of all steps, or of step
+        number *step*, evaluated at the frequencies *f*, as an array with
+        shape (steps, len(f)), or None (see evaluate()).
+
+        If ini.hz == True, the Laplace variable will be replaced with
+        2*sp.pi*sp.I*ini.frequency, else with sp.I*ini.frequency.
+        """
+        if ini.hz == True:
+            subst = 2*sp.pi*sp.I*ini.frequency
+        else:
+            subst = sp.I*ini.frequency
+        y = self.evaluate(ini.frequency, f, subst=subst, step=step)
+        if y is not None:
+            y = y.astype(complex)
+        return y
+
 def _rational_coeffs_numeric(expr, var):
     """
     Returns (numCoeffs, denCoeffs) as complex lists for a univariate rational
@@ -1005,7 +2077,7 @@ def _freq_response(LaplaceExpr, f):
     with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
         return np.polyval(ncoeffs, jw) / np.polyval(dcoeffs, jw)
 
-def _magFunc_f(LaplaceExpr, f):
+def _magFunc_f(LaplaceExpr, f, H=None):
     """
     Calculates the magnitude at the real frequency f (Fourier) from the
     univariate function 'LaplaceExpr' of the Laplace variable.
@@ -1022,12 +2094,17 @@ def _magFunc_f(LaplaceExpr, f):
     :param f: Frequency value (*float*), or a numpy array with frequency values
               (*float*).
 
+    :param H: Complex response at the frequencies f, if already available (for
+              example, a row of _stepList.freqResponse()). Defaults to None.
+    :type H: numpy.array, NoneType
+
     :return: Magnitude at the specified frequency, or list with magnitudes at
              the specified frequencies.
 
     :rtype: float, numpy.array
     """
-    H = _freq_response(LaplaceExpr, f)
+    if H is None:
+        H = _freq_response(LaplaceExpr, f)
     if H is not None:
         return np.abs(H)
     #LaplaceExpr = normalizeRational(sp.N(LaplaceExpr))
@@ -1043,7 +2120,7 @@ def _magFunc_f(LaplaceExpr, f):
     result = _makeNumData(sp.Abs(data), ini.frequency, f, normalize=False)
     return result
 
-def _dB_magFunc_f(LaplaceExpr, f):
+def _dB_magFunc_f(LaplaceExpr, f, H=None):
     """
     Calculates the dB magnitude at the real frequency f (Fourier) from the
     univariate function 'LaplaceExpr' of the Laplace variable.
@@ -1060,12 +2137,17 @@ def _dB_magFunc_f(LaplaceExpr, f):
     :param f: Frequency value (*float*), or a numpy array with frequency values
               (*float*).
 
+    :param H: Complex response at the frequencies f, if already available (for
+              example, a row of _stepList.freqResponse()). Defaults to None.
+    :type H: numpy.array, NoneType
+
     :return: dB Magnitude at the specified frequency, or list with dB magnitudes
              at the specified frequencies.
 
     :rtype: float, numpy.array
     """
-    H = _freq_response(LaplaceExpr, f)
+    if H is None:
+        H = _freq_response(LaplaceExpr, f)
     if H is not None:
         with np.errstate(divide='ignore', invalid='ignore'):
             return 20 * np.log10(np.abs(H))
@@ -1081,7 +2163,7 @@ def _dB_magFunc_f(LaplaceExpr, f):
                           ini.frequency, f, normalize=False)
     return result
 
-def _phaseFunc_f(LaplaceExpr, f):
+def _phaseFunc_f(LaplaceExpr, f, H=None):
     """
     Calculates the phase angle at the real frequency f (Fourier) from the
     univariate function 'LaplaceExpr' of the Laplace variable.
@@ -1098,12 +2180,17 @@ def _phaseFunc_f(LaplaceExpr, f):
     :param f: Frequency value (*float*), or a numpy array with frequency values
               (*float*).
 
+    :param H: Complex response at the frequencies f, if already available (for
+              example, a row of _stepList.freqResponse()). Defaults to None.
+    :type H: numpy.array, NoneType
+
     :return: Angle at the specified frequency, or list with angles at
              the specified frequencies.
 
     :rtype: float, numpy.array
     """
-    H = _freq_response(LaplaceExpr, f)
+    if H is None:
+        H = _freq_response(LaplaceExpr, f)
     if H is not None:
         phase = np.asarray(np.angle(H))
         if phase.ndim:            # unwrap needs a sweep; a scalar f
@@ -1144,7 +2231,7 @@ def _phaseFunc_f(LaplaceExpr, f):
         phase = phase * 180/np.pi
     return phase
 
-def _delayFunc_f(LaplaceExpr, f, delta=10**(-ini.disp)):
+def _delayFunc_f(LaplaceExpr, f, delta=10**(-ini.disp), H=None):
     """
     Calculates the group delay at the real frequency f (Fourier) from the
     univariate function 'LaplaceExpr' of the Laplace variable.
@@ -1161,6 +2248,10 @@ def _delayFunc_f(LaplaceExpr, f, delta=10**(-ini.disp)):
     :param f: Frequency value (*float*), or a numpy array with frequency values
               (*float*).
 
+    :param H: Complex response at the frequencies f, if already available (for
+              example, a row of _stepList.freqResponse()). Defaults to None.
+    :type H: numpy.array, NoneType
+
     :return: Group delay at the specified frequency, or list with group delays
              at the specified frequencies.
 
@@ -1171,7 +2262,8 @@ def _delayFunc_f(LaplaceExpr, f, delta=10**(-ini.disp)):
     # symbolic two-point delta trick crashed on object-dtype lambdify
     # results (sympy Float coefficients) and was less accurate. The *delta*
     # parameter is kept for call compatibility but no longer used.
-    H = _freq_response(LaplaceExpr, f)
+    if H is None:
+        H = _freq_response(LaplaceExpr, f)
     if H is not None:
         f = np.asarray(f, dtype=float)
         return groupDelay(f, np.real(H), np.imag(H), Hz=ini.hz)
@@ -1200,6 +2292,9 @@ def _doCDSint(noiseResult, tau, fmin, fmax, method, points=0):
     Returns the integral from ini.frequency = f_min to ini.frequency = f_max,
     of a noise spectrum after multiplying it with (2*sin(pi*ini.frequency*tau))^2
 
+    Numeric integrals are split at the notches ini.frequency = k/tau of the
+    weighting function, as in _doVarNoiseGrid().
+
     :param noiseResult: sympy expression of a noise density spectrum in V^2/Hz or A^2/Hz
     :type noiseResult: sympy.Expr, sympy.Symbol, int or float
 
@@ -1236,6 +2331,7 @@ def _doCDSint(noiseResult, tau, fmin, fmax, method, points=0):
     :return: integral of the spectrum from f_min to f_max after corelated double sampling
     :rtype: sympy.Expr, sympy.Symbol, int or float
     """
+    from scipy.integrate import quad
     # method is determined by parent routine
     _phi = sp.Symbol('_phi', positive=True)
     lim_l = sp.simplify(fmin*tau*sp.pi)
@@ -1256,33 +2352,25 @@ def _doCDSint(noiseResult, tau, fmin, fmax, method, points=0):
         noiseResultCDSint = 0
         lim_l             = float(lim_l)
         lim_u             = float(lim_u)
-        i                 = 1
-        start             = lim_l
+        # Integrate between the notches phi = k*pi (f = k/tau) of the CDS
+        # weighting function, as _doVarNoiseGrid() does
+        limits = np.concatenate(([lim_l], 
+                                 np.pi*np.arange(np.floor(lim_l/np.pi) + 1, 
+                                                 np.ceil(lim_u/np.pi)),
+                                 [lim_u]))
         if method == "scipy":
-            while i * np.pi < lim_u:
-                noiseResultCDSint += quad(noise_spectrum, start, i*np.pi)[0]
-                i += 1
-                start += np.pi
-            noiseResultCDSint += quad(noise_spectrum, start, lim_u)[0]
-        elif method == "lin":
-            while i * np.pi < lim_u:
-                x = np.linspace(start, i*np.pi, points)
-                noiseResultCDSint += trapezoid(noise_spectrum(x), x)
-                i += 1
-                start += np.pi
-            x = np.linspace(start, lim_u, points)
-            noiseResultCDSint += trapezoid(noise_spectrum(x), x)
-        elif method== "log":
-            x = np.geomspace(start, i*np.pi, points)
-            while i * np.pi < lim_u:
+            for k in range(len(limits) - 1):
+                noiseResultCDSint += quad(noise_spectrum, limits[k], limits[k+1])[0]
+        elif method in ["lin", "log"]:
+            for k in range(len(limits) - 1):
+                if k == 0 and method == "log" and lim_l > 0:
+                    x = np.geomspace(limits[k], limits[k+1], points)
+                else:
+                    x = np.linspace(limits[k], limits[k+1], points)
                 noiseResultCDSint += trapezoid(noise_spectrum(x), x)
-                i += 1
-                start += np.pi
-                x = np.linspace(start, i*np.pi, points)
-            x = np.linspace(start, lim_u, points)
-            noiseResultCDSint += trapezoid(noise_spectrum(x), x)
         elif method == "list":
-            noiseResultCDSint += trapezoid(noise_spectrum(points), points)
+            x = np.pi*float(tau)*np.array(points, dtype=float)
+            noiseResultCDSint += trapezoid(noise_spectrum(x), x)
     return noiseResultCDSint
 
 def doCDS(result, tau):
@@ -1302,7 +2390,7 @@ def doCDS(result, tau):
     cpy_result = deepcopy(result)
     try:
         terms = cpy_result.onoiseTerms.keys()
-        if type(cpy_result.onoise) == list:
+        if isinstance(cpy_result.onoise, list):
             for i in range(len(cpy_result.onoise)):
                 cpy_result.onoise[i] *= (2*sp.sin(sp.pi*ini.frequency*tau))**2
                 for term in terms:
@@ -1537,6 +2625,7 @@ def besselPoly(n):
     :return: Bessel polynomial of the n-th order of the Laplace variable
     :rtype: sympy.Expression
     """
+    from scipy.optimize import fsolve
     s = ini.laplace
     P_s = 0
     for k in range(n+1):
@@ -1564,6 +2653,7 @@ def chebyshev1Poly(n, ripple):
     :return: Chebyshev polynomial of the n-th order of the Laplace variable
     :rtype: sympy.Expression
     """
+    from scipy.optimize import fsolve
     s = ini.laplace
     eps = np.sqrt(10**(ripple/10)-1)
     h = np.tanh((1/n)*np.arcsinh(1/eps))
@@ -1587,9 +2677,15 @@ def chebyshev1Poly(n, ripple):
     P_s = P_s.xreplace({s: s*w3dB})
     return P_s
 
-def _doVarNoiseData(noiseData, numeric, method, CDS, tau, fmin, fmax, points, wf):
+def _doVarNoiseData(noiseData, numeric, method, CDS, tau, fmin, fmax, points, wf,
+                    terms=False):
     """
     Calculates and returns total variance of noise spectra.
+
+    With numeric limits, spectra that hold no parameters other than
+    ini.frequency are integrated for all noise sources and steps at once
+    (see _doVarNoiseGrid()) if the integration method is "lin", "log" or
+    "list"; other spectra and methods are integrated term by term.
     
     :param noiseData: 
         
@@ -1652,13 +2748,16 @@ def _doVarNoiseData(noiseData, numeric, method, CDS, tau, fmin, fmax, points, wf
     :param wf: Frequency weighting function (H(s) or H(f))
     :type wf: str, int, float, sympy expr
 
-    :return: RMS noise over the frequency interval.
+    :param terms: If True, the variances are returned per noise source.
+                  Defaults to False.
+    :type terms: bool
 
-            - An expression or value if parameter stepping of the instruction is disabled.
-            - A list with expressions or values if parameter stepping of the instruction is enabled.
-    :rtype: int, float, sympy.Expr
+    :return: List with the variance of each step, or a dict with such a list
+             for each noise source if terms == True.
+    :rtype: list, dict
 
     """
+    from scipy.integrate import quad
     errors = False
     if type(wf) == int or type(wf) == float or type(wf) == str:
         wf = _sympify(wf)
@@ -1673,12 +2772,12 @@ def _doVarNoiseData(noiseData, numeric, method, CDS, tau, fmin, fmax, points, wf
         sq_mag_wf = wf**2
     if type(noiseData) == dict:
         noiseSources = list(noiseData.keys())
-        if type(noiseData[noiseSources[0]]) == list:
+        if isinstance(noiseData[noiseSources[0]], list):
             numSteps = len(noiseData[noiseSources[0]])
         else:
             numSteps = 1
     else:
-        if type(noiseData) != list:
+        if not isinstance(noiseData, list):
             noiseData = [noiseData]
         numSteps = len(noiseData)
         noiseDataDict = {}
@@ -1712,11 +2811,21 @@ def _doVarNoiseData(noiseData, numeric, method, CDS, tau, fmin, fmax, points, wf
             print("Error: expected a list with frequencies.")
             errors = True
     var = []
+    if not errors and numlimits:
+        var = _doVarNoiseGrid(noiseData, noiseSources, numSteps, sq_mag_wf, 
+                              method, fmin, fmax, points, CDS, tau, terms)
+        if var != None:
+            return var
+        var = []
+    if not errors and terms:
+        return {src: _doVarNoiseData({src: noiseData[src]}, numeric, method, 
+                                     CDS, tau, fmin, fmax, points, wf)
+                for src in noiseSources}
     if not errors:
         for i in range(numSteps):
             var_i    = sp.N(0)
             for src in noiseSources:
-                if type(noiseData[src]) != list:
+                if not isinstance(noiseData[src], list):
                     data = noiseData[src]
                 else:
                     data = noiseData[src][i]
@@ -1781,8 +2890,105 @@ def _doVarNoiseData(noiseData, numeric, method, CDS, tau, fmin, fmax, points, wf
                 var.append(clearAssumptions(sp.expand(var_i)))
     return var
 
+def _doVarNoiseGrid(noiseData, noiseSources, numSteps, sq_mag_wf, method, 
+                    fmin, fmax, points, CDS=False, tau=None, terms=False):
+    """
+    Returns the list with the total variances of noise spectra, or None if
+    this cannot be done numerically on a frequency grid.
+
+    The spectra of all noise sources and all steps are evaluated on one
+    frequency grid: stepped spectra with one call of their compiled functions
+    (see _stepList), all other spectra with ONE compiled function for all of
+    them. The weighted spectra are integrated with one call of
+    numpy.trapezoid; this is the vectorized equivalent of the integration
+    methods "lin", "log" and "list" of _doVarNoiseData(). With CDS, the grid
+    has 'points' points in each segment between the notches f = k/tau of the
+    CDS weighting function, as _doCDSint() has.
+
+    For the arguments see _doVarNoiseData().
+
+    :param terms: If True, the variances are returned per noise source.
+                  Defaults to False.
+    :type terms: bool
+
+    :return: List with variances (one for each step), a dict with such a list
+             for each noise source if terms == True, or None.
+    :rtype: list, dict, NoneType
+    """
+    if sq_mag_wf.atoms(sp.Symbol) - {ini.frequency}:
+        return None
+    if CDS:
+        try:
+            tau = float(sp.N(tau))
+        except TypeError:
+            return None
+        if tau <= 0 or type(points) == list:
+            return None
+    if method == "auto":
+        # Same selection as _doVarNoiseData() for spectra without parameters
+        if type(points) == list:
+            method = "list" if len(points) > 1 else "scipy"
+        elif int(points) > 2:
+            method = "log" if fmin > 0 and not CDS else "lin"
+        else:
+            method = "scipy"
+    if method not in ["lin", "log", "list"]:
+        return None
+    if CDS:
+        notches = np.arange(np.floor(fmin*tau) + 1, np.ceil(fmax*tau))/tau
+        limits  = np.concatenate(([fmin], notches, [fmax]))
+        segments = []
+        for k in range(len(limits) - 1):
+            if k == 0 and method == "log" and fmin > 0:
+                segments.append(np.geomspace(limits[k], limits[k+1], points))
+            else:
+                segments.append(np.linspace(limits[k], limits[k+1], points))
+        x = np.concatenate(segments)
+    elif method == "lin":
+        x = np.linspace(fmin, fmax, points)
+    elif method == "log":
+        x = np.geomspace(fmin, fmax, points)
+    else:
+        x = np.array(points, dtype=float)
+    spectra = np.zeros((len(noiseSources), numSteps, len(x)))
+    exprs = []
+    slots = []
+    for i, src in enumerate(noiseSources):
+        data = noiseData[src]
+        if isinstance(data, _stepList):
+            if data.freeSymbols() - {ini.frequency}:
+                return None
+            values = data.evaluate(ini.frequency, x)
+            if values is None:
+                return None
+            spectra[i] = np.real(values)
+            continue
+        if not isinstance(data, list):
+            data = [data for j in range(numSteps)]
+        for j in range(numSteps):
+            expr = sp.N(data[j])
+            if expr.atoms(sp.Symbol) - {ini.frequency}:
+                return None
+            exprs.append(expr)
+            slots.append((i, j))
+    if exprs:
+        values = sp.lambdify(ini.frequency, exprs, ini.lambdify)(x)
+        for (i, j), value in zip(slots, values):
+            spectra[i, j] = np.real(np.broadcast_to(value, x.shape))
+    weight = np.real(np.array(_makeNumData(sq_mag_wf, ini.frequency, x), 
+                              dtype=complex))
+    if CDS:
+        weight = weight * (2*np.sin(np.pi*x*tau))**2
+    variances = trapezoid(spectra * weight, x=x, axis=-1)
+    if not np.all(np.isfinite(variances)):
+        return None
+    if terms:
+        return {src: [sp.N(variance) for variance in variances[i]] 
+                for i, src in enumerate(noiseSources)}
+    return [sp.N(variance) for variance in np.sum(variances, axis=0)]
+
 def _varNoise(noiseResult, noise, fmin, fmax, source=None, CDS=False, tau=None, 
-              method="auto", points=0, wf=1):
+              method="auto", points=0, wf=1, terms=False):
     """
     """
     errors = 0
@@ -1833,19 +3039,21 @@ def _varNoise(noiseResult, noise, fmin, fmax, source=None, CDS=False, tau=None,
     
     if method != "symbolic" and numlimits == True:
         if noise == "onoise": 
-            if type(noiseResult.onoise) != list:
+            if not isinstance(noiseResult.onoise, list):
                 spectra = [noiseResult.onoise]
             else:
                 spectra = noiseResult.onoise
         elif noise == "inoise":
-            if type(noiseResult.inoise) != list:
+            if not isinstance(noiseResult.inoise, list):
                 spectra = [noiseResult.inoise]
             else:
                 spectra = noiseResult.inoise
-        params = []
-        for i in range(len(spectra)):
-            params += list(sp.N(spectra[i]).atoms(sp.Symbol))
-            params = set(params)                
+        if isinstance(spectra, _stepList):
+            params = spectra.freeSymbols()
+        else:
+            params = set()
+            for spectrum in spectra:
+                params |= sp.N(spectrum).atoms(sp.Symbol)
         if len(params) > 1 or (len(params) == 1 and ini.frequency not in params):
             if method != "symbolic" and method !="auto":
                 print("Error: found symbolic data, cannot perform numeric integration.")
@@ -1895,7 +3103,10 @@ def _varNoise(noiseResult, noise, fmin, fmax, source=None, CDS=False, tau=None,
             noiseData = noiseDataNew
         # Now the actual calculation starts
         var = _doVarNoiseData(noiseData, noiseResult.numeric, method, CDS, tau, 
-                              fmin, fmax, points, wf)
+                              fmin, fmax, points, wf, terms)
+    if terms and type(var) == dict:
+        return {src: (value[0] if len(value) == 1 else value) 
+                for src, value in var.items()}
     if len(var) == 1:
         var = var[0]
     return var
@@ -1984,6 +3195,46 @@ def rmsNoise(noiseResult, noise, fmin, fmax, source=None, CDS=False, tau=None,
         rms = sp.sqrt(result)
     return rms
 
+def rmsNoiseTerms(noiseResult, noise, fmin, fmax, CDS=False, tau=None, 
+                  method="auto", points=0, wf=1):
+    """
+    Returns the contributions of all noise sources to the RMS source-referred
+    or detector-referred noise.
+
+    With numeric spectra and a numeric frequency range, the spectra of all
+    sources and steps are integrated at once on one frequency grid for the
+    methods "lin", "log" and "list", so all contributions cost one
+    integration. Otherwise each contribution is calculated as with
+    rmsNoise(noiseResult, noise, fmin, fmax, source=<source>).
+
+    For the arguments see rmsNoise().
+
+    :return: Dictionary with key-value pairs:
+
+             - key: name of the noise source
+             - value: RMS contribution of this source; a list with values if
+               parameter stepping of the instruction is enabled.
+    :rtype: dict
+
+    :Example:
+
+    >>> noiseResult = sl.doNoise(cir, pardefs='circuit', numeric=True)
+    >>> contribs = sl.rmsNoiseTerms(noiseResult, 'onoise', 1, 1e6, 
+    ...                             method='log', points=1000)
+    """
+    method = method.lower()
+    result = _varNoise(noiseResult, noise, fmin, fmax, CDS=CDS, tau=tau, 
+                       method=method, points=points, wf=wf, terms=True)
+    if type(result) != dict:
+        return {}
+    rms = {}
+    for src, value in result.items():
+        if type(value) == list:
+            rms[src] = [sp.sqrt(item) for item in value]
+        else:
+            rms[src] = sp.sqrt(value)
+    return rms
+
 def PdBm2V(p, r):
     """
     Returns the RMS value of the voltage that generates *p* dBm power
@@ -2668,6 +3919,7 @@ def units2TeX(units):
     """
     tex = " "
     if type(units) == str and units != '':
+        from pytexit import py2tex
         replacements = {}
         replacements['Ohm'] = 'Omega'
         for key in replacements.keys():
@@ -6,7 +6,12 @@ SLiCAP module for building the MNA matrix and the associated vectors.
 
 import sympy as sp
 import SLiCAP.SLiCAPconfigure as ini
+from collections import defaultdict, OrderedDict
 from SLiCAP.SLiCAPmath import fullSubs, float2rational, normalizeRational
+from SLiCAP.SLiCAPmath import _parSubsEntry, _resolvePar
+
+# Element parameters that determine the entries of the MNA matrix
+_STAMP_PARAMS = ['value', 'zo']
 
 
 def _getValues(elmt, param, numeric, parDefs, substitute):
@@ -102,11 +107,271 @@ def _createDepVarIndex(circuitObject):
     return varIndex
 
 
+def _stamp(stamps, row, col, value):
+    """
+    Adds 'value' to the entry (row, col) of the stamps of an element.
+    """
+    stamps[row, col] = stamps.get((row, col), 0) + value
+
+def _stampElement(elmt, cir, varIndex, numeric, parDefs, substitute):
+    """
+    Returns the contributions of an element to the MNA matrix.
+
+    :param elmt: element object
+    :type elmt: SLiCAPprotos.element
+
+    :param cir: Circuit that holds the element.
+    :type cir: SLiCAPprotos.circuit
+
+    :param varIndex: Positions of the dependent variables in the matrix.
+    :type varIndex: dict
+
+    :return: Dictionary with key-value pairs:
+
+             - key  : (row, col)
+             - value: contribution to the matrix entry
+    :rtype: dict
+    """
+    stamps = {}
+    if elmt.model == 'C':
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        value = _getValue(elmt, 'value', numeric, parDefs, substitute)
+        _stamp(stamps, pos0, pos0, value * ini.laplace)
+        _stamp(stamps, pos0, pos1, -(value * ini.laplace))
+        _stamp(stamps, pos1, pos0, -(value * ini.laplace))
+        _stamp(stamps, pos1, pos1, value * ini.laplace)
+    elif elmt.model == 'L':
+        dVarPos = varIndex['I_' + elmt.refDes]
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        value = _getValue(elmt, 'value', numeric, parDefs, substitute)
+        _stamp(stamps, pos0, dVarPos, 1)
+        _stamp(stamps, pos1, dVarPos, -1)
+        _stamp(stamps, dVarPos, pos0, 1)
+        _stamp(stamps, dVarPos, pos1, -1)
+        _stamp(stamps, dVarPos, dVarPos, -(value * ini.laplace))
+    elif elmt.model == 'R':
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        value = float2rational(
+            1/_getValue(elmt, 'value', numeric, parDefs, substitute))
+        _stamp(stamps, pos0, pos0, value)
+        _stamp(stamps, pos0, pos1, -value)
+        _stamp(stamps, pos1, pos0, -value)
+        _stamp(stamps, pos1, pos1, value)
+    elif elmt.model == 'r':
+        dVarPos = varIndex['I_' + elmt.refDes]
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        value = _getValue(elmt, 'value', numeric, parDefs, substitute)
+        _stamp(stamps, pos0, dVarPos, 1)
+        _stamp(stamps, pos1, dVarPos, -1)
+        _stamp(stamps, dVarPos, pos0, 1)
+        _stamp(stamps, dVarPos, pos1, -1)
+        _stamp(stamps, dVarPos, dVarPos, -value)
+    elif elmt.model == 'E':
+        dVarPos = varIndex['I_' + elmt.refDes]
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        pos2 = varIndex[elmt.nodes[2]]
+        pos3 = varIndex[elmt.nodes[3]]
+        (numer, denom) = _getValues(
+            elmt, 'value', numeric, parDefs, substitute)
+        _stamp(stamps, pos0, dVarPos, 1)
+        _stamp(stamps, pos1, dVarPos, -1)
+        _stamp(stamps, dVarPos, pos0, denom)
+        _stamp(stamps, dVarPos, pos1, -denom)
+        _stamp(stamps, dVarPos, pos2, -numer)
+        _stamp(stamps, dVarPos, pos3, numer)
+    elif elmt.model == 'EZ':
+        dVarPos = varIndex['I_' + elmt.refDes]
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        pos2 = varIndex[elmt.nodes[2]]
+        pos3 = varIndex[elmt.nodes[3]]
+        numer, denom = _getValues(
+            elmt, 'value', numeric, parDefs, substitute)
+        zoN, zoD = _getValues(elmt, 'zo', numeric, parDefs, substitute)
+        _stamp(stamps, pos0, dVarPos, 1)
+        _stamp(stamps, pos1, dVarPos, -1)
+        _stamp(stamps, dVarPos, pos0, denom * zoD)
+        _stamp(stamps, dVarPos, pos1, -(denom * zoD))
+        _stamp(stamps, dVarPos, pos2, -(numer * zoD))
+        _stamp(stamps, dVarPos, pos3, numer * zoD)
+        _stamp(stamps, dVarPos, dVarPos, -(zoN * denom))
+    elif elmt.model == 'F':
+        dVarPosO = varIndex['I_' + elmt.refDes]
+        dVarPosI = varIndex['I_' + elmt.refs[0]]
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        _stamp(stamps, pos0, dVarPosO, 1)
+        _stamp(stamps, pos1, dVarPosO, -1)
+        (numer, denom) = _getValues(
+            elmt, 'value', numeric, parDefs, substitute)
+        _stamp(stamps, dVarPosO, dVarPosI, -numer)
+        _stamp(stamps, dVarPosO, dVarPosO, denom)
+    elif elmt.model == 'g':
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        pos2 = varIndex[elmt.nodes[2]]
+        pos3 = varIndex[elmt.nodes[3]]
+        value = _getValue(elmt, 'value', numeric, parDefs, substitute)
+        _stamp(stamps, pos0, pos2, value)
+        _stamp(stamps, pos0, pos3, -value)
+        _stamp(stamps, pos1, pos2, -value)
+        _stamp(stamps, pos1, pos3, value)
+    elif elmt.model == 'G':
+        dVarPos = varIndex['I_' + elmt.refDes]
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        pos2 = varIndex[elmt.nodes[2]]
+        pos3 = varIndex[elmt.nodes[3]]
+        (numer, denom) = _getValues(
+            elmt, 'value', numeric, parDefs, substitute)
+        _stamp(stamps, pos0, dVarPos, 1)
+        _stamp(stamps, pos1, dVarPos, -1)
+        _stamp(stamps, dVarPos, pos2, numer)
+        _stamp(stamps, dVarPos, pos3, -numer)
+        _stamp(stamps, dVarPos, dVarPos, -denom)
+    elif elmt.model == 'H':
+        dVarPosO = varIndex['I_' + elmt.refDes]
+        dVarPosI = varIndex['I_' + elmt.refs[0]]
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        _stamp(stamps, pos0, dVarPosO, 1)
+        _stamp(stamps, pos1, dVarPosO, -1)
+        (numer, denom) = _getValues(
+            elmt, 'value', numeric, parDefs, substitute)
+        _stamp(stamps, dVarPosO, pos0, denom)
+        _stamp(stamps, dVarPosO, pos1, -denom)
+        _stamp(stamps, dVarPosO, dVarPosI, -numer)
+    elif elmt.model == 'HZ':
+        dVarPosO = varIndex['I_' + elmt.refDes]
+        dVarPosI = varIndex['I_' + elmt.refs[0]]
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        _stamp(stamps, pos0, dVarPosO, 1)
+        _stamp(stamps, pos1, dVarPosO, -1)
+        (numer, denom) = _getValues(
+            elmt, 'value', numeric, parDefs, substitute)
+        (zoN, zoD) = _getValues(elmt, 'zo', numeric, parDefs, substitute)
+        _stamp(stamps, dVarPosO, pos0, denom * zoD)
+        _stamp(stamps, dVarPosO, pos1, -(denom * zoD))
+        _stamp(stamps, dVarPosO, dVarPosI, -(numer * zoD))
+        _stamp(stamps, dVarPosO, dVarPosO, -(zoN * denom))
+    elif elmt.model == 'N':
+        dVarPos = varIndex['I_' + elmt.refDes]
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        pos2 = varIndex[elmt.nodes[2]]
+        pos3 = varIndex[elmt.nodes[3]]
+        _stamp(stamps, pos0, dVarPos, 1)
+        _stamp(stamps, pos1, dVarPos, -1)
+        _stamp(stamps, dVarPos, pos2, 1)
+        _stamp(stamps, dVarPos, pos3, -1)
+    elif elmt.model == 'T':
+        dVarPos = varIndex['I_' + elmt.refDes]
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        pos2 = varIndex[elmt.nodes[2]]
+        pos3 = varIndex[elmt.nodes[3]]
+        value = _getValue(elmt, 'value', numeric, parDefs, substitute)
+        _stamp(stamps, pos0, dVarPos, 1)
+        _stamp(stamps, pos1, dVarPos, -1)
+        _stamp(stamps, pos2, dVarPos, -value)
+        _stamp(stamps, pos3, dVarPos, value)
+        _stamp(stamps, dVarPos, pos0, 1)
+        _stamp(stamps, dVarPos, pos1, -1)
+        _stamp(stamps, dVarPos, pos2, -value)
+        _stamp(stamps, dVarPos, pos3, value)
+    elif elmt.model == 'V':
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        dVarPos = varIndex['I_' + elmt.refDes]
+        _stamp(stamps, pos0, dVarPos, 1)
+        _stamp(stamps, pos1, dVarPos, -1)
+        _stamp(stamps, dVarPos, pos0, 1)
+        _stamp(stamps, dVarPos, pos1, -1)
+    elif elmt.model == 'W':
+        pos0 = varIndex[elmt.nodes[0]]
+        pos1 = varIndex[elmt.nodes[1]]
+        pos2 = varIndex[elmt.nodes[2]]
+        pos3 = varIndex[elmt.nodes[3]]
+        value = _getValue(elmt, 'value', numeric, parDefs, substitute)
+        _stamp(stamps, pos0, pos2, value)
+        _stamp(stamps, pos0, pos3, -value)
+        _stamp(stamps, pos1, pos2, -value)
+        _stamp(stamps, pos1, pos3, value)
+        _stamp(stamps, pos2, pos0, -value)
+        _stamp(stamps, pos2, pos1, value)
+        _stamp(stamps, pos3, pos0, value)
+        _stamp(stamps, pos3, pos1, -value)
+    elif elmt.model == 'K':
+        refPos1 = varIndex['I_' + elmt.refs[0]]
+        refPos0 = varIndex['I_' + elmt.refs[1]]
+        ind0 = _getValue(
+            cir.elements[elmt.refs[0]], 'value', numeric, parDefs, substitute)
+        ind1 = _getValue(
+            cir.elements[elmt.refs[1]], 'value', numeric, parDefs, substitute)
+        value = _getValue(elmt, 'value', numeric, parDefs, substitute)
+        value = value * ini.laplace * sp.sqrt(ind0 * ind1)
+        _stamp(stamps, refPos0, refPos1, -value)
+        _stamp(stamps, refPos1, refPos0, -value)
+    return stamps
+
+# Element stamps of recently built MNA matrices, see _makeMatrices()
+_stamp_cache = OrderedDict()
+_stamp_cache_size = 16
+
+def _stampKey(elmt, cir, numeric, parDefs, substitute):
+    """
+    Returns a hashable key that determines the stamps of an element: its
+    model, nodes, references, the matrix parameters of the element (and of
+    the inductors referenced by a coupling factor), and the fully substituted
+    values of the circuit parameters in them. Returns None if the stamps
+    cannot be cached.
+    """
+    elements = [elmt]
+    if elmt.model == 'K':
+        elements += [cir.elements[ref] for ref in elmt.refs]
+    values = []
+    params = set()
+    for el in elements:
+        for name in _STAMP_PARAMS:
+            if name in el.params:
+                value = el.params[name]
+                values.append((el.refDes, name, value))
+                if isinstance(value, sp.Basic):
+                    params |= value.atoms(sp.Symbol)
+    subst = []
+    if substitute:
+        entry = _parSubsEntry(parDefs)
+        for param in sorted(params, key=str):
+            if param in parDefs:
+                value = _resolvePar(param, entry)
+                if value is None:
+                    return None
+                subst.append((param, value))
+    key = (elmt.model, tuple(elmt.nodes), tuple(elmt.refs), tuple(values),
+           tuple(subst))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
 def _makeMatrices(instr):
     """
     Returns the MNA matrix and the vector with dependent variables of a circuit.
     The entries in the matrix depend on the instruction type.
 
+    The stamps of the elements are cached for circuits with the same
+    elements and dependent variables. Only elements of which the parameters,
+    or the values of the circuit parameters in them, have changed since the
+    previous matrix of such a circuit, will be stamped again; only the matrix
+    entries to which they contribute will be updated.
+
     :param cir: Circuit of which the matrices need to be returned.
     :type cir: SLiCAPprotos.circuit
 
@@ -130,203 +395,79 @@ def _makeMatrices(instr):
     varIndex = _createDepVarIndex(cir)
     dim = len(list(varIndex.keys()))
     Dv = sp.Matrix([0 for i in range(dim)])
-    M = sp.zeros(dim)
     for i in range(len(cir.dep_vars)):
         Dv[i] = sp.Symbol(cir.dep_vars[i])
+    # The matrix is stamped in a dictionary of keys (row, col): MNA matrices
+    # are mostly structurally zero
+    cacheKey = (tuple(cir.dep_vars), tuple(cir.elements.keys()), numeric,
+                substitute, ini.laplace)
+    cache = _stamp_cache.get(cacheKey)
+    if cache == None:
+        cache = {'keys': {}, 'stamps': {}, 'contrib': defaultdict(list),
+                 'M': {}}
+        _stamp_cache[cacheKey] = cache
+    else:
+        _stamp_cache.move_to_end(cacheKey)
+    while len(_stamp_cache) > _stamp_cache_size:
+        _stamp_cache.popitem(last=False)
+    changed = set()
     for el in list(cir.elements.keys()):
         elmt = cir.elements[el]
-        if elmt.model == 'C':
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            value = _getValue(elmt, 'value', numeric, parDefs, substitute)
-            M[pos0, pos0] += value * ini.laplace
-            M[pos0, pos1] -= value * ini.laplace
-            M[pos1, pos0] -= value * ini.laplace
-            M[pos1, pos1] += value * ini.laplace
-        elif elmt.model == 'L':
-            dVarPos = varIndex['I_' + elmt.refDes]
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            value = _getValue(elmt, 'value', numeric, parDefs, substitute)
-            M[pos0, dVarPos] += 1
-            M[pos1, dVarPos] -= 1
-            M[dVarPos, pos0] += 1
-            M[dVarPos, pos1] -= 1
-            M[dVarPos, dVarPos] -= value * ini.laplace
-        elif elmt.model == 'R':
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            value = float2rational(
-                1/_getValue(elmt, 'value', numeric, parDefs, substitute))
-            M[pos0, pos0] += value
-            M[pos0, pos1] -= value
-            M[pos1, pos0] -= value
-            M[pos1, pos1] += value
-        elif elmt.model == 'r':
-            dVarPos = varIndex['I_' + elmt.refDes]
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            value = _getValue(elmt, 'value', numeric, parDefs, substitute)
-            M[pos0, dVarPos] += 1
-            M[pos1, dVarPos] -= 1
-            M[dVarPos, pos0] += 1
-            M[dVarPos, pos1] -= 1
-            M[dVarPos, dVarPos] -= value
-        elif elmt.model == 'E':
-            dVarPos = varIndex['I_' + elmt.refDes]
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            pos2 = varIndex[elmt.nodes[2]]
-            pos3 = varIndex[elmt.nodes[3]]
-            (numer, denom) = _getValues(
-                elmt, 'value', numeric, parDefs, substitute)
-            M[pos0, dVarPos] += 1
-            M[pos1, dVarPos] -= 1
-            M[dVarPos, pos0] += denom
-            M[dVarPos, pos1] -= denom
-            M[dVarPos, pos2] -= numer
-            M[dVarPos, pos3] += numer
-        elif elmt.model == 'EZ':
-            dVarPos = varIndex['I_' + elmt.refDes]
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            pos2 = varIndex[elmt.nodes[2]]
-            pos3 = varIndex[elmt.nodes[3]]
-            numer, denom = _getValues(
-                elmt, 'value', numeric, parDefs, substitute)
-            zoN, zoD = _getValues(elmt, 'zo', numeric, parDefs, substitute)
-            M[pos0, dVarPos] += 1
-            M[pos1, dVarPos] -= 1
-            M[dVarPos, pos0] += denom * zoD
-            M[dVarPos, pos1] -= denom * zoD
-            M[dVarPos, pos2] -= numer * zoD
-            M[dVarPos, pos3] += numer * zoD
-            M[dVarPos, dVarPos] -= zoN * denom
-        elif elmt.model == 'F':
-            dVarPosO = varIndex['I_' + elmt.refDes]
-            dVarPosI = varIndex['I_' + elmt.refs[0]]
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            M[pos0, dVarPosO] += 1
-            M[pos1, dVarPosO] -= 1
-            (numer, denom) = _getValues(
-                elmt, 'value', numeric, parDefs, substitute)
-            M[dVarPosO, dVarPosI] -= numer
-            M[dVarPosO, dVarPosO] = denom
-        elif elmt.model == 'g':
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            pos2 = varIndex[elmt.nodes[2]]
-            pos3 = varIndex[elmt.nodes[3]]
-            value = _getValue(elmt, 'value', numeric, parDefs, substitute)
-            M[pos0, pos2] += value
-            M[pos0, pos3] -= value
-            M[pos1, pos2] -= value
-            M[pos1, pos3] += value
-        elif elmt.model == 'G':
-            dVarPos = varIndex['I_' + elmt.refDes]
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            pos2 = varIndex[elmt.nodes[2]]
-            pos3 = varIndex[elmt.nodes[3]]
-            (numer, denom) = _getValues(
-                elmt, 'value', numeric, parDefs, substitute)
-            M[pos0, dVarPos] += 1
-            M[pos1, dVarPos] -= 1
-            M[dVarPos, pos2] += numer
-            M[dVarPos, pos3] -= numer
-            M[dVarPos, dVarPos] -= denom
-        elif elmt.model == 'H':
-            dVarPosO = varIndex['I_' + elmt.refDes]
-            dVarPosI = varIndex['I_' + elmt.refs[0]]
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            M[pos0, dVarPosO] += 1
-            M[pos1, dVarPosO] -= 1
-            (numer, denom) = _getValues(
-                elmt, 'value', numeric, parDefs, substitute)
-            M[dVarPosO, pos0] += denom
-            M[dVarPosO, pos1] -= denom
-            M[dVarPosO, dVarPosI] -= numer
-        elif elmt.model == 'HZ':
-            dVarPosO = varIndex['I_' + elmt.refDes]
-            dVarPosI = varIndex['I_' + elmt.refs[0]]
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            M[pos0, dVarPosO] += 1
-            M[pos1, dVarPosO] -= 1
-            (numer, denom) = _getValues(
-                elmt, 'value', numeric, parDefs, substitute)
-            (zoN, zoD) = _getValues(elmt, 'zo', numeric, parDefs, substitute)
-            M[dVarPosO, pos0] += denom * zoD
-            M[dVarPosO, pos1] -= denom * zoD
-            M[dVarPosO, dVarPosI] -= numer * zoD
-            M[dVarPosO, dVarPosO] -= zoN * denom
-        elif elmt.model == 'N':
-            dVarPos = varIndex['I_' + elmt.refDes]
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            pos2 = varIndex[elmt.nodes[2]]
-            pos3 = varIndex[elmt.nodes[3]]
-            M[pos0, dVarPos] += 1
-            M[pos1, dVarPos] -= 1
-            M[dVarPos, pos2] += 1
-            M[dVarPos, pos3] -= 1
-        elif elmt.model == 'T':
-            dVarPos = varIndex['I_' + elmt.refDes]
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            pos2 = varIndex[elmt.nodes[2]]
-            pos3 = varIndex[elmt.nodes[3]]
-            value = _getValue(elmt, 'value', numeric, parDefs, substitute)
-            M[pos0, dVarPos] += 1
-            M[pos1, dVarPos] -= 1
-            M[pos2, dVarPos] -= value
-            M[pos3, dVarPos] += value
-            M[dVarPos, pos0] += 1
-            M[dVarPos, pos1] -= 1
-            M[dVarPos, pos2] -= value
-            M[dVarPos, pos3] += value
-        elif elmt.model == 'V':
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            dVarPos = varIndex['I_' + elmt.refDes]
-            M[pos0, dVarPos] += 1
-            M[pos1, dVarPos] -= 1
-            M[dVarPos, pos0] += 1
-            M[dVarPos, pos1] -= 1
-        elif elmt.model == 'W':
-            pos0 = varIndex[elmt.nodes[0]]
-            pos1 = varIndex[elmt.nodes[1]]
-            pos2 = varIndex[elmt.nodes[2]]
-            pos3 = varIndex[elmt.nodes[3]]
-            value = _getValue(elmt, 'value', numeric, parDefs, substitute)
-            M[pos0, pos2] += value
-            M[pos0, pos3] -= value
-            M[pos1, pos2] -= value
-            M[pos1, pos3] += value
-            M[pos2, pos0] -= value
-            M[pos2, pos1] += value
-            M[pos3, pos0] += value
-            M[pos3, pos1] -= value
-        elif elmt.model == 'K':
-            refPos1 = varIndex['I_' + elmt.refs[0]]
-            refPos0 = varIndex['I_' + elmt.refs[1]]
-            ind0 = _getValue(
-                cir.elements[elmt.refs[0]], 'value', numeric, parDefs, substitute)
-            ind1 = _getValue(
-                cir.elements[elmt.refs[1]], 'value', numeric, parDefs, substitute)
-            value = _getValue(elmt, 'value', numeric, parDefs, substitute)
-            value = value * ini.laplace * sp.sqrt(ind0 * ind1)
-            M[refPos0, refPos1] -= value
-            M[refPos1, refPos0] -= value
+        key = _stampKey(elmt, cir, numeric, parDefs, substitute)
+        if key != None and el in cache['keys'] and cache['keys'][el] == key:
+            continue
+        stamps = _stampElement(elmt, cir, varIndex, numeric, parDefs,
+                               substitute)
+        for pos in cache['stamps'].get(el, {}):
+            cache['contrib'][pos].remove(el)
+            changed.add(pos)
+        for pos in stamps:
+            cache['contrib'][pos].append(el)
+            changed.add(pos)
+        cache['stamps'][el] = stamps
+        cache['keys'][el] = key
+    M = cache['M']
+    # Entries are summed in circuit element order, as in a new stamping:
+    # restamped elements are at the end of their contrib lists, and another
+    # order of a float sum may change the entry (and its determinant key)
+    order = {el: i for i, el in enumerate(cir.elements.keys())}
+    for pos in changed:
+        value = 0
+        for el in sorted(cache['contrib'][pos], key=order.get):
+            value += cache['stamps'][el][pos]
+        M[pos] = value
     gndPos = varIndex['0']
-    M.row_del(gndPos)
-    M.col_del(gndPos)
+    M = _dokToMatrix(M, dim, gndPos)
     Dv = sp.Matrix(Dv)
     Dv.row_del(gndPos)
     return (M, Dv)
 
+def _dokToMatrix(dok, dim, gndPos):
+    """
+    Returns the MNA matrix from its dictionary of keys, without the row and
+    the column of the ground node.
+
+    :param dok: Dictionary with key-value pairs:
+
+                - key  : (row, col)
+                - value: matrix entry
+    :type dok: dict
+
+    :param dim: Dimension of the matrix including the ground node
+    :type dim: int
+
+    :param gndPos: Position of the ground node
+    :type gndPos: int
+
+    :return: MNA matrix
+    :rtype: sympy.Matrix
+    """
+    M = sp.zeros(dim - 1)
+    for (i, j), value in dok.items():
+        if i != gndPos and j != gndPos and value != 0:
+            M[i - (i > gndPos), j - (j > gndPos)] = value
+    return M
+
 def _makeSrcVector(cir, parDefs, elid, value='id', numeric=True, substitute=True):
     """
     Creates the vector with independent variables.
@@ -7,10 +7,14 @@ SLiCAP module for interfacing with NGspice.
 from __future__ import annotations
 import SLiCAP.SLiCAPconfigure as ini
 from SLiCAP.SLiCAPmath import _checkExpression, groupDelay
+from SLiCAP.SLiCAPcache import _evictLRU
+import SLiCAP.SLiCAPlibngspice as _libngspice
+from SLiCAP.schematic.raw_file import _ascii_matrix, _ascii_lines
 from SLiCAP.SLiCAPlex import (_scale_float, _replaceScaleFactors,
                               _SCALEFACTORS, _sympify)
 from os     import system, remove
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from sympy  import Symbol
 from SLiCAP.SLiCAPtraces import (trace, dataset, make_traces,
                                  register_dataset_adapter,
@@ -18,8 +22,12 @@ from SLiCAP.SLiCAPtraces import (trace, dataset, make_traces,
                                  _rename_signals)
 from numpy  import array, sqrt, arctan, pi, unwrap, log10, linspace, geomspace
 import numpy as np
+from scipy.interpolate import RegularGridInterpolator
 import re
-from shutil import copy2
+import mmap
+import hashlib
+import threading
+from shutil import copy2, rmtree, which
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -31,15 +39,18 @@ _BINARY_MARKER = b"Binary:"
 _VALUES_MARKER  = b"Values:"
 
 
-def _find_raw_marker(raw, marker, start):
+def _find_raw_marker(raw, marker, start, stop=None):
     """Find *marker* on its own line at/after *start*, tolerant of LF and CRLF
     line endings (NGspice on Windows writes the raw header with CRLF, so a
     ``b"Binary:\\n"`` search would miss ``Binary:\\r\\n`` — the Windows-only
     "Missing trace data" bug).  Returns (marker_start, data_start), or (-1, -1)
-    when absent; *data_start* is the first byte past the marker's line ending."""
+    when absent; *data_start* is the first byte past the marker's line ending.
+    *stop* limits the search to markers starting before it."""
     pos = start
+    if stop is None:
+        stop = len(raw)
     while True:
-        i = raw.find(marker, pos)
+        i = raw.find(marker, pos, stop)
         if i == -1:
             return -1, -1
         end = i + len(marker)
@@ -61,12 +72,16 @@ class Analysis:
     :param x_data:    Independent variable array, shape (M,), always real.
     :param signals:   ``{signal_name: array}``; complex for AC / noise blocks.
     :param var_names: All variable names in file order (x first, then signals).
+    :param matrix:    The block's data, shape (M, number of variables), as a
+                      ``np.memmap`` into the raw file for :meth:`RawFile.open`;
+                      None for :meth:`RawFile.load`.
     """
     name:      str
     x_name:    str
     x_data:    np.ndarray
     signals:   dict
     var_names: list = field(default_factory=list)
+    matrix:    np.ndarray = field(default=None, repr=False)
 
     def is_complex(self) -> bool:
         """True when signal arrays are complex (AC / noise spectral density)."""
@@ -79,6 +94,8 @@ class RawFile:
     Usage::
 
         analyses = RawFile.load("output.raw")   # list[Analysis]
+        analyses = RawFile.open("output.raw")   # same, binary data memory-mapped
+        v_out    = RawFile.stacked(analyses, "v(out)")   # (n_runs, n_points)
 
     Supports binary and ASCII blocks; multiple analysis blocks per file.
     No Qt dependency — safe for CLI and notebook use.
@@ -93,11 +110,96 @@ class RawFile:
         :return: List of :class:`Analysis` objects, one per analysis block.
         :rtype: list
         """
-        raw = Path(path).read_bytes()
+        return RawFile._parse_blocks(Path(path).read_bytes())
+
+    @staticmethod
+    def open(path) -> list:
+        """Lazy :meth:`load` for large raw files: return all analysis blocks
+        in file order, with the headers parsed and the binary data NOT read.
+
+        The data of a binary block is a ``np.memmap`` into the file
+        (:attr:`Analysis.matrix`); its signals and sweep variable are column
+        views of it, so the operating system reads a signal's pages when
+        it is used, and only those.  ASCII blocks are parsed as by
+        :meth:`load`.  :meth:`stacked` gives the runs of a stepped result
+        as one (n_runs, n_points) view.
+
+        The arrays are read-only and refer to the file: keep it in place
+        while they are used (Windows does not delete or overwrite a mapped
+        file; another run of the same circuit rewrites it).
+
+        :param path: Path to the NGspice ``.raw`` file.
+        :type path: str, pathlib.Path
+        :return: List of :class:`Analysis` objects, one per analysis block.
+        :rtype: list
+        """
+        path = Path(path)
+        if path.stat().st_size == 0:
+            return []
+        with path.open("rb") as f, \
+             mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as raw:
+            return RawFile._parse_blocks(raw, path)
+
+    @staticmethod
+    def stacked(analyses, name):
+        """Signal *name* of the equally long *analyses* (the runs of a stepped
+        result) as one array of shape (n_runs, n_points).
+
+        For the binary blocks of one file opened with :meth:`open` that lie
+        at equal distances - ngspice writes the runs of a stepped sweep with
+        equal headers - this is a strided view into the file, without
+        copying.  Otherwise the signals are copied with ``np.stack``.
+
+        :param analyses: Analysis blocks, one per run.
+        :type analyses: list
+        :param name: Signal name, or the name of the sweep variable.
+        :type name: str
+        :return: Array of shape (n_runs, n_points).
+        :rtype: numpy.ndarray
+        """
+        columns = [a.var_names.index(name) if name in a.var_names else -1
+                   for a in analyses]
+        view = RawFile._strided(analyses, columns)
+        if view is not None:
+            return view.real if name == analyses[0].x_name else view
+        return np.stack([a.x_data if name == a.x_name else a.signals[name]
+                         for a in analyses], axis=0)
+
+    @staticmethod
+    def _strided(analyses, columns):
+        """Zero-copy (n_runs, n_points) view of one column of memory-mapped
+        blocks at equal distances in one file, or None."""
+        if not analyses or columns[0] < 0 or len(set(columns)) != 1:
+            return None
+        mats = [a.matrix for a in analyses]
+        if not all(isinstance(m, np.memmap) for m in mats):
+            return None
+        m0 = mats[0]
+        if any(m.filename != m0.filename or m.shape != m0.shape or
+               m.dtype != m0.dtype for m in mats):
+            return None
+        offsets = [m.offset for m in mats]
+        stride  = offsets[1] - offsets[0] if len(mats) > 1 else m0.nbytes
+        if stride < m0.nbytes or any(offsets[i + 1] - offsets[i] != stride
+                                     for i in range(len(offsets) - 1)):
+            return None
+        n_pts, n_vars = m0.shape
+        size = stride * (len(mats) - 1) + m0.nbytes
+        buf  = np.memmap(m0.filename, dtype=np.uint8, mode="r",
+                         offset=offsets[0], shape=(size,))
+        view = np.ndarray(shape=(len(mats), n_pts), dtype=m0.dtype, buffer=buf,
+                          offset=columns[0] * m0.itemsize,
+                          strides=(stride, n_vars * m0.itemsize))
+        return view
+
+    @staticmethod
+    def _parse_blocks(raw, path=None):
+        """All analysis blocks of the raw-file contents *raw* (bytes or an
+        mmap); with *path*, binary data is memory-mapped from that file."""
         analyses = []
         pos = 0
         while pos < len(raw):
-            result = RawFile._parse_block(raw, pos)
+            result = RawFile._parse_block(raw, pos, path)
             if result is None:
                 break
             analysis, pos = result
@@ -106,9 +208,11 @@ class RawFile:
         return analyses
 
     @staticmethod
-    def _parse_block(raw, start):
+    def _parse_block(raw, start, path=None):
         bi, bi_end = _find_raw_marker(raw, _BINARY_MARKER, start)
-        vi, vi_end = _find_raw_marker(raw, _VALUES_MARKER, start)
+        # Values: only counts when it comes first; do not scan the binary data.
+        vi, vi_end = _find_raw_marker(raw, _VALUES_MARKER, start,
+                                      bi if bi != -1 else None)
 
         if bi == -1 and vi == -1:
             return None
@@ -135,7 +239,7 @@ class RawFile:
 
         if is_binary:
             return RawFile._read_binary(raw, marker_end, n_pts, n_vars,
-                                        is_complex, plotname, var_info)
+                                        is_complex, plotname, var_info, path)
         return RawFile._read_ascii(raw, marker_end, n_pts, n_vars,
                                    is_complex, plotname, var_info)
 
@@ -186,15 +290,22 @@ class RawFile:
         return hdr
 
     @staticmethod
-    def _read_binary(raw, data_start, n_pts, n_vars, is_complex, plotname, var_info):
+    def _read_binary(raw, data_start, n_pts, n_vars, is_complex, plotname,
+                     var_info, path=None):
         elem_bytes = 16 if is_complex else 8
         data_size  = n_pts * n_vars * elem_bytes
-        chunk      = raw[data_start : data_start + data_size]
 
-        if len(chunk) < data_size:
+        if len(raw) < data_start + data_size:
             return None, len(raw)
 
         dtype  = np.complex128 if is_complex else np.float64
+        if path is not None:
+            matrix = np.memmap(path, dtype=dtype, mode="r", offset=data_start,
+                               shape=(n_pts, n_vars))
+            return RawFile._build_analysis(plotname, var_info, matrix, n_vars,
+                                           copy=False), \
+                   data_start + data_size
+        chunk  = raw[data_start : data_start + data_size]
         matrix = np.frombuffer(chunk, dtype=dtype).reshape(n_pts, n_vars)
 
         return RawFile._build_analysis(plotname, var_info, matrix, n_vars), \
@@ -203,77 +314,55 @@ class RawFile:
     @staticmethod
     def _read_ascii(raw, data_start, n_pts, n_vars, is_complex, plotname, var_info):
         next_block = raw.find(b"Title:", data_start)
-        end   = next_block if next_block != -1 else len(raw)
-        block = raw[data_start:end].decode("ascii", errors="replace")
-
-        dtype  = np.complex128 if is_complex else np.float64
-        matrix = np.zeros((n_pts, n_vars), dtype=dtype)
-        pt     = -1
-        col    = 0
-
-        for line in block.splitlines():
-            parts = line.split()
-            if not parts:
-                continue
-            try:
-                int(parts[0])
-                pt  += 1
-                col  = 0
-                if pt >= n_pts:
-                    break
-                val_str = parts[1] if len(parts) > 1 else ""
-            except ValueError:
-                val_str = parts[0] if parts else ""
-
-            if not val_str:
-                continue
-            try:
-                if is_complex:
-                    # NGspice ASCII complex is "real,imag" (comma-separated), NOT
-                    # Python's "real+imagj" — complex(val_str) raises here and the
-                    # value would be silently dropped as 0.  This is the Windows
-                    # bug: that build writes ASCII raws (Linux writes binary), so
-                    # a stepped AC there parsed as all-zeros.
-                    re_s, _, im_s = val_str.partition(",")
-                    val = complex(float(re_s), float(im_s) if im_s else 0.0)
-                else:
-                    val = float(val_str)
-            except ValueError:
-                continue
-            if pt >= 0 and col < n_vars:
-                matrix[pt, col] = val
-            col += 1
-
+        end    = next_block if next_block != -1 else len(raw)
+        matrix = _ascii_matrix(raw[data_start:end], n_pts, n_vars, is_complex)
+        if matrix is None:
+            matrix = _ascii_lines(raw[data_start:end], n_pts, n_vars,
+                                  is_complex)
         return RawFile._build_analysis(plotname, var_info, matrix, n_vars), end
 
     @staticmethod
-    def _build_analysis(plotname, var_info, matrix, n_vars):
+    def _build_analysis(plotname, var_info, matrix, n_vars, copy=True):
+        """*copy* False keeps the signals as column views of *matrix* (a
+        memory-mapped block, :meth:`RawFile.open`)."""
         all_names = [info[0] for info in var_info] if var_info \
                     else [f"var{i}" for i in range(n_vars)]
+        column = (lambda j: matrix[:, j].copy()) if copy \
+                 else (lambda j: matrix[:, j])
+        kept = None if copy else matrix
 
         # OP plots have no sweep axis — all variables are signals.
         if "operating point" in plotname.lower():
             signals = {}
             for j in range(n_vars):
                 name = all_names[j] if j < len(all_names) else f"var{j}"
-                signals[name] = matrix[:, j].copy()
+                signals[name] = column(j)
             return Analysis(name=plotname, x_name="", x_data=np.array([]),
-                            signals=signals, var_names=all_names)
+                            signals=signals, var_names=all_names, matrix=kept)
 
         x_name = all_names[0] if all_names else ""
-        x_data = matrix[:, 0].real.copy() if matrix.shape[1] > 0 else np.array([])
+        x_data = column(0).real if matrix.shape[1] > 0 else np.array([])
 
         signals = {}
         for j in range(1, n_vars):
             name = all_names[j] if j < len(all_names) else f"var{j}"
-            signals[name] = matrix[:, j].copy()
+            signals[name] = column(j)
 
         return Analysis(name=plotname, x_name=x_name, x_data=x_data,
-                        signals=signals, var_names=all_names)
+                        signals=signals, var_names=all_names, matrix=kept)
 
 
 # =============================================================================
 
+# Operating-point parameters of MOS.characterize(): ngspice device parameters
+# (BSIM4), stored under the names of MOS.params where those differ
+_MOS_CHAR_PARAMS = ['gm', 'gmbs', 'gds', 'id', 'vth', 'vdsat',
+                    'cgg', 'cgs', 'cgd', 'cgb', 'cdg', 'cdd', 'cds', 'cdb',
+                    'csg', 'csd', 'css', 'csb', 'cbg', 'cbd', 'cbs', 'cbb']
+_MOS_CHAR_NAMES  = {'gm': 'ggs', 'gmbs': 'gbs', 'gds': 'gdd'}
+# Grid variables of a characterization table
+_MOS_LOOKUP_AXES = ['W', 'L', 'ID', 'VD', 'VSB']
+
 class MOS(object):
     """
     MOS Transistor.
@@ -299,6 +388,9 @@ class MOS(object):
     - *self*.errors = Relative difference between forward and reverse parameter measurement
     - *self*.step   = Step data for VG or ID, defaults to False
 
+    :meth:`characterize` tabulates the operating point over a grid of
+    geometries and bias points in one stepped run; :meth:`fromTable` takes
+    the parameters of one table row.
     """
     def __init__(self,refDes, lib, dev, W, L, M):
         self.refDes   = refDes
@@ -377,7 +469,7 @@ class MOS(object):
             txt += f.read()
         with open('MOS_OP.cir', 'w') as f:
             f.write(txt)
-        _run_ngspice([ini.ngspice, '-b', 'MOS_OP.cir', '-o', 'MOS_OP.log'])
+        _run_deck('MOS_OP.cir', 'MOS_OP.log')
         #remove('MOS_OP.cir')
         #remove('MOS_OP.log')
         self._getParams()
@@ -442,7 +534,7 @@ class MOS(object):
             txt += f.read()
         with open('MOS_OP.cir', 'w') as f:
             f.write(txt)
-        _run_ngspice([ini.ngspice, '-b', 'MOS_OP.cir', '-o', 'MOS_OP.log'])
+        _run_deck('MOS_OP.cir', 'MOS_OP.log')
         remove('MOS_OP.cir')
         remove('MOS_OP.log')
         self._getParams()
@@ -450,6 +542,183 @@ class MOS(object):
         self._makeModelDef()
         self._determineAccuracy()
 
+    def characterize(self, grid, VS=0, VB=0, params=None, workers=None,
+                     fileName=None):
+        """
+        Returns a table with the operating point of the device at all points
+        of a grid of widths, lengths, drain currents and drain voltages.
+
+        All grid points are simulated in ONE stepped NGspice operating-point
+        run (array stepping, see :func:`op`), split over *workers* ngspice
+        processes. The gate voltage is set by the feedback loop of
+        :meth:`getOPid`; the operating-point parameters are the ngspice
+        device parameters (``@m1_op[gm]``, ...). The table is stored with
+        numpy.save() and a later call with the same device, grid and
+        parameters loads it instead of simulating again, unless the
+        contents of the model library files or the ngspice executable have
+        changed.
+
+        :param grid: Values of 'W', 'L', 'ID' and 'VD' (see :meth:`getOPid`):
+                     a dict with a number or a list of numbers per name;
+                     strings with scale factors ('180n') are accepted. 'W'
+                     and 'L' default to self.W and self.L. The table has a
+                     row for every combination, with the last name ('VD')
+                     varying fastest.
+        :type grid: dict
+
+        :param VS: Source voltage with respect to ground in [V]
+        :type VS: float
+
+        :param VB: Bulk voltage with respect to ground in [V]
+        :type VB: float
+
+        :param params: NGspice operating-point parameters of the device;
+                       defaults to None: gm, gmbs, gds, id, vth, vdsat and
+                       the BSIM4 capacitances cgg ... cbb. gm, gmbs and gds
+                       are stored as ggs, gbs and gdd, the names used in
+                       *self*.params. Parameters the model does not have
+                       are NaN.
+        :type params: list, NoneType
+
+        :param workers: Number of NGspice processes; defaults to None:
+                        ini.ngspice_workers.
+        :type workers: int, NoneType
+
+        :param fileName: Name of the .npy file of the table; defaults to
+                         None: a name in ini.results_path derived from the
+                         device, the grid and the parameters.
+        :type fileName: str, NoneType
+
+        :return: Structured array with the fields W, L, ID, VD, VSB, VGS, VDS
+                 and the parameters, one row per grid point; None on error.
+                 Tables for several VSB values can be joined with
+                 numpy.concatenate() into one grid for :class:`MOSlookup`.
+        :rtype: numpy.ndarray, NoneType
+
+        :Example:
+
+        >>> M1 = sl.MOS('M1', '.lib CMOS18.lib', 'CMOS18N', '220n', '180n', 1)
+        >>> T  = M1.characterize({'L': ['180n', '360n', '720n'],
+        ...                       'ID': np.geomspace(1e-7, 1e-3, 41),
+        ...                       'VD': 0.9})
+        >>> gm_id = T['ggs']/T['ID']
+        >>> M1.fromTable(T, 20)
+        """
+        axes   = ['W', 'L', 'ID', 'VD']
+        values = []
+        for axis in axes:
+            value = grid.get(axis, getattr(self, axis, None))
+            if value is None:
+                print("Error: characterize() needs values for '{}'.".format(axis))
+                return None
+            values.append(np.array([_scale_float(v) for v in
+                                    np.atleast_1d(np.array(value, dtype=object))]))
+        points = np.array(np.meshgrid(*values, indexing='ij')).reshape(len(axes), -1).T
+        if params is None:
+            params = _MOS_CHAR_PARAMS
+        params = [str(p).lower() for p in params]
+        reuse = True
+        if fileName is None:
+            h = hashlib.sha256(repr((self.lib, self.dev, str(self.M), float(VS),
+                                     float(VB), params)).encode() +
+                               points.tobytes())
+            # The table also depends on the model files and on ngspice
+            reuse = _include_digests(self.lib, ini.cir_path, h, set())
+            h.update(repr((_ngspice_id(ini.ngspice), ini.ngspice_shared and
+                           ini.libngspice)).encode())
+            key = h.hexdigest()[:16]
+            fileName = ini.results_path + 'MOS_{}_{}.npy'.format(self.dev, key)
+        if reuse and Path(fileName).is_file():
+            return np.load(fileName)
+        cirFile = 'MOS_char_' + self.refDes
+        txt =  'MOS_char\n'
+        for name, value in zip(axes, points[0]):
+            txt += '.param %-6s = %s\n'%(name, _ng_number(value))
+        txt += '.param VS     = %s\n'%(VS)
+        txt += '.param VB     = %s\n'%(VB)
+        txt += '.param M      = %s\n\n'%(self.M)
+        txt += '%s\n\n'%(self.lib)
+        # MOS with voltage feedback loop for creating the gate-source voltage
+        txt += 'M1_OP d1 g1 s1 b1 %s W={W} L={L} M={M}\n'%(self.dev)
+        txt += 'V5 s1 0 {VS}\nV6 b1 0 {VB}\nV7 d1 1 {VD}\nE1 g1 d1 1 0 100\nI1 0 1 {ID}\n'
+        txt += '.end\n'
+        with open(ini.cir_path + cirFile + '.cir', 'w') as f:
+            f.write(txt)
+        saves = ['v(g1)', 'v(d1)'] + ['@m1_op[%s]'%(p) for p in params]
+        raw_path = ini.cir_path + cirFile + '_op.raw'
+        raw_paths = _run_stepped(cirFile, 'op', raw_path, axes, points,
+                                 extra_saves=saves, workers=workers)
+        if raw_paths is None:
+            print("Error: NGspice run of the MOS characterization failed.")
+            return None
+        raw_arg = raw_paths if len(raw_paths) > 1 else raw_paths[0]
+        try:
+            result = NGspiceRaw2dict(raw_arg, axes, points)
+        except FileNotFoundError:
+            result = {}
+        n = len(points)
+        if any(len(np.atleast_1d(v)) != n for k, v in result.items()
+               if not k.startswith('run_')) or 'v(g1)' not in result:
+            print("Error: NGspice did not complete the MOS characterization "
+                  "(see {}).".format(_sim_files(cirFile)[1]))
+            return None
+        fields = [_MOS_CHAR_NAMES.get(p, p) for p in params]
+        table = np.zeros(n, dtype=[(name, float) for name in
+                                   axes + ['VSB', 'VGS', 'VDS'] + fields])
+        for j, axis in enumerate(axes):
+            table[axis] = points[:, j]
+        table['VSB'] = float(VS) - float(VB)
+        table['VGS'] = result['v(g1)'] - float(VS)
+        table['VDS'] = result['v(d1)'] - float(VS)
+        for p, name in zip(params, fields):
+            table[name] = result.get('@m1_op[%s]'%(p), np.full(n, np.nan))
+        np.save(fileName, table)
+        return table
+
+    def fromTable(self, table, index):
+        """
+        Takes the operating point of row 'index' of a table made with
+        :meth:`characterize`: sets *self*.W, *self*.L and *self*.params, and
+        makes *self*.parDefs and *self*.modelDef.
+
+        :param table: Table returned by :meth:`characterize`
+        :type table: numpy.ndarray
+
+        :param index: Row number
+        :type index: int
+        """
+        row = table[index]
+        self.W      = float(row['W'])
+        self.L      = float(row['L'])
+        self.step   = False
+        self.params = {name: float(row[name]) for name in table.dtype.names}
+        self._makeParDefs()
+        self._makeModelDef()
+
+    def fromLookup(self, lookup, **point):
+        """
+        Takes the operating point interpolated by a :class:`MOSlookup` at one
+        point: sets *self*.params and makes *self*.parDefs and
+        *self*.modelDef, as :meth:`getOPid` does, without running NGspice.
+
+        :param lookup: Lookup table of this device
+        :type lookup: SLiCAP.SLiCAPngspice.MOSlookup
+
+        :param point: Values of the grid variables W, L, ID, VD and VSB;
+                      W and L default to *self*.W and *self*.L.
+        :type point: float
+        """
+        for axis in ('W', 'L'):
+            point.setdefault(axis, _scale_float(getattr(self, axis)))
+        values = lookup.evaluate(**point)
+        self.W      = point['W']
+        self.L      = point['L']
+        self.step   = False
+        self.params = {name: float(np.ravel(value)[0]) for name, value in
+                       values.items()}
+        self._makeParDefs()
+        self._makeModelDef()
+
     def _getParams(self):
         with open('MOS_OP.out', 'r') as f:
             lines = f.readlines()
@@ -561,6 +830,211 @@ class MOS(object):
         remove('MOS_noise.csv')
         return output
 
+class MOSlookup(object):
+    """
+    Lookup table with the operating point of a MOS, interpolated at arbitrary
+    values of the grid variables.
+
+    The table is a regular grid over the variables W, L, ID, VD and VSB, as
+    made by :meth:`MOS.characterize`; variables with only one value in the
+    table are not interpolated. All interpolation is done with numpy arrays,
+    so a sizing loop can query the table at many points in one call.
+
+    W, L and ID are interpolated on a logarithmic axis when all their values
+    have the same sign, the other variables on a linear axis.
+
+    :param table: Table of :meth:`MOS.characterize`, a dict with a 1-D array
+                  per field (from :func:`load`), or the name of a .npy file
+                  (numpy.save()) or an HDF5 file (:func:`save`).
+    :type table: numpy.ndarray, dict, str
+
+    :param key: Name of the group in an HDF5 file; defaults to None.
+    :type key: str, NoneType
+
+    :param method: Interpolation method of
+                   scipy.interpolate.RegularGridInterpolator: 'linear'
+                   (multilinear), 'cubic', 'pchip' or 'quintic' (splines;
+                   these need at least 4, 4 or 6 values per variable).
+                   Defaults to 'linear'.
+    :type method: str
+
+    MOSlookup attributes:
+
+    - *self*.axes   = Names of the interpolated grid variables
+    - *self*.grid   = Dictionary with the values of all grid variables
+    - *self*.fields = Names of the tabulated parameters
+
+    :Example:
+
+    >>> M1 = sl.MOS('M1', '.lib CMOS18.lib', 'CMOS18N', '220n', '180n', 1)
+    >>> T  = M1.characterize({'L': ['180n', '360n', '720n'],
+    ...                       'ID': np.geomspace(1e-7, 1e-3, 41),
+    ...                       'VD': [0.3, 0.9, 1.5]})
+    >>> LUT = sl.MOSlookup(T)
+    >>> gm  = LUT.evaluate(['ggs'], L=400e-9, ID=np.geomspace(1e-6, 1e-4, 1000),
+    ...                    VD=0.9)['ggs']
+    >>> M1.fromLookup(LUT, L=400e-9, ID=20e-6, VD=0.9)
+    >>> M1.parDefs
+    """
+    def __init__(self, table, key=None, method='linear'):
+        if isinstance(table, (str, Path)):
+            if str(table).endswith('.npy'):
+                table = np.load(table)
+            else:
+                table = load(table, key)
+        if isinstance(table, np.ndarray):
+            table = {name: table[name] for name in table.dtype.names}
+        table = {name: np.ravel(np.asarray(value, dtype=float))
+                 for name, value in table.items()}
+        self.method = method
+        self.grid   = {}
+        self.axes   = []
+        self._log   = {}
+        shape   = []
+        indices = []
+        for axis in _MOS_LOOKUP_AXES:
+            if axis not in table:
+                continue
+            values, index = np.unique(table[axis], return_inverse=True)
+            self.grid[axis] = values
+            if len(values) > 1:
+                self.axes.append(axis)
+                self._log[axis] = axis in ('W', 'L', 'ID') and (
+                    np.all(values > 0) or np.all(values < 0))
+                shape.append(len(values))
+                indices.append(index)
+        self.fields = [name for name in table if name not in _MOS_LOOKUP_AXES]
+        n = len(next(iter(table.values())))
+        flat = np.ravel_multi_index(indices, shape) if indices else np.zeros(n, dtype=int)
+        if n != int(np.prod(shape)) or len(np.unique(flat)) != n:
+            raise ValueError("The table is not a regular grid over {}.".format(
+                             ", ".join(self.grid)))
+        data = np.empty((n, len(self.fields)))
+        data[flat] = np.column_stack([table[name] for name in self.fields])
+        data = data.reshape(tuple(shape) + (len(self.fields),))
+        if not self.axes:
+            self._data = data
+            self._interpolator = None
+        else:
+            self._interpolator = RegularGridInterpolator(
+                [self._scale(axis, self.grid[axis]) for axis in self.axes],
+                data, method=method, bounds_error=False, fill_value=np.nan)
+
+    def _scale(self, axis, values):
+        if self._log[axis]:
+            return np.log(np.abs(values))
+        return values
+
+    def evaluate(self, names=None, **point):
+        """
+        Returns tabulated parameters interpolated at one or more points.
+
+        Values outside the range of the table are NaN.
+
+        :param names: Names of the parameters; defaults to None: all fields
+                      of the table.
+        :type names: list, NoneType
+
+        :param point: Values of the grid variables: numbers or numpy arrays,
+                      broadcast against each other. A variable with one
+                      value in the table may be omitted.
+        :type point: float, numpy.ndarray
+
+        :return: Dictionary with the interpolated values per name, with the
+                 broadcast shape of the point values.
+        :rtype: dict
+
+        :raises ValueError: if an interpolated variable is not given, or a
+                            name is not in the table.
+        """
+        if names is None:
+            names = self.fields
+        for name in names:
+            if name not in self.fields:
+                raise ValueError("'{}' is not in the table; available: {}".format(
+                                 name, ", ".join(self.fields)))
+        for axis in point:
+            if axis not in self.grid:
+                raise ValueError("'{}' is not a variable of the table; "
+                                 "available: {}".format(axis, ", ".join(self.grid)))
+        missing = [axis for axis in self.axes if axis not in point]
+        if missing:
+            raise ValueError("Values of {} are required.".format(", ".join(missing)))
+        columns = [self.fields.index(name) for name in names]
+        if self._interpolator is None:
+            shape  = np.broadcast(*point.values()).shape if point else ()
+            values = np.broadcast_to(self._data.reshape(-1)[columns],
+                                     shape + (len(columns),))
+        else:
+            coords = np.broadcast_arrays(*[np.asarray(point[axis], dtype=float)
+                                           for axis in self.axes])
+            shape  = coords[0].shape
+            xi     = np.column_stack([self._scale(axis, c).ravel() for axis, c
+                                      in zip(self.axes, coords)])
+            values = self._interpolator(xi)[:, columns].reshape(
+                shape + (len(columns),))
+        for axis, value in point.items():
+            if axis not in self.axes and np.any(np.asarray(value) != self.grid[axis][0]):
+                values = np.where(np.expand_dims(np.asarray(value) == self.grid[axis][0], -1),
+                                  values, np.nan)
+        return {name: values[..., i] for i, name in enumerate(names)}
+
+    def modelParams(self, refDes='', **point):
+        """
+        Returns the parameters of the SLiCAP small-signal MOS model
+        (gm, gb, go, cgs, cgb, cdg, cdb and csb), derived as
+        :meth:`MOS.getOPid` derives them, interpolated at one or more points.
+
+        :param refDes: Reference designator; if given, the keys are the
+                       SLiCAP parameter symbols (gm_<refDes>, ...) as in
+                       *MOS.parDefs*. Defaults to '': the keys are the model
+                       parameter names.
+        :type refDes: str
+
+        :param point: Values of the grid variables, see :meth:`evaluate`
+        :type point: float, numpy.ndarray
+
+        :return: Dictionary with the parameter values
+        :rtype: dict
+        """
+        p = self.evaluate(['ggs', 'gbs', 'gdd', 'cgs', 'csg', 'cgb', 'cbg',
+                           'cdg', 'cgd', 'cdb', 'cbd', 'csb', 'cbs'], **point)
+        values = {'gm' : p['ggs'],
+                  'gb' : p['gbs'],
+                  'go' : p['gdd'],
+                  'cgs': (p['cgs'] + p['csg'])/2,
+                  'cgb': (p['cgb'] + p['cbg'])/2,
+                  'cdg': (p['cdg'] + p['cgd'])/2,
+                  'cdb': (p['cdb'] + p['cbd'])/2,
+                  'csb': (p['csb'] + p['cbs'])/2}
+        if refDes:
+            values = {Symbol(name + '_' + refDes): value for name, value in
+                      values.items()}
+        return values
+
+def _run_deck(deck, log_file):
+    """Run the complete deck file *deck*, control section included, and
+    write the console output to *log_file*: in-process with the shared NGspice
+    library (``source``, :mod:`SLiCAP.SLiCAPlibngspice`) when it is enabled,
+    else as an ngspice process.
+
+    :return: True if ngspice completed.
+    """
+    ng = _libngspice.instance()
+    if ng is not None:
+        with ng.lock:
+            ng.output()
+            ok = ng.command(f"source {Path(deck).as_posix()}")
+            ng.command("destroy all")
+            ng.command("remcirc")
+            output = ng.output()
+        if ok:
+            with open(log_file, 'w') as f:
+                f.write(output + "\n")
+            return True
+    return _run_ngspice([ini.ngspice, '-b', deck, '-o', log_file])
+
+
 def _run_ngspice(args, stdout_path=None, timeout=None):
     """Run ngspice as a direct child process so it can be reliably terminated.
 
@@ -1039,7 +1513,7 @@ def selectTraces(traceDict, namesList):
     return {key: traceDict[key] for key in namesList if key in traceDict}
 
 
-def NGspiceRaw2dict(raw_path, step_param=None, step_values=None):
+def NGspiceRaw2dict(raw_path, step_param=None, step_values=None, lazy=False):
     """
     Parse an NGspice Nutmeg raw file and return a unified result dictionary.
 
@@ -1067,11 +1541,14 @@ def NGspiceRaw2dict(raw_path, step_param=None, step_values=None):
     helpers in ``SLiCAPmath`` (``mag()``, ``dB()``, ``phase()``) for post-processing.
 
     :param raw_path: Path(s) to NGspice ``.raw`` file(s).  Pass a single
-                     ``str``/``Path`` for a non-stepped run.  For stepped runs
-                     pass the list of per-step raw-file paths returned by
-                     the deck's control block; one ``Analysis`` block is read
-                     from each file and the step files are deleted afterwards.
-    :type raw_path: str, pathlib.Path, list
+                     ``str``/``Path`` for a non-stepped run or a stepped run
+                     in one process.  For a stepped run split over several
+                     processes pass the list of per-shard raw-file paths in
+                     shard order; their ``Analysis`` blocks are concatenated
+                     in that order and the shard files are deleted afterwards.
+                     :class:`Analysis` blocks (an in-process run with the
+                     shared NGspice library) are taken as they are.
+    :type raw_path: str, pathlib.Path, list, Analysis
 
     :param step_param: Name of the stepped parameter (e.g. ``"R1"``).
     :type step_param: str, NoneType
@@ -1079,18 +1556,30 @@ def NGspiceRaw2dict(raw_path, step_param=None, step_values=None):
     :param step_values: 1-D sequence of step parameter values.
     :type step_values: list, numpy.ndarray, NoneType
 
+    :param lazy: True reads the raw file(s) with :meth:`RawFile.open`: the
+                 arrays are read-only views into the file, and the 2-D
+                 signals of a stepped sweep are strided views instead of
+                 copies (:meth:`RawFile.stacked`).  The raw files are then
+                 kept, also those of a run over several processes.
+    :type lazy: bool
+
     :return: Result dictionary — structure depends on analysis type (see above).
     :rtype: dict
     """
-    if isinstance(raw_path, list):
+    read = RawFile.open if lazy else RawFile.load
+    if isinstance(raw_path, Analysis):
+        analyses = [raw_path]
+    elif isinstance(raw_path, list):
         analyses = []
         for p in raw_path:
-            blocks = RawFile.load(p)
-            if blocks:
-                analyses.append(blocks[0])
-            Path(p).unlink(missing_ok=True)
+            if isinstance(p, Analysis):         # in-process run (_run_shared)
+                analyses.append(p)
+                continue
+            analyses.extend(read(p))
+            if not lazy:
+                Path(p).unlink(missing_ok=True)
     else:
-        analyses = RawFile.load(raw_path)
+        analyses = read(raw_path)
     if not analyses:
         return {}
 
@@ -1130,9 +1619,9 @@ def NGspiceRaw2dict(raw_path, step_param=None, step_values=None):
         for i in range(n_runs):
             result[run_keys[i]] = step_values[i]
         for name in a0.signals:
-            arrays = [a.signals[name] for a in analyses if name in a.signals]
-            if arrays:
-                result[name] = np.stack(arrays, axis=0)   # (n_runs, n_sweep)
+            runs = [a for a in analyses if name in a.signals]
+            if runs:
+                result[name] = RawFile.stacked(runs, name)   # (n_runs, n_sweep)
         return result
 
     # Single-parameter stepping — step_values is 1-D
@@ -1150,9 +1639,9 @@ def NGspiceRaw2dict(raw_path, step_param=None, step_values=None):
 
     result = {a0.x_name: a0.x_data, step_key: step_values}
     for name in a0.signals:
-        arrays = [a.signals[name] for a in analyses if name in a.signals]
-        if arrays:
-            result[name] = np.stack(arrays, axis=0)   # (n_steps, n_sweep)
+        runs = [a for a in analyses if name in a.signals]
+        if runs:
+            result[name] = RawFile.stacked(runs, name)   # (n_steps, n_sweep)
     return result
 
 
@@ -1270,7 +1759,19 @@ def _control_block(analysis_cmd, raw_path, options=None, noise=False,
     # (Anton, 2026-08-01: the analysis call speaks NGspice, the Python names
     # are chosen afterwards in make_traces).
     lines = [".control", "set filetype=binary"]
-    lines.append("save " + " ".join(extra_saves) if extra_saves else "save all")
+    lines += _analysis_lines(analysis_cmd, options, noise, extra_saves,
+                             post_lines)
+    lines.append(f"write {Path(raw_path).as_posix()}")
+    lines.append(".endc")
+    return "\n".join(lines)
+
+
+def _analysis_lines(analysis_cmd, options=None, noise=False, extra_saves=None,
+                    post_lines=None):
+    """The commands of ONE run, from ``save`` up to the post-processing; the
+    plot that is current afterwards holds the run's result.  Shared by the
+    control blocks and the in-process runs (:func:`_run_shared`)."""
+    lines = ["save " + " ".join(extra_saves) if extra_saves else "save all"]
     if noise:
         lines.append("set sqrnoise")
     if options:
@@ -1288,9 +1789,7 @@ def _control_block(analysis_cmd, raw_path, options=None, noise=False,
         lines.append("setplot previous")
     if post_lines:
         lines.extend(post_lines)
-    lines.append(f"write {Path(raw_path).as_posix()}")
-    lines.append(".endc")
-    return "\n".join(lines)
+    return lines
 
 
 def _ng_number(v) -> str:
@@ -1342,19 +1841,9 @@ def _stepped_control_block(analysis_cmd, raw_path, step_param, step_vals,
     lines.append("  reset")
     if temp_idx is not None:
         lines.append(f"  option temp = $&__v{temp_idx}")
-    lines.append("  save " + " ".join(extra_saves) if extra_saves
-                 else "  save all")
-    if noise:
-        lines.append("  set sqrnoise")
-    if options:
-        for k, v in options.items():
-            lines.append(f"  option {k} = {_deck_value(v, k)}"
-                         if v is not None else f"  option {k}")
-    lines.append("  " + analysis_cmd)
-    if noise:
-        lines.append("  setplot previous")   # this run's spectra, not run 1's
-    if post_lines:
-        lines.extend("  " + pl for pl in post_lines)
+    lines.extend("  " + line for line in
+                 _analysis_lines(analysis_cmd, options, noise, extra_saves,
+                                 post_lines))
     lines.append(f"  write {Path(raw_path).as_posix()}")
     lines.append("  let __i = __i + 1")
     lines.append("end")
@@ -1523,7 +2012,7 @@ def _apply_stimuli(netlist_text, stimuli):
     return "\n".join(lines)
 
 
-def _sim_files(cirFile):
+def _sim_files(cirFile, shard=None):
     """The file names of one NGspice run: the deck, the ngspice ``-o`` log and
     the captured console output.
 
@@ -1535,31 +2024,25 @@ def _sim_files(cirFile):
     :param cirFile: circuit file name without extension.
     :type cirFile: str
 
+    :param shard: Index of the shard of a stepped run that is split over
+                  several NGspice processes (:func:`_run_stepped`); its files
+                  are ``<cirFile>_s<shard>.*``.  ``None`` for a single run.
+    :type shard: int, NoneType
+
     :return: ``(deck, log, stdout)`` paths.
     :rtype: tuple
     """
+    if shard is not None:
+        cirFile = f"{cirFile}_s{shard}"
     sim_path = Path(ini.cir_path + cirFile + '.sp')
     return (str(sim_path),
             str(sim_path.with_suffix('.log')),
             str(sim_path.with_suffix('.txt')))
 
 
-def _run_raw(cirFile, control_section, behavior, timeout,
-             instr_params=None, stimuli=None, savecurrents=False):
-    """Append control_section to cirFile.cir, run NGspice; return True on success.
-
-    Writes ONE self-contained ngspice deck ``<cir_path>/<cirFile>.sp``: the
-    ``<cirFile>.cir`` netlist followed by the analysis ``.control`` section
-    (which sits at the end and does not affect the netlist above it).  It is
-    regenerated on every run and doubles as the GUI's "Export NGspice Netlist"
-    file — one file is enough.  The sibling ``.log`` (ngspice ``-o``) and
-    ``.txt`` (console) share its base name (:func:`_sim_files`).
-
-    *instr_params*: ordered list of ``(name, value)`` tuples — per-instruction
-    parameter definitions applied to the netlist before the run.
-    """
-    sim_file, log_file, stdout_file = _sim_files(cirFile)
-
+def _run_netlist(cirFile, instr_params=None, stimuli=None, savecurrents=False):
+    """The netlist of a run: ``<cirFile>.cir`` without ``.end``, with the
+    per-instruction parameters and stimuli applied (:func:`_run_raw`)."""
     with open(ini.cir_path + cirFile + '.cir', 'r') as f:
         netlist = f.read()
     stripped = "\n".join(l for l in netlist.splitlines()
@@ -1574,14 +2057,160 @@ def _run_raw(cirFile, control_section, behavior, timeout,
         # control section, after the circuit is loaded, does nothing (measured
         # 2026-08-01).
         stripped = stripped.rstrip("\n") + "\n.options savecurrents\n"
+    return stripped
+
+
+def _run_raw(cirFile, control_section, behavior, timeout,
+             instr_params=None, stimuli=None, savecurrents=False, shard=None,
+             cache=False):
+    """Append control_section to cirFile.cir, run NGspice; return True on success.
+
+    Writes ONE self-contained ngspice deck ``<cir_path>/<cirFile>.sp``: the
+    ``<cirFile>.cir`` netlist followed by the analysis ``.control`` section
+    (which sits at the end and does not affect the netlist above it).  It is
+    regenerated on every run and doubles as the GUI's "Export NGspice Netlist"
+    file — one file is enough.  The sibling ``.log`` (ngspice ``-o``) and
+    ``.txt`` (console) share its base name (:func:`_sim_files`).
+
+    *instr_params*: ordered list of ``(name, value)`` tuples — per-instruction
+    parameter definitions applied to the netlist before the run.
+
+    *shard*: index of a shard of a stepped run; it gets its own deck and
+    outputs (:func:`_sim_files`), so shards can run concurrently.
+
+    *cache*: True looks the deck up in the result cache first and stores the
+    run's outputs in it (:func:`_cached_run`); only for the control sections
+    SLiCAP generates, whose outputs are the raw files they ``write``.
+    """
+    sim_file, log_file, stdout_file = _sim_files(cirFile, shard)
+    stripped = _run_netlist(cirFile, instr_params, stimuli, savecurrents)
+    deck = stripped + "\n" + control_section + "\n.end\n"
     with open(sim_file, 'w') as f:
-        f.write(stripped + "\n" + control_section + "\n.end\n")
+        f.write(deck)
     args = [ini.ngspice, '-b', sim_file, '-o', log_file]
     if behavior:
         args += ['-D', f'ngbehavior={behavior}']
+    if cache:
+        return _cached_run(deck, args, stdout_file, log_file, timeout)
     return _run_ngspice(args, stdout_path=stdout_file, timeout=timeout)
 
 
+# =============================================================================
+# Result cache: the outputs of a deck, keyed by its content
+# =============================================================================
+
+_INCLUDE_RE = re.compile(r'^\s*\.(include|inc|lib)\s+("[^"]+"|\'[^\']+\'|\S+)(.*)$',
+                         re.IGNORECASE | re.MULTILINE)
+_WRITE_RE   = re.compile(r'^\s*write\s+(\S+)', re.MULTILINE)
+_cache_lock = threading.Lock()
+
+
+def _include_digests(text, base_dir, h, seen):
+    """Update the hash *h* with the contents of the files that *text*
+    includes (``.include``, ``.inc``, ``.lib``), recursively.  A file is
+    looked up relative to *base_dir* (the including file's directory), then
+    the working directory.  Returns False when an included file cannot be
+    found: the deck then depends on something the key cannot see."""
+    for match in _INCLUDE_RE.finditer(text):
+        name = match.group(2).strip('"\'')
+        path = Path(name)
+        if not path.is_absolute():
+            path = Path(base_dir) / name
+            if not path.is_file():
+                path = Path(name)
+        if not path.is_file():
+            if match.group(1).lower() == "lib" and not match.group(3).strip():
+                continue                        # .lib <section> in a library
+            return False
+        path = path.resolve()
+        if path in seen:
+            continue
+        seen.add(path)
+        data = path.read_bytes()
+        h.update(str(path).encode() + b"\0" + hashlib.sha256(data).digest())
+        if not _include_digests(data.decode("latin-1"), path.parent, h, seen):
+            return False
+    return True
+
+
+def _ngspice_id(command):
+    """The identity of the NGspice executable *command*: its resolved path,
+    modification time and size, so that an upgraded or replaced ngspice
+    gets new cache keys; None when it cannot be found."""
+    path = which(command) or command
+    try:
+        path = Path(path).resolve()
+        st = path.stat()
+    except OSError:
+        return None
+    return f"{path}\0{st.st_mtime_ns}\0{st.st_size}"
+
+
+def _deck_key(deck, args):
+    """The result-cache key of an NGspice run: a hash of the command, the
+    NGspice executable (:func:`_ngspice_id`), the deck and every file it
+    includes; None when the executable or an include is not found."""
+    ngspice = _ngspice_id(args[0])
+    if ngspice is None:
+        return None
+    h = hashlib.sha256()
+    h.update(ngspice.encode() + b"\0" + repr(args).encode() + b"\0" + deck.encode())
+    if not _include_digests(deck, ini.cir_path, h, set()):
+        return None
+    return h.hexdigest()
+
+
+def _cached_run(deck, args, stdout_file, log_file, timeout):
+    """Run NGspice for *deck* unless the result cache has its outputs.
+
+    The cache is the directory ``ngspice_cache`` in the project results
+    directory, with per key the raw files the deck writes, the log and the
+    console output.  A hit copies them to where the run would have written
+    them, so the callers read them as after a run, without ngspice being
+    started - typically when a report script is run again.  The key
+    (:func:`_deck_key`) covers the deck with its parameters, stimuli,
+    options, steps and analysis command, the contents of the included
+    files, and the path, modification time and size of the ngspice
+    executable, so that results of an older ngspice are not reused.  ``ini.ngspice_cache`` bounds the size of the cache in MB (0
+    disables it); the least recently used entries are removed first.
+    """
+    key = _deck_key(deck, args) if ini.ngspice_cache > 0 else None
+    raws = list(dict.fromkeys(_WRITE_RE.findall(deck)))
+    if key is None or not raws:
+        return _run_ngspice(args, stdout_path=stdout_file, timeout=timeout)
+    cache_dir = Path(ini.results_path) / "ngspice_cache"
+    entry = cache_dir / key
+    targets = raws + [log_file, stdout_file]
+    names = [f"{i}.raw" for i in range(len(raws))] + ["log", "txt"]
+    if entry.is_dir():
+        try:
+            for name, target in zip(names, targets):
+                if name.endswith(".raw") or (entry / name).is_file():
+                    copy2(entry / name, target)
+            entry.touch()                       # most recently used
+            return True
+        except OSError:
+            pass                                # incomplete entry: run again
+    if not _run_ngspice(args, stdout_path=stdout_file, timeout=timeout):
+        return False
+    if not all(Path(raw).is_file() for raw in raws):
+        return True                             # failed run: not cached
+    with _cache_lock:
+        try:
+            tmp = cache_dir / (key + ".tmp")
+            rmtree(tmp, ignore_errors=True)
+            tmp.mkdir(parents=True)
+            for name, target in zip(names, targets):
+                if Path(target).is_file():
+                    copy2(target, tmp / name)
+            rmtree(entry, ignore_errors=True)
+            tmp.rename(entry)
+            _evictLRU(cache_dir, ini.ngspice_cache * 1e6)
+        except OSError:
+            pass
+    return True
+
+
 def _clean_run_outputs(cirFile, raw_path, stepped):
     """Start-of-run cleanup: remove THIS circuit's transient outputs from the
     PREVIOUS run before this run produces anything.  So no run inherits stale
@@ -1599,14 +2228,14 @@ def _clean_run_outputs(cirFile, raw_path, stepped):
     """
     cir  = Path(ini.cir_path)
     base = Path(raw_path)
-    # The run's own deck and outputs (_sim_files) plus the per-step files of
-    # the pre-single-process era.  The log is REGENERATED by this run and is
-    # read back for the fourier table, so a stale one must not survive.
+    # The run's own deck and outputs (_sim_files) plus the per-shard files of
+    # a run split over several processes.  The log is REGENERATED by this run
+    # and is read back for the fourier table, so a stale one must not survive.
     for pattern in (f"{cirFile}.sp",   f"{cirFile}.log",   f"{cirFile}.txt",
                     f"{cirFile}_s*.sp", f"{cirFile}_s*.log", f"{cirFile}_s*.txt"):
         for old in cir.glob(pattern):
             old.unlink(missing_ok=True)
-    for old in base.parent.glob(base.stem + "_s*.raw"):   # per-step raws (regenerated)
+    for old in base.parent.glob(base.stem + "_s*.raw"):   # per-shard raws (regenerated)
         old.unlink(missing_ok=True)
     if not stepped:                                       # unstepped run rewrites the base raw
         base.unlink(missing_ok=True)
@@ -1615,7 +2244,7 @@ def _clean_run_outputs(cirFile, raw_path, stepped):
 def _run_stepped(cirFile, analysis_cmd, raw_path, step_param, step_vals,
                  options=None, noise=False, extra_saves=None, behavior=None,
                  timeout=None, instr_params=None, post_lines=None,
-                 stimuli=None, savecurrents=False):
+                 stimuli=None, savecurrents=False, workers=None):
     """Run NGspice and return a list of raw-file paths, or None on error.
 
     - Non-stepped: single run, returns ``[raw_path]``.
@@ -1627,9 +2256,21 @@ def _run_stepped(cirFile, analysis_cmd, raw_path, step_param, step_vals,
       temperature model, manual sec.1.3) for TEMP.  ``NGspiceRaw2dict`` reads
       the N-block raw for both single and array stepping.
 
-    (Earlier this fanned out to N parallel subprocesses writing ``*_sN.raw``;
-    ngspice's own control-section stepping does it in one process -- fewer
-    files, no per-step netlist injection.)
+    - Stepped with *workers* > 1 (default ``ini.ngspice_workers``): the step
+      values are split into *workers* contiguous shards, and each shard is
+      swept as above by its own ngspice process, with its own deck
+      (:func:`_sim_files`) and raw ``*_s<k>.raw``.  The processes run
+      concurrently; the raw files are returned in shard order, so reading
+      their blocks in sequence gives the steps in order
+      (:func:`NGspiceRaw2dict`).  ``workers=1`` is the single-process case.
+
+    - With the shared NGspice library (``ini.ngspice_shared``) the run is
+      done in-process and the list holds the :class:`Analysis` blocks, one
+      per run, instead (:func:`_run_shared`); not for a run with a
+      *timeout*, a *behavior*, or over several *workers*.
+
+    (Earlier this fanned out to one subprocess per STEP; the shards keep
+    ngspice's own control-section stepping within each process.)
     """
     base = Path(raw_path)
 
@@ -1639,15 +2280,51 @@ def _run_stepped(cirFile, analysis_cmd, raw_path, step_param, step_vals,
     # survives non-op runs for the bias annotation.
     _clean_run_outputs(cirFile, raw_path, step_vals is not None)
 
+    if step_vals is not None:
+        if workers is None:
+            workers = ini.ngspice_workers
+        workers = max(1, min(int(workers), len(step_vals)))
+    if timeout is None and not behavior and (step_vals is None or workers == 1):
+        analyses = _run_shared(cirFile, analysis_cmd, raw_path, step_param,
+                               step_vals, options, noise, extra_saves,
+                               post_lines, instr_params, stimuli,
+                               savecurrents)
+        if analyses is not None:
+            return analyses
+
     if step_vals is None:
         ctrl = _control_block(analysis_cmd, str(base), options, noise,
                               extra_saves, post_lines)
         if not _run_raw(cirFile, ctrl, behavior, timeout,
                         instr_params=instr_params, stimuli=stimuli,
-                    savecurrents=savecurrents):
+                        savecurrents=savecurrents, cache=True):
             return None
         return [str(base)]
 
+    n_steps = len(step_vals)
+    if workers > 1:
+        # Contiguous shards, sizes differing by at most one step.
+        bounds = [(k * n_steps) // workers for k in range(workers + 1)]
+        shard_raws = [base.with_name(f"{base.stem}_s{k}.raw")
+                      for k in range(workers)]
+
+        def run_shard(k):
+            ctrl = _stepped_control_block(analysis_cmd, str(shard_raws[k]),
+                                          step_param,
+                                          list(step_vals[bounds[k]:bounds[k + 1]]),
+                                          options, noise, extra_saves,
+                                          post_lines)
+            return _run_raw(cirFile, ctrl, behavior, timeout,
+                            instr_params=instr_params, stimuli=stimuli,
+                            savecurrents=savecurrents, shard=k, cache=True)
+
+        # Threads only wait for their ngspice process.
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            done = list(pool.map(run_shard, range(workers)))
+        if not all(done):
+            return None
+        return [str(raw) for raw in shard_raws]
+
     # Every sweep -> ONE ngspice process: N analyses appended to one raw.
     stepped_raw = base.with_name(base.stem + "_step.raw")
     stepped_raw.unlink(missing_ok=True)              # fresh appendwrite target
@@ -1656,11 +2333,86 @@ def _run_stepped(cirFile, analysis_cmd, raw_path, step_param, step_vals,
                                   extra_saves, post_lines)
     if not _run_raw(cirFile, ctrl, behavior, timeout,
                     instr_params=instr_params, stimuli=stimuli,
-                    savecurrents=savecurrents):
+                    savecurrents=savecurrents, cache=True):
         return None
     return [str(stepped_raw)]
 
 
+def _run_shared(cirFile, analysis_cmd, raw_path, step_param, step_vals,
+                options=None, noise=False, extra_saves=None, post_lines=None,
+                instr_params=None, stimuli=None, savecurrents=False):
+    """Run the analysis in-process with the shared NGspice library
+    (:mod:`SLiCAP.SLiCAPlibngspice`); return a list of :class:`Analysis`
+    blocks, one per run, or None when the library is not enabled or the run
+    fails - the caller then runs ngspice as a process.
+
+    The circuit is loaded once.  A stepped run alters the parameters and
+    repeats the analysis from Python, in the order of
+    :func:`_stepped_control_block`, and the vectors of every run are copied
+    from memory: no deck, process or raw file per run.  Only an un-stepped
+    run still writes its base raw, which is read after a run (the bias
+    annotation reads ``<cirFile>_op.raw``).  The console output goes to the
+    run's log (:func:`_sim_files`), where the ``fourier`` table is read.
+    """
+    ng = _libngspice.instance()
+    if ng is None:
+        return None
+    if step_vals is None:
+        params, rows = [], [[]]
+    elif isinstance(step_param, list):
+        params, rows = list(step_param), [list(row) for row in step_vals]
+    else:
+        params, rows = [step_param], [[v] for v in step_vals]
+    netlist = _run_netlist(cirFile, instr_params, stimuli, savecurrents)
+    _, log_file, stdout_file = _sim_files(cirFile)
+    analyses = []
+    with ng.lock:
+        ng.output()
+        ok = ng.circuit(netlist.splitlines())
+        seen = {ng.curPlot()}
+        for row in rows:
+            if not ok:
+                break
+            lines = []
+            if step_vals is not None:
+                values = dict(zip(params, row))
+                lines += [f"alterparam {p} = {_ng_number(v)}"
+                          for p, v in values.items() if str(p).lower() != "temp"]
+                lines.append("reset")
+                lines += [f"option temp = {_ng_number(v)}"
+                          for p, v in values.items() if str(p).lower() == "temp"]
+            lines += _analysis_lines(analysis_cmd, options, noise, extra_saves,
+                                     post_lines)
+            ok = all(ng.command(line) for line in lines)
+            plot = ng.curPlot()
+            # No new plot: the analysis did not run
+            ok = ok and plot not in seen
+            if ok:
+                seen.add(plot)
+                analyses.append(_shared_analysis(ng, plot))
+        if ok and step_vals is None:
+            ok = (ng.command("set filetype=binary") and
+                  ng.command(f"write {Path(raw_path).as_posix()}"))
+        ng.command("destroy all")
+        ng.command("remcirc")
+        output = ng.output()
+    for name in (log_file, stdout_file):
+        with open(name, 'w') as f:
+            f.write(output + "\n")
+    return analyses if ok else None
+
+
+def _shared_analysis(ng, plot):
+    """The :class:`Analysis` of the in-memory *plot*, named as in a raw file."""
+    title, x_name, vectors = _libngspice.plotData(ng, plot)
+    names = [name for name, _ in vectors]
+    if not x_name:
+        return Analysis(name=title, x_name="", x_data=np.array([]),
+                        signals=dict(vectors), var_names=names)
+    return Analysis(name=title, x_name=x_name, x_data=np.real(vectors[0][1]),
+                    signals=dict(vectors[1:]), var_names=names)
+
+
 def _get_output_vars(netlist: str) -> list[str]:
     """Parse an NGspice netlist text and return measurable signal names.
 
@@ -2033,7 +2785,8 @@ def _no_currents_in(analysis, savecurrents):
 
 
 def op(cirFile, save=None, step=None, params=None, options=None,
-       behavior=None, timeout=None, stimuli=None, savecurrents=False):
+       behavior=None, timeout=None, stimuli=None, savecurrents=False,
+       workers=None):
     """
     Run an NGspice operating-point (``.op``) analysis.
 
@@ -2099,6 +2852,11 @@ def op(cirFile, save=None, step=None, params=None, options=None,
     :param timeout: Simulation time limit in seconds.  ``None`` = no limit.
     :type timeout: float, NoneType
 
+    :param workers: Number of NGspice processes for a stepped run: the step
+                    values are split into this many contiguous shards, each
+                    run by its own process.  ``None`` = ``ini.ngspice_workers``.
+    :type workers: int, NoneType
+
     :return: Result dictionary.
     :rtype: dict
     """
@@ -2117,7 +2875,8 @@ def op(cirFile, save=None, step=None, params=None, options=None,
                              options=options, extra_saves=extra_saves or None,
                              behavior=behavior, timeout=timeout,
                              instr_params=params, stimuli=stimuli,
-                             savecurrents=savecurrents)
+                             savecurrents=savecurrents,
+                             workers=workers)
     if raw_paths is None:
         return {}
     raw_arg = raw_paths if len(raw_paths) > 1 else raw_paths[0]
@@ -2135,7 +2894,7 @@ def op(cirFile, save=None, step=None, params=None, options=None,
 
 def dc(cirFile, source, start, stop, incr, save=None,
        step=None, params=None, options=None, behavior=None, timeout=None,
-       stimuli=None, savecurrents=False):
+       stimuli=None, savecurrents=False, workers=None):
     """
     Run an NGspice DC sweep analysis.
 
@@ -2174,6 +2933,10 @@ def dc(cirFile, source, start, stop, incr, save=None,
     :param timeout: Simulation time limit in seconds.
     :type timeout: float, NoneType
 
+    :param workers: Number of NGspice processes for a stepped run (see
+                    :func:`op`).
+    :type workers: int, NoneType
+
     :return: Result dictionary with sweep variable and signal arrays.
     :rtype: dict
     """
@@ -2190,7 +2953,8 @@ def dc(cirFile, source, start, stop, incr, save=None,
                              options=options, behavior=behavior, timeout=timeout,
                              instr_params=params, stimuli=stimuli,
                              extra_saves=list(save or []),
-                             savecurrents=savecurrents)
+                             savecurrents=savecurrents,
+                             workers=workers)
     if raw_paths is None:
         return {}
     raw_arg = raw_paths if len(raw_paths) > 1 else raw_paths[0]
@@ -2209,7 +2973,7 @@ def dc(cirFile, source, start, stop, incr, save=None,
 
 def ac(cirFile, method, n, fstart, fstop, save=None,
        step=None, params=None, options=None, behavior=None, timeout=None,
-       stimuli=None, savecurrents=False):
+       stimuli=None, savecurrents=False, workers=None):
     """
     Run an NGspice AC sweep analysis.
 
@@ -2253,6 +3017,10 @@ def ac(cirFile, method, n, fstart, fstop, save=None,
     :param timeout: Simulation time limit in seconds.
     :type timeout: float, NoneType
 
+    :param workers: Number of NGspice processes for a stepped run (see
+                    :func:`op`).
+    :type workers: int, NoneType
+
     :return: Result dictionary; ``"frequency"`` key holds the 1-D frequency array.
     :rtype: dict
     """
@@ -2270,7 +3038,8 @@ def ac(cirFile, method, n, fstart, fstop, save=None,
                              options=options, behavior=behavior, timeout=timeout,
                              instr_params=params, stimuli=stimuli,
                              extra_saves=list(save or []),
-                             savecurrents=savecurrents)
+                             savecurrents=savecurrents,
+                             workers=workers)
     if raw_paths is None:
         return {}
     raw_arg = raw_paths if len(raw_paths) > 1 else raw_paths[0]
@@ -2373,7 +3142,8 @@ def _parse_fourier_log(txt_path):
 
 def tran(cirFile, tstep, tstop, tstart=0, save=None,
          step=None, params=None, options=None, behavior=None, timeout=None,
-         fourier=None, fft=None, stimuli=None, savecurrents=False):
+         fourier=None, fft=None, stimuli=None, savecurrents=False,
+         workers=None):
     """
     Run an NGspice transient analysis, optionally with Fourier/FFT
     post-processing (the legacy ``ngspice2traces`` ``postProc`` semantics,
@@ -2427,6 +3197,10 @@ def tran(cirFile, tstep, tstop, tstart=0, save=None,
     :param timeout: Simulation time limit in seconds.
     :type timeout: float, NoneType
 
+    :param workers: Number of NGspice processes for a stepped run (see
+                    :func:`op`).
+    :type workers: int, NoneType
+
     :return: Result dictionary; ``"time"`` key holds the 1-D time array.
     :rtype: dict
     """
@@ -2483,7 +3257,8 @@ def tran(cirFile, tstep, tstop, tstart=0, save=None,
                              options=options, behavior=behavior, timeout=timeout,
                              instr_params=params, post_lines=post_lines or None, stimuli=stimuli,
                              extra_saves=list(save or []),
-                             savecurrents=savecurrents)
+                             savecurrents=savecurrents,
+                             workers=workers)
     if raw_paths is None:
         return {}
     raw_arg = raw_paths if len(raw_paths) > 1 else raw_paths[0]
@@ -2520,7 +3295,8 @@ def tran(cirFile, tstep, tstop, tstart=0, save=None,
 
 def noise(cirFile, output, input_src, method, n, fstart, fstop, save=None,
           step=None, params=None, options=None, behavior=None, timeout=None,
-          stimuli=None, contributions=False, savecurrents=False):
+          stimuli=None, contributions=False, savecurrents=False,
+          workers=None):
     """
     Run an NGspice noise analysis.  Results stored as V²/Hz PSD
     (``set sqrnoise`` is always active).
@@ -2569,6 +3345,10 @@ def noise(cirFile, output, input_src, method, n, fstart, fstop, save=None,
     :param timeout: Simulation time limit in seconds.
     :type timeout: float, NoneType
 
+    :param workers: Number of NGspice processes for a stepped run (see
+                    :func:`op`).
+    :type workers: int, NoneType
+
     :return: Result dictionary; ``"frequency"`` key holds the 1-D frequency array.
              Noise signal arrays are real (V²/Hz).
     :rtype: dict
@@ -2592,7 +3372,8 @@ def noise(cirFile, output, input_src, method, n, fstart, fstop, save=None,
                              options=options, noise=True, behavior=behavior,
                              timeout=timeout, instr_params=params, stimuli=stimuli,
                                 savecurrents=savecurrents,
-                             extra_saves=list(save or []))
+                             extra_saves=list(save or []),
+                             workers=workers)
     if raw_paths is None:
         return {}
     raw_arg = raw_paths if len(raw_paths) > 1 else raw_paths[0]
@@ -3174,8 +3955,50 @@ def _numeric_par_defs(instr):
     return numeric
 
 
+def _analyses2dataset(analyses):
+    """A dataset of raw-file blocks: one :class:`Analysis`, or a list of them
+    with the runs of a stepped result (:meth:`RawFile.open` keeps them
+    memory-mapped; the 2-D signals are then views, see
+    :meth:`RawFile.stacked`).  The raw file has no step values: the runs
+    are numbered.  None for an un-stepped operating point or blocks that
+    do not belong together."""
+    if isinstance(analyses, Analysis):
+        analyses = [analyses]
+    a0 = analyses[0]
+    if any(a.var_names != a0.var_names for a in analyses):
+        return None
+    is_op = "operating point" in a0.name.lower()
+    if is_op and len(analyses) == 1:
+        return None
+    if len(analyses) == 1:
+        x_name, x_data, signals = a0.x_name, a0.x_data, dict(a0.signals)
+    elif is_op:
+        x_name = "run"
+        x_data = np.arange(1, len(analyses) + 1)
+        signals = {name: RawFile.stacked(analyses, name)[:, 0]
+                   for name in a0.signals}
+    else:
+        if any(len(a.x_data) != len(a0.x_data) for a in analyses):
+            return None
+        x_name, x_data = a0.x_name, a0.x_data
+        signals = {name: RawFile.stacked(analyses, name)
+                   for name in a0.signals}
+    units = {}
+    for name in list(signals) + [x_name]:
+        found = (_NG_SWEEP_UNITS.get(str(name).lower())
+                 or _ngspice_units_hint(name))
+        if found:
+            units[name] = found
+    return dataset(x_name=x_name, x_data=x_data, signals=signals, units=units)
+
+
 def _ngspice_dataset_adapter(obj):
-    """Registered converter: an NGspice result object -> dataset."""
+    """Registered converter: an NGspice result object, or the blocks of a raw
+    file (:meth:`RawFile.load`, :meth:`RawFile.open`) -> dataset."""
+    if isinstance(obj, Analysis) or (
+            isinstance(obj, list) and obj and
+            all(isinstance(a, Analysis) for a in obj)):
+        return _analyses2dataset(obj)
     from SLiCAP.SLiCAPinstruction import instruction as _instruction
     if not isinstance(obj, _instruction):
         return None
@@ -12,7 +12,8 @@ import SLiCAP.SLiCAPconfigure as ini
 from random import randint
 from SLiCAP.SLiCAPlex import _SCALEFACTORS
 from SLiCAP.SLiCAPmath import _makeNumData, _dB_magFunc_f, _magFunc_f, _phaseFunc_f
-from SLiCAP.SLiCAPmath import _delayFunc_f, _checkNumber, fullSubs
+from SLiCAP.SLiCAPmath import _delayFunc_f, _checkNumber, fullSubs, _stepList
+from SLiCAP.SLiCAPstateSpace import _stateResponse
 # The trace class lives in SLiCAPtraces (data layer); it is re-exported
 # here so that 'from SLiCAP.SLiCAPplots import trace' keeps working.
 # _gain_colors lives in SLiCAPtraces: a colour is a TRACE attribute and
@@ -1563,6 +1564,27 @@ def sweepData(results, sweepStart, sweepStop, sweepNum, sweepMethod='auto',
         return np.asarray(_makeNumData(sp.N(expression), x_var, x,
                                        normalize=False), dtype=float)
 
+    def _runs(runs):
+        """All runs -> one array (n_runs, n_sweep), or one array for a
+        single run."""
+        arrays = None
+        if isinstance(runs, _stateResponse):
+            # numeric time response (ini.numeric_time): simulated, not
+            # evaluated
+            arrays = runs.evaluate(x_var, x)
+        elif isinstance(runs, _stepList):
+            # stepped result: one broadcast evaluation of the step template
+            # instead of one evaluation per run
+            if dataType in _FREQ_TYPES and dataType != 'noise':
+                arrays = runs.freqResponse(x)
+            else:
+                arrays = runs.evaluate(x_var, x)
+                if arrays is not None:
+                    arrays = np.real(arrays).astype(float)
+        if arrays is None:
+            arrays = [_numeric(expression) for expression in runs]
+        return arrays[0] if len(arrays) == 1 else np.array(arrays)
+
     def _attribute(name):
         """The result attribute as a list of expressions, one per run."""
         value = getattr(results, name, None)
@@ -1578,8 +1600,7 @@ def sweepData(results, sweepStart, sweepStop, sweepNum, sweepMethod='auto',
         runs = _attribute(name)
         if not runs:
             continue
-        arrays = [_numeric(expression) for expression in runs]
-        signals[name] = arrays[0] if len(arrays) == 1 else np.array(arrays)
+        signals[name] = _runs(runs)
     if dataType == 'noise':
         # per-source contributions: the symbolic counterpart of NGspice's
         # onoise_r1 (Anton, 2026-08-01)
@@ -1591,8 +1612,7 @@ def sweepData(results, sweepStart, sweepStop, sweepNum, sweepMethod='auto',
                 name = "".join(c if (c.isalnum() or c == "_") else "_"
                                for c in name)
                 runs = expression if isinstance(expression, list) else [expression]
-                arrays = [_numeric(one) for one in runs]
-                signals[name] = arrays[0] if len(arrays) == 1 else np.array(arrays)
+                signals[name] = _runs(runs)
     if not signals:
         print("Error: result '{0}' holds no data to sweep.".format(dataType))
         return None
@@ -1976,7 +1996,10 @@ def sweepAxis(title, results, sweepStart, sweepStop, sweepNum,
                         newTrace = trace([x, _delayFunc_f(yData, x)])
                 elif funcType == 'time':
                     if not ax.polar:
-                        y = _makeNumData(yData, sp.Symbol('t'), x, normalize=False)
+                        if isinstance(yData, _stateResponse):
+                            y = yData.evaluate(sp.Symbol('t'), x)[0]
+                        else:
+                            y = _makeNumData(yData, sp.Symbol('t'), x, normalize=False)
                         newTrace = trace([x, y])
                 if result.dataType != 'noise':
                     newTrace.label = result.label
@@ -2068,27 +2091,39 @@ def sweepAxis(title, results, sweepStart, sweepStop, sweepNum,
                     stepNum = len(result.stepList)
                 else:
                     stepNum = len(result.stepArray[0])
+                if result.dataType == 'noise':
+                    runs = getattr(result, funcType)
+                else:
+                    runs = getattr(result, {'step': 'stepResp'}.get(
+                        result.dataType, result.dataType))
+                # A stepped result keeps its step template: all runs are
+                # evaluated over the sweep at once, run i is row i.
+                grid = None
+                if isinstance(runs, _stateResponse) and funcType == 'time':
+                    grid = runs.evaluate(sp.Symbol('t'), x)
+                elif isinstance(runs, _stepList):
+                    if funcType in ['mag', 'dBmag', 'phase', 'delay']:
+                        grid = runs.freqResponse(x)
+                    elif funcType == 'time':
+                        grid = runs.evaluate(sp.Symbol('t'), x)
+                    elif funcType == 'onoise' or funcType == 'inoise':
+                        grid = runs.evaluate(ini.frequency, x)
+                    if grid is not None and funcType not in ['mag', 'dBmag',
+                                                             'phase', 'delay']:
+                        grid = np.real(grid).astype(float)
                 for i in range(stepNum):
+                    H = None
+                    if grid is None:
+                        yData = runs[i]
+                    else:
+                        yData = None
+                        H = grid[i]
                     if result.dataType == 'numer':
-                        yData = result.numer[i]
                         yLabel = 'numer: '
                     elif result.dataType == 'denom':
-                        yData = result.denom[i]
                         yLabel = 'denom: '
                     elif result.dataType == 'laplace':
-                        yData = result.laplace[i]
                         yLabel = ''
-                    elif result.dataType == 'time':
-                        yData = result.time[i]
-                    elif result.dataType == 'step':
-                        yData = result.stepResp[i]
-                    elif result.dataType == 'impulse':
-                        yData = result.impulse[i]
-                    elif result.dataType == 'noise':
-                        if funcType == 'onoise':
-                            yData = result.onoise[i]
-                        elif funcType == 'inoise':
-                            yData = result.inoise[i]
                     if result.gainType == 'vi':
                         if result.dataType == 'noise':
                             yLabel = funcType
@@ -2111,8 +2146,8 @@ def sweepAxis(title, results, sweepStart, sweepStop, sweepNum,
                         break        # same params in every step: warn once
                     if funcType == 'mag':
                         if ax.polar:
-                            radius = _magFunc_f(yData, x)
-                            angle = _phaseFunc_f(yData, x)
+                            radius = _magFunc_f(yData, x, H=H)
+                            angle = _phaseFunc_f(yData, x, H=H)
                             if ini.hz:
                                 angle = angle/180*np.pi
                             newTrace = trace([angle, radius])
@@ -2123,11 +2158,11 @@ def sweepAxis(title, results, sweepStart, sweepStop, sweepNum,
                             newTrace.polarParam = ('f' if ini.hz else 'w',
                                                    'Hz' if ini.hz else 'rad/s', x)
                         else:
-                            newTrace = trace([x, _magFunc_f(yData, x)])
+                            newTrace = trace([x, _magFunc_f(yData, x, H=H)])
                     elif funcType == 'dBmag':
                         if ax.polar:
-                            radius = _dB_magFunc_f(yData, x)
-                            angle = _phaseFunc_f(yData, x)
+                            radius = _dB_magFunc_f(yData, x, H=H)
+                            angle = _phaseFunc_f(yData, x, H=H)
                             if ini.hz:
                                 angle = angle/180*np.pi
                             newTrace = trace([angle, radius])
@@ -2138,20 +2173,26 @@ def sweepAxis(title, results, sweepStart, sweepStop, sweepNum,
                             newTrace.polarParam = ('f' if ini.hz else 'w',
                                                    'Hz' if ini.hz else 'rad/s', x)
                         else:
-                            newTrace = trace([x, _dB_magFunc_f(yData, x)])
+                            newTrace = trace([x, _dB_magFunc_f(yData, x, H=H)])
                     elif funcType == 'phase':
                         if not ax.polar:
-                            newTrace = trace([x, _phaseFunc_f(yData, x)])
+                            newTrace = trace([x, _phaseFunc_f(yData, x, H=H)])
                     elif funcType == 'delay':
                         if not ax.polar:
-                            newTrace = trace([x, _delayFunc_f(yData, x)])
+                            newTrace = trace([x, _delayFunc_f(yData, x, H=H)])
                     elif funcType == 'time':
                         if not ax.polar:
-                            y = _makeNumData(yData, sp.Symbol('t'), x, normalize=False)
+                            if H is None:
+                                y = _makeNumData(yData, sp.Symbol('t'), x, normalize=False)
+                            else:
+                                y = H
                             newTrace = trace([x, y])
                     elif funcType == 'onoise' or funcType == 'inoise':
                         if not ax.polar:
-                            y = _makeNumData(yData, ini.frequency, x)
+                            if H is None:
+                                y = _makeNumData(yData, ini.frequency, x)
+                            else:
+                                y = H
                             newTrace = trace([x, y])
                     newTrace.color = ini.default_colors[colNum % numColors]
                     colNum += 1
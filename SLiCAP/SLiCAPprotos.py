@@ -7,6 +7,7 @@ SLiCAP module with basic SLiCAP classes and functions.
 import sympy as sp
 import sys
 import os
+from copy import copy
 from pathlib import Path
 import SLiCAP.SLiCAPconfigure as ini
 from sympy import Symbol
@@ -471,6 +472,50 @@ class circuit(object):
                 print("Error: Unknown circuit element '{0}'.".format(elementID))
         return elementValues
 
+    def _view(self):
+        """
+        Returns a copy-on-write view of the circuit for the execution of an
+        instruction.
+
+        The view has its own element dictionary, parameter definitions and
+        lists with nodes, variables, parameters and references, but it shares
+        the element objects, model definitions and subcircuits with this
+        circuit. Elements can be added to, replaced in or deleted from the
+        view; an element of which the parameters are changed in place must
+        first be taken over with _ownElement(). This circuit is not affected.
+
+        :return: View of the circuit
+        :rtype: SLiCAPprotos.circuit
+        """
+        view            = copy(self)
+        view.elements   = dict(self.elements)
+        view.parDefs    = dict(self.parDefs)
+        view.parUnits   = dict(self.parUnits)
+        view.params     = list(self.params)
+        view.nodes      = list(self.nodes)
+        view.indepVars  = list(self.indepVars)
+        view.dep_vars   = list(self.dep_vars)
+        view.controlled = list(self.controlled)
+        view.references = list(self.references)
+        return view
+
+    def _ownElement(self, refDes):
+        """
+        Replaces the element 'refDes' with a copy that has its own parameters,
+        and returns this copy. Used by views of a circuit (see _view()) before
+        element parameters are changed in place.
+
+        :param refDes: Reference designator of the element.
+        :type refDes: str
+
+        :return: The copy of the element
+        :rtype: SLiCAPprotos.element
+        """
+        el        = copy(self.elements[refDes])
+        el.params = dict(el.params)
+        self.elements[refDes] = el
+        return el
+
 class element(object):
     """
     Prototype circuit element object.
@@ -9,7 +9,7 @@ General instruction format
     
 result = do<Instruction>(cir, transfer=None, source='circuit',
 detector='circuit', lgref='circuit', convtype=None, pardefs=None, 
-numeric=False, stepdict=None), 
+numeric=False, stepdict=None, workers=None), 
 
 where <Instruction> describes the analysis to be performed. Below an overview 
 of instructions that have been implemented in SLiCAP.
@@ -234,19 +234,24 @@ specified with the circuit.
                      stepmethod: 'list' (list of lists of int, float, or str)
                      step values for stepmethod: 'array'. Each list applies to 
                      one step variable.
+
+:param workers: Number of worker processes over which the steps are
+                distributed if ini.step_function == False. The circuit is
+                sent once to each worker and the results are returned in the
+                order of the steps. If None, ini.step_workers will be used.
+                
+                Defaults to None
+                
+:type workers: NoneType, int
                                  
 ----
 """
 import sympy as sp
-from copy import deepcopy
 import SLiCAP.SLiCAPconfigure as ini
 from SLiCAP.SLiCAPhtml import htmlPage, img2html, head2html, elementData2html 
 from SLiCAP.SLiCAPhtml import params2html, file2html, netlist2html
 from SLiCAP.SLiCAPinstruction import instruction
 from SLiCAP.SLiCAPyacc import _checkCircuit
-from SLiCAP.SLiCAPkicad import _kicadNetlist, KiCADsch2svg
-from SLiCAP.SLiCAPltspice import _LTspiceNetlist
-from SLiCAP.SLiCAPgschem import _gNetlist  
 from SLiCAP.SLiCAPmath import _checkExpression
 
 def _makeNetlist(fileName, cirTitle=None, language="SLiCAP"):
@@ -264,10 +269,13 @@ def _makeNetlist(fileName, cirTitle=None, language="SLiCAP"):
     elif " " in cirTitle and (cirTitle[0] != '"' or cirTitle[-1] != '"'):
         cirTitle = '"' + cirTitle + '"'
     if cirType == "asc":
+        from SLiCAP.SLiCAPltspice import _LTspiceNetlist
         _LTspiceNetlist(fileName, cirTitle)
     elif cirType == "sch":
+        from SLiCAP.SLiCAPgschem import _gNetlist
         _gNetlist(fileName, cirTitle)
     elif cirType == "kicad_sch":
+        from SLiCAP.SLiCAPkicad import _kicadNetlist
         netlist, subckt = _kicadNetlist(fileName, cirTitle, language=language)
     elif cirType == "slicap_sch":
         from SLiCAP.schematic import make_schematic
@@ -432,7 +440,7 @@ def doMatrix(cir, source='circuit', detector='circuit', lgref='circuit',
 
 def doLaplace(cir, source='circuit', detector='circuit', lgref='circuit', 
               transfer='gain', convtype=None, pardefs=None, numeric=False, 
-              stepdict=None):
+              stepdict=None, workers=None):
     """
     Returns a transfer function or a detector voltage or current.
     
@@ -476,12 +484,12 @@ def doLaplace(cir, source='circuit', detector='circuit', lgref='circuit',
                                  detector=detector, lgref=lgref, 
                                  convtype=convtype, datatype='laplace', 
                                  pardefs=pardefs, numeric=numeric, 
-                                 stepdict=stepdict)
+                                 stepdict=stepdict, workers=workers)
     return result
 
 def doDC(cir, source='circuit', detector='circuit', lgref='circuit', 
          transfer='gain', convtype=None, pardefs=None, numeric=False, 
-         stepdict=None):
+         stepdict=None, workers=None):
     """
     Returns the zero-frequency value (DC value) of a transfer or a detector
     voltge or current.
@@ -526,12 +534,12 @@ def doDC(cir, source='circuit', detector='circuit', lgref='circuit',
                                  detector=detector, lgref=lgref, 
                                  convtype=convtype, datatype='dc', 
                                  pardefs=pardefs, numeric=numeric, 
-                                 stepdict=stepdict)
+                                 stepdict=stepdict, workers=workers)
     return result
 
 def doNumer(cir, source='circuit', detector='circuit', lgref='circuit', 
             transfer='gain', convtype=None, pardefs=None, numeric=False, 
-            stepdict=None):
+            stepdict=None, workers=None):
     """
     Returns the numerator of a transfer or of a detector voltage or current.
     
@@ -571,12 +579,12 @@ def doNumer(cir, source='circuit', detector='circuit', lgref='circuit',
                                  detector=detector, lgref=lgref, 
                                  convtype=convtype, datatype='numer', 
                                  pardefs=pardefs, numeric=numeric, 
-                                 stepdict=stepdict)
+                                 stepdict=stepdict, workers=workers)
     return result
 
 def doDenom(cir, source='circuit', detector='circuit', lgref='circuit', 
             transfer='gain', convtype=None, pardefs=None, numeric=False, 
-            stepdict=None):
+            stepdict=None, workers=None):
     """
     Returns the denominator of a transfer or a detector voltage or current.
     
@@ -615,12 +623,12 @@ def doDenom(cir, source='circuit', detector='circuit', lgref='circuit',
                                  detector=detector, lgref=lgref, 
                                  convtype=convtype, datatype='denom', 
                                  pardefs=pardefs, numeric=numeric, 
-                                 stepdict=stepdict)
+                                 stepdict=stepdict, workers=workers)
     return result
 
 def doTime(cir, source='circuit', detector='circuit', lgref='circuit', 
            transfer=None, convtype=None, pardefs=None, numeric=False, 
-           stepdict=None):
+           stepdict=None, workers=None):
     """
     Returns the detector voltage or current (Inverse Laplace Transform).
     
@@ -651,6 +659,11 @@ def doTime(cir, source='circuit', detector='circuit', lgref='circuit',
       
     If parameter stepping is applied, all above attributes are lists of values
     or expressions for each step.
+    
+    With ini.numeric_time = True and numeric=True, the inverse Laplace
+    transform is skipped: doTime(<circuit>).time then holds state-space
+    realizations of the runs, which sweepData() and plotSweep() simulate
+    numerically, and .numer, .denom and .laplace remain empty.
       
     **Parameters**
     
@@ -672,12 +685,12 @@ def doTime(cir, source='circuit', detector='circuit', lgref='circuit',
                                  detector=detector, lgref=lgref, 
                                  convtype=convtype, datatype='time', 
                                  pardefs=pardefs, numeric=numeric, 
-                                 stepdict=stepdict)
+                                 stepdict=stepdict, workers=workers)
     return result
 
 def doImpulse(cir, source='circuit', detector='circuit', lgref='circuit', 
               transfer='gain', convtype=None, pardefs=None, numeric=False, 
-              stepdict=None):
+              stepdict=None, workers=None):
     """
     Returns the unit-impulse response of a transfer (ILT of a transfer 
     function). The argument 'transfer' will be set to gain if None is given.
@@ -703,6 +716,11 @@ def doImpulse(cir, source='circuit', detector='circuit', lgref='circuit',
       
     If parameter stepping is applied, all above attributes are lists of values
     or expressions for each step.
+    
+    With ini.numeric_time = True and numeric=True, the inverse Laplace
+    transform is skipped: doImpulse(<circuit>).impulse then holds state-space
+    realizations of the runs, which sweepData() and plotSweep() simulate
+    numerically, and .numer, .denom and .laplace remain empty.
       
     **Parameters**
     
@@ -728,12 +746,12 @@ def doImpulse(cir, source='circuit', detector='circuit', lgref='circuit',
                                  detector=detector, lgref=lgref, 
                                  convtype=convtype, datatype='impulse', 
                                  pardefs=pardefs, numeric=numeric, 
-                                 stepdict=stepdict)
+                                 stepdict=stepdict, workers=workers)
     return result
 
 def doStep(cir, source='circuit', detector='circuit', lgref='circuit', 
            transfer='gain', convtype=None, pardefs=None, numeric=False, 
-           stepdict=None):
+           stepdict=None, workers=None):
     """
     Returns the unit-step response of a transfer (based upon the ILT).  The 
     argument 'transfer' will be set to gain if None is given.
@@ -758,6 +776,11 @@ def doStep(cir, source='circuit', detector='circuit', lgref='circuit',
       
     If parameter stepping is applied, all above attributes are lists of values
     or expressions for each step.
+    
+    With ini.numeric_time = True and numeric=True, the inverse Laplace
+    transform is skipped: doStep(<circuit>).stepResp then holds state-space
+    realizations of the runs, which sweepData() and plotSweep() simulate
+    numerically, and .numer, .denom and .laplace remain empty.
       
     **Parameters**
     
@@ -783,12 +806,12 @@ def doStep(cir, source='circuit', detector='circuit', lgref='circuit',
                                  detector=detector, lgref=lgref, 
                                  convtype=convtype, datatype='step', 
                                  pardefs=pardefs, numeric=numeric, 
-                                 stepdict=stepdict)
+                                 stepdict=stepdict, workers=workers)
     return result
 
 def doPoles(cir, source='circuit', detector='circuit', lgref='circuit', 
             transfer='gain', convtype=None, pardefs=None, numeric=False, 
-            stepdict=None):
+            stepdict=None, workers=None):
     """
     Returns the poles of a transfer function.
     
@@ -836,12 +859,12 @@ def doPoles(cir, source='circuit', detector='circuit', lgref='circuit',
     result = _executeInstruction(cir, transfer=transfer, lgref=lgref, 
                                  convtype=convtype, datatype='poles', 
                                  pardefs=pardefs, numeric=numeric, 
-                                 stepdict=stepdict)
+                                 stepdict=stepdict, workers=workers)
     return result
 
 def doZeros(cir, source='circuit', detector='circuit', lgref='circuit', 
             transfer='gain', convtype=None, pardefs=None, numeric=False, 
-            stepdict=None):
+            stepdict=None, workers=None):
     """
     Returns the zeros of a transfer function.
     
@@ -891,12 +914,12 @@ def doZeros(cir, source='circuit', detector='circuit', lgref='circuit',
                                  detector=detector, lgref=lgref, 
                                  convtype=convtype, datatype='zeros', 
                                  pardefs=pardefs, numeric=numeric, 
-                                 stepdict=stepdict)
+                                 stepdict=stepdict, workers=workers)
     return result
 
 def doPZ(cir, source='circuit', detector='circuit', lgref='circuit', 
          transfer='gain', convtype=None, pardefs=None, numeric=False, 
-         stepdict=None):
+         stepdict=None, workers=None):
     """
     Returns the DC value, the zeros, and the poles of a transfer function. 
     Poles and zeros that coincide within the diaplay accuracy (ini.disp) are
@@ -954,11 +977,12 @@ def doPZ(cir, source='circuit', detector='circuit', lgref='circuit',
                                  detector=detector, lgref=lgref, 
                                  convtype=convtype, datatype='pz', 
                                  pardefs=pardefs, numeric=numeric, 
-                                 stepdict=stepdict)
+                                 stepdict=stepdict, workers=workers)
     return result
 
 def doSolve(cir, source=None, detector=None, lgref=None, transfer=None, 
-            convtype=None, pardefs=None, numeric=False, stepdict=None):
+            convtype=None, pardefs=None, numeric=False, stepdict=None,
+            workers=None):
     """
     Returns the (Laplace) solution of the circuit.
     
@@ -1007,11 +1031,12 @@ def doSolve(cir, source=None, detector=None, lgref=None, transfer=None,
                                  detector=None, lgref=None, 
                                  convtype=convtype, datatype='solve', 
                                  pardefs=pardefs, numeric=numeric, 
-                                 stepdict=stepdict)
+                                 stepdict=stepdict, workers=workers)
     return result
 
 def doDCsolve(cir, source=None, detector=None, lgref=None, transfer=None, 
-              convtype=None, pardefs=None, numeric=False, stepdict=None):
+              convtype=None, pardefs=None, numeric=False, stepdict=None,
+              workers=None):
     """
     Returns the DC solution of the circuit.
     
@@ -1058,11 +1083,13 @@ def doDCsolve(cir, source=None, detector=None, lgref=None, transfer=None,
     result = _executeInstruction(cir, transfer=None, source=None, 
                                  detector=None, lgref=None,  convtype=convtype,
                                  datatype='dcsolve', pardefs=pardefs, 
-                                 numeric=numeric, stepdict=stepdict)
+                                 numeric=numeric, stepdict=stepdict,
+                                 workers=workers)
     return result
 
 def doTimeSolve(cir, source=None, detector=None, lgref=None, transfer=None, 
-                convtype=None, pardefs=None, numeric=False, stepdict=None):
+                convtype=None, pardefs=None, numeric=False, stepdict=None,
+                workers=None):
     """
     Returns the time-domain solution of the circuit, using the Inverse Laplace
     Transform.
@@ -1112,13 +1139,13 @@ def doTimeSolve(cir, source=None, detector=None, lgref=None, transfer=None,
                                  detector=None, lgref=None, 
                                  convtype=convtype, datatype='timesolve', 
                                  pardefs=pardefs, numeric=numeric, 
-                                 stepdict=stepdict)
+                                 stepdict=stepdict, workers=workers)
     
     return result
 
 def doNoise(cir, source='circuit', detector='circuit', lgref=None, 
             transfer=None, convtype=None, pardefs=None, numeric=False, 
-            stepdict=None):
+            stepdict=None, workers=None):
     """
     Evaluates the detector noise spectral density and the individual 
     contributions of all noise sources to it. 
@@ -1178,13 +1205,13 @@ def doNoise(cir, source='circuit', detector='circuit', lgref=None,
                                  detector=detector, lgref=None, 
                                  convtype=convtype, datatype='noise', 
                                  pardefs=pardefs, numeric=numeric, 
-                                 stepdict=stepdict)
+                                 stepdict=stepdict, workers=workers)
 
     return result
 
 def doDCvar(cir, source='circuit', detector='circuit', lgref='circuit', 
             transfer=None, convtype=None, pardefs=None, numeric=False, 
-            stepdict=None):
+            stepdict=None, workers=None):
     """
     Evaluates the variance of the detector DC voltage or current and the 
     individual contributions of all noise sources to it. 
@@ -1243,7 +1270,7 @@ def doDCvar(cir, source='circuit', detector='circuit', lgref='circuit',
                                  detector=detector, lgref=None, 
                                  convtype=convtype, datatype='dcvar', 
                                  pardefs=pardefs, numeric=numeric, 
-                                 stepdict=stepdict)
+                                 stepdict=stepdict, workers=workers)
 
     return result
 
@@ -1267,16 +1294,16 @@ def doParams(cir, source='circuit', detector='circuit', lgref='circuit',
 def _executeInstruction(cir, transfer=None, source='circuit', 
                         detector='circuit', lgref='circuit', convtype='circuit', 
                         datatype=None, pardefs='circuit', numeric=False, 
-                        stepdict=None):
+                        stepdict=None, workers=None):
     """
     Converts the shell instruction into a basic instruction object, executes it
     and returns the result.
 
     """
     i1         = instruction()
-    i1.circuit = deepcopy(cir) # Changes made to the circuit during execution 
-                               # of the instruction, will not affect the main 
-                               # circuit object
+    i1.circuit = cir._view() # Changes made to the circuit during execution 
+                             # of the instruction, will not affect the main 
+                             # circuit object
     if detector == 'circuit':
         i1.detector = cir.detector
     elif detector != None:
@@ -1310,7 +1337,7 @@ def _executeInstruction(cir, transfer=None, source='circuit',
             i1.parDefs[sp.Symbol(str(key))] = _checkExpression(pardefs[key])
         i1.ignoreCircuitParams = True
     elif pardefs== "circuit":
-        i1.parDefs = deepcopy(cir.parDefs)
+        i1.parDefs = dict(cir.parDefs)
         i1.ignoreCircuitParams = False
     else:
         i1.ignoreCircuitParams = False
@@ -1351,6 +1378,7 @@ def _executeInstruction(cir, transfer=None, source='circuit',
         except KeyError:
             pass
         i1.stepOn()
+        i1.stepWorkers = workers
     #cir.parDefs = deepcopy(oldParDefs)
     return i1.execute()
 
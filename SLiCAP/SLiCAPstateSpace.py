@@ -68,6 +68,23 @@ General remarks
    3. Reduce C to full-rank using these rational numbers
    4. Go to floats to calculate the state-space matrix and determine its eigenvalues.
 
+   With ini.eig_pz = True, numeric stepped pole-zero analysis skips the symbolic 
+   determinants: per step the coefficient matrices of the MNA matrix are evaluated 
+   as floats and poles and zeros are obtained from the generalized eigenvalues of 
+   the (companion) pencil and of the Rosenbrock pencil, respectively (see mna_pz()).
+
+8. doStateSpace(result, numeric=True) does the descriptor reduction in floating point:
+   the coefficient matrices of the MNA matrix are evaluated as float arrays
+   (mna_coeffs()) and reduced with the SVD of the C matrix, of which the rank is 
+   determined with a relative tolerance (numeric_state()). The realization 
+   (A, B, C, D) then consists of numpy arrays; transfer_gpz() accepts both forms.
+
+9. With ini.numeric_time = True, numeric impulse, step and time instructions skip the 
+   inverse Laplace transform: per run, the circuit realization is connected with 
+   realizations of the source values (source_realization(), detector_realization()), 
+   and the responses of all runs are simulated at once on the time grid of a plot 
+   with the exact discretization of the state equations (state_response()).
+
 Procedure of the matrix modification
 ====================================
 
@@ -301,40 +318,456 @@ def mna_to_state(G, C):
             Pout_full[(m - 1) * n:, :],   # correctly offsets to the last block
             Dfull[(m - 1) * n:, :n])
 
+def mna_coeff_function(M, symbols=()):
+    """
+    MNA matrix M(ini.laplace) -> function of the values of 'symbols' that
+    returns the float coefficient arrays [M_0, M_1, ...] in ascending powers
+    of ini.laplace. Only the nonzero entries of M are used; their coefficients
+    are compiled once (sympy.lambdify), so that a stepped instruction
+    evaluates them per step without sympy. M may have extra columns, such as
+    the source vector of the pole-zero analysis.
+
+    Raises ValueError for entries that are not polynomial in ini.laplace or
+    that hold symbols other than 'symbols'.
+    """
+    shape     = M.shape
+    symbols   = list(symbols)
+    keys      = []
+    values    = []
+    for (i, j), value in M.todok().items():
+        try:
+            poly  = sp.Poly(value, ini.laplace)
+        except sp.PolynomialError:
+            raise ValueError("M[{}, {}] = {} is not polynomial in {}.".format(
+                             i, j, value, ini.laplace))
+        for (k,), coeff in poly.terms():
+            if not coeff.free_symbols.issubset(symbols):
+                raise ValueError("M[{}, {}] = {} has no numeric value.".format(
+                                 i, j, value))
+            keys.append((k, i, j))
+            values.append(coeff)
+    K, I, J   = np.array(keys, dtype=int).reshape(-1, 3).T
+    order     = int(np.max(K)) if len(K) else 0
+    function  = sp.lambdify(symbols, values, modules='numpy')
+
+    def coeffs(*args):
+        v     = np.array(function(*args), dtype=complex).reshape(-1)
+        if not np.any(v.imag):
+            v = v.real
+        arrays = np.zeros((order + 1,) + shape, dtype=v.dtype)
+        arrays[K, I, J] = v
+        return list(arrays)
+
+    return coeffs
+
+def mna_coeffs(M, Iv=None):
+    """
+    MNA matrix M(ini.laplace) (and source vector Iv) without symbols other
+    than ini.laplace -> float coefficient arrays [M_0, M_1, ...] in ascending
+    powers of ini.laplace (and Iv as a float array). Only the nonzero entries
+    of M are evaluated.
+
+    Raises ValueError for entries that are not polynomial in ini.laplace or
+    that hold other symbols, and for a source vector that depends on
+    ini.laplace.
+    """
+    N         = M.shape[0]
+    arrays    = mna_coeff_function(M)()
+    if Iv is None:
+        return arrays
+    b         = np.zeros(N, dtype=complex)
+    for i in range(N):
+        value = sp.sympify(Iv[i])
+        if value.free_symbols:
+            raise ValueError("Iv[{}] = {} has no numeric value or depends on "
+                             "{}.".format(i, value, ini.laplace))
+        b[i]  = complex(value)
+    return arrays, (b if np.any(b.imag) else b.real)
+
+def numeric_state(coeffs, tol=None):
+    """
+    Float coefficient arrays [M_0, M_1, ...] of an MNA matrix (ascending
+    powers of ini.laplace, see mna_coeffs()) -> system realization
+    (A, P_in, P_out, D_map) as numpy arrays, over the original circuit
+    variables, as mna_to_state() returns it in exact arithmetic.
+
+    A higher-order matrix is first written as a first-order descriptor pencil
+    G + s*C with the companion form of _companion(), which the pole-zero
+    analysis uses as well. Rows and columns are equilibrated; the
+    dynamic and algebraic parts are separated with the SVD of C: singular
+    values below tol times the largest one count as zero (default: N times
+    the machine precision). Raises ValueError if the algebraic part is
+    singular (the circuit is not proper).
+    """
+    coeffs    = [np.asarray(A) for A in coeffs]
+    while len(coeffs) > 2 and not np.any(coeffs[-1]):
+        coeffs = coeffs[:-1]
+    n         = coeffs[0].shape[0]
+    if len(coeffs) == 1:
+        coeffs = coeffs + [np.zeros_like(coeffs[0])]
+    # G + s*C = s*Q - P: the companion pencil of the pole-zero analysis
+    P, C      = _companion(coeffs)
+    G         = -P
+    N         = G.shape[0]
+    # G' = R G Q, C' = R C Q with x = Q x'
+    R, Q      = _scaling([G, C])
+    G, C      = G * R[:, None] * Q[None, :], C * R[:, None] * Q[None, :]
+    # Inputs enter the last block row, outputs are read from the first block
+    Bfull     = np.zeros((N, n)); Bfull[N - n:, :] = np.diag(R[N - n:])
+    Cfull     = np.zeros((n, N)); Cfull[:, :n]     = np.diag(Q[:n])
+    U, S, Vh  = np.linalg.svd(C)
+    if tol is None:
+        tol   = N * np.finfo(float).eps
+    r         = int(np.sum(S > tol * S[0])) if S.size and S[0] > 0 else 0
+    U1, U2    = U[:, :r].conj().T, U[:, r:].conj().T
+    V1, V2    = Vh[:r, :].conj().T, Vh[r:, :].conj().T
+    G11, G12  = U1 @ G @ V1, U1 @ G @ V2
+    G21, G22  = U2 @ G @ V1, U2 @ G @ V2
+    try:
+        # z2 = G22^-1 (U2 b - G21 z1)
+        X     = np.linalg.solve(G22, np.hstack((G21, U2 @ Bfull))) if N > r else \
+                np.zeros((0, r + n))
+    except np.linalg.LinAlgError:
+        raise ValueError("The algebraic part of the MNA matrix is singular; "
+                         "the circuit has no proper state-space realization.")
+    G22iG21, G22iB = X[:, :r], X[:, r:]
+    Si        = 1 / S[:r]
+    A         = -Si[:, None] * (G11 - G12 @ G22iG21)
+    Pin       = Si[:, None] * (U1 @ Bfull - G12 @ G22iB)
+    Pout      = Cfull @ (V1 - V2 @ G22iG21)
+    Dmap      = Cfull @ V2 @ G22iB
+    return A, Pin, Pout, Dmap
+
 def _row(P, detP, detN):
-    row = P[detP, :]
-    return row if detN is None else row - P[detN, :]
+    row = P[[detP], :]
+    return row if detN is None else row - P[[detN], :]
 
 def state_transfer(ss, Iv, detP, detN=None):
-    """Select the source(Iv) -> detector(detP[,detN]) transfer: -> (A, B, C, D)."""
+    """
+    Select the source(Iv) -> detector(detP[,detN]) transfer: -> (A, B, C, D).
+    Works on the realization of mna_to_state() and on that of numeric_state().
+    """
     A, Pin, Pout, Dmap = ss
-    return A, Pin * Iv, _row(Pout, detP, detN), _row(Dmap, detP, detN) * Iv
+    if isinstance(A, np.ndarray):
+        Iv = np.reshape(Iv, (-1, 1))
+    return A, Pin @ Iv, _row(Pout, detP, detN), _row(Dmap, detP, detN) @ Iv
 
 def _np(M):
     return np.array(M.evalf().tolist(), dtype=complex)
 
 def transfer_gpz(A, B, C, D):
-    """Transfer (A,B,C,D) -> (gain, poles, zeros).  poles/zeros are numpy arrays."""
+    """
+    Transfer (A,B,C,D) -> (gain, poles, zeros).  poles/zeros are numpy arrays.
+
+    For a realization of numpy arrays (numeric_state()), the gain is the
+    zero-frequency value of the transfer (pz_dc_value()), as with the
+    numeric pole-zero analysis of mna_pz().
+    """
+    if isinstance(A, np.ndarray):
+        return _transfer_gpz_numeric(A, B, C, D)
     r         = A.rows
     poles     = np.linalg.eigvals(_np(A))
     # transmission zeros = finite generalized eigenvalues of the Rosenbrock pencil
-    from scipy.linalg import eig
     P         = np.block([[_np(A), _np(B)], [_np(C), _np(D)]])
     Q         = np.zeros((r + 1, r + 1), dtype=complex)
     Q[:r, :r] = np.eye(r)
-    al, be    = eig(P, Q, right=False, homogeneous_eigvals=True)
-    fin       = np.abs(be) > 1e-9 * np.max(np.abs(be)) if be.size else be.astype(bool)
-    zeros     = al[fin] / be[fin]
+    zeros     = _finite_eigvals(P, Q)
     # gain = lowest-order coefficient ratio (reuse coeffsTransfer)
     s         = ini.laplace
     H         = sp.cancel((C * (s * sp.eye(r) - A).inv() * B + D)[0])
     gain      = coeffsTransfer(H, s)[0]
     return gain, poles, zeros
 
+def _transfer_gpz_numeric(A, B, C, D):
+    r         = A.shape[0]
+    poles     = np.linalg.eigvals(A).astype(complex) if r else np.array([], dtype=complex)
+    poles.imag[np.abs(poles.imag) <= 1e-12 * np.abs(poles)] = 0
+    # transmission zeros: roots of the Rosenbrock pencil [[sI - A, -B], [C, D]]
+    P0        = np.block([[-A, -B], [C, D]])
+    P1        = np.zeros_like(P0)
+    P1[:r, :r] = np.eye(r)
+    zeros     = poly_roots([P0, P1])
+
+    def H(s0):
+        if not r:
+            return D[0, 0]
+        return (C @ np.linalg.solve(s0 * np.eye(r) - A, B) + D)[0, 0]
+
+    gain      = pz_dc_value(poles, zeros, H)
+    return gain, poles, zeros
+
+def source_realization(value):
+    """
+    Value of a source in the Laplace domain, numeric and a proper rational
+    function of ini.laplace -> realization (A, B, C, D) as numpy arrays; a
+    constant value has no states.
+
+    Raises ValueError for other values.
+    """
+    from scipy.signal import tf2ss
+    value     = sp.sympify(value)
+    if value.free_symbols - {ini.laplace}:
+        raise ValueError("The source value {} has no numeric value.".format(value))
+    if ini.laplace not in value.free_symbols:
+        d     = complex(value)
+        return (np.zeros((0, 0)), np.zeros((0, 1)), np.zeros((1, 0)),
+                np.array([[d if d.imag else d.real]]))
+    num, den  = sp.fraction(sp.cancel(sp.together(value)))
+    try:
+        num   = [complex(c) for c in sp.Poly(num, ini.laplace).all_coeffs()]
+        den   = [complex(c) for c in sp.Poly(den, ini.laplace).all_coeffs()]
+    except sp.PolynomialError:
+        raise ValueError("The source value {} is not a rational function of "
+                         "{}.".format(value, ini.laplace))
+    if len(num) > len(den):
+        raise ValueError("The source value {} is not proper.".format(value))
+    num, den  = np.array(num), np.array(den)
+    if not np.any(num.imag) and not np.any(den.imag):
+        num, den = num.real, den.real
+    return tf2ss(num, den)
+
+def detector_realization(ss, detP, detN, sources):
+    """
+    Circuit realization (A, P_in, P_out, D_map) of numeric_state() and the
+    realizations of the entries of the source vector (source_realization(),
+    None for a zero entry) -> SISO realization (A, B, C, D) of the detector
+    signal, with the sources driven by one common unit impulse.
+    """
+    A, Pin, Pout, Dmap = ss
+    c         = _row(Pout, detP, detN)
+    dm        = _row(Dmap, detP, detN)
+    blocks    = [(j, src) for j, src in enumerate(sources) if src is not None]
+    n         = A.shape[0]
+    m         = sum(src[0].shape[0] for j, src in blocks)
+    dtype     = np.result_type(A, Pin, Pout, Dmap, *[x for j, src in blocks for x in src])
+    At        = np.zeros((n + m, n + m), dtype=dtype)
+    Bt        = np.zeros((n + m, 1), dtype=dtype)
+    Ct        = np.zeros((1, n + m), dtype=dtype)
+    Dt        = np.zeros((1, 1), dtype=dtype)
+    At[:n, :n] = A
+    Ct[:, :n] = c
+    k         = n
+    for j, (a, b, cs, d) in blocks:
+        q     = a.shape[0]
+        At[k:k + q, k:k + q] = a
+        At[:n, k:k + q]      = Pin[:, [j]] @ cs
+        Bt[k:k + q]          = b
+        Bt[:n]              += Pin[:, [j]] @ d
+        Ct[:, k:k + q]       = dm[:, [j]] @ cs
+        Dt                  += dm[:, [j]] @ d
+        k    += q
+    return At, Bt, Ct, Dt
+
+def state_response(realizations, t, u='impulse'):
+    """
+    SISO realizations (A, B, C, D) of one or more runs -> their responses on
+    the time grid t (ascending, t >= 0): a numpy array (n_runs, len(t)).
+
+    u is 'impulse' (unit impulse at t = 0; a direct term D gives a Dirac
+    pulse that is not included), 'step' (unit step at t = 0), or an array
+    with input samples at t that is held constant over each time interval.
+
+    The state equations are discretized exactly per time interval
+    (matrix exponential of [[A, B], [0, 0]]*h); equal intervals share one
+    discretization. The realizations are padded to the same number of
+    states and simulated together.
+    """
+    from scipy.linalg import expm
+    t         = np.asarray(t, dtype=float)
+    R         = len(realizations)
+    n         = max([real[0].shape[0] for real in realizations] + [0])
+    dtype     = np.result_type(float, *[x for real in realizations for x in real])
+    Z         = np.zeros((R, n + 1, n + 1), dtype=dtype)
+    C         = np.zeros((R, n), dtype=dtype)
+    D         = np.zeros(R, dtype=dtype)
+    for r, (a, b, c, d) in enumerate(realizations):
+        q     = a.shape[0]
+        Z[r, :q, :q] = a
+        Z[r, :q, n]  = b[:, 0]
+        C[r, :q]     = c[0, :]
+        D[r]         = d[0, 0]
+    if isinstance(u, str) and u == 'impulse':
+        x     = Z[:, :n, n].copy()
+        u     = np.zeros(len(t))
+        D     = np.zeros(R, dtype=dtype)
+    else:
+        x     = np.zeros((R, n), dtype=dtype)
+        u     = np.ones(len(t)) if isinstance(u, str) else np.asarray(u, dtype=float)
+    hold      = np.concatenate((u[:1], u[:-1]))
+    h         = np.diff(np.concatenate(([0.0], t)))
+    span      = t[-1] if len(t) and t[-1] > 0 else 1.0
+    steps, index = np.unique(np.round(h / span * 1e12), return_inverse=True)
+    transitions  = {}
+    y         = np.zeros((R, len(t)))
+    for k in range(len(t)):
+        if index[k] not in transitions:
+            E = expm(Z * h[k]) if n else np.ones((R, 1, 1))
+            transitions[index[k]] = (E[:, :n, :n], E[:, :n, n])
+        Phi, Gamma = transitions[index[k]]
+        x     = np.einsum('rij,rj->ri', Phi, x) + Gamma * hold[k]
+        y[:, k] = np.real(np.einsum('rj,rj->r', C, x) + D * u[k])
+    return y
+
+class _stateResponse(list):
+    """
+    Time-domain result of an instruction obtained from state-space
+    realizations instead of the inverse Laplace transform: a list with the
+    SISO realization (A, B, C, D) of each run (detector_realization()).
+
+    evaluate() returns the responses of all runs on a time grid with one
+    simulation (state_response()), as SLiCAPmath._stepList.evaluate() does
+    for symbolic results.
+    """
+    def __init__(self, realizations, kind):
+        list.__init__(self, realizations)
+        self.kind = kind
+
+    def evaluate(self, variable, t):
+        return state_response(list(self), t, self.kind)
+
+def _finite_eigvals(P, Q):
+    """Finite generalized eigenvalues lambda of the pencil: P x = lambda Q x."""
+    from scipy.linalg import eig
+    al, be    = eig(P, Q, right=False, homogeneous_eigvals=True)
+    fin       = np.abs(be) > 1e-9 * np.max(np.abs(be)) if be.size else be.astype(bool)
+    return al[fin] / be[fin]
+
+def _companion(coeffs):
+    """
+    Matrix polynomial sum_k s^k coeffs[k] -> companion pencil (P, Q) with
+    det(s Q - P) = det(sum_k s^k coeffs[k]); coeffs in ascending powers of s.
+    The first block of the state vector of s Q - P is that of the matrix
+    polynomial (see numeric_state()). The pencil has the dtype of coeffs.
+    """
+    d         = len(coeffs) - 1
+    n         = coeffs[0].shape[0]
+    if d == 1:
+        return -coeffs[0], coeffs[1]
+    dtype     = np.result_type(*coeffs)
+    P         = np.zeros((d * n, d * n), dtype=dtype)
+    Q         = np.eye(d * n, dtype=dtype)
+    for k in range(d - 1):                                     # x_(k+1) = s x_k
+        P[k * n:(k + 1) * n, (k + 1) * n:(k + 2) * n] = np.eye(n)
+    for k in range(d):                                         # last block row: M(s) x_0 = 0
+        P[(d - 1) * n:, k * n:(k + 1) * n] = -coeffs[k]
+    Q[(d - 1) * n:, (d - 1) * n:] = coeffs[d]
+    return P, Q
+
+def poly_roots(coeffs):
+    """
+    Roots of det(sum_k s^k coeffs[k]) for float matrices coeffs[k] (ascending
+    powers of s) -> numpy array, from the generalized eigenvalues of the
+    companion pencil. With G + s*C this gives the poles of an MNA matrix.
+
+    The rows and columns are equilibrated and the variable is scaled
+    (s = sigma*t) such that the eigenvalues t are of order one; this keeps the
+    separation of finite and infinite eigenvalues independent of the
+    impedance and frequency levels of the circuit.
+    """
+    coeffs    = [np.asarray(A, dtype=complex) for A in coeffs]
+    while len(coeffs) > 1 and not np.any(coeffs[-1]):
+        coeffs = coeffs[:-1]
+    d         = len(coeffs) - 1
+    if d == 0:
+        return np.array([], dtype=complex)
+    coeffs    = _equilibrate(coeffs)
+    n0, nd    = np.linalg.norm(coeffs[0]), np.linalg.norm(coeffs[-1])
+    sigma     = (n0 / nd) ** (1 / d) if n0 else 1.0
+    P, Q      = _companion([coeffs[k] * sigma ** k for k in range(d + 1)])
+    roots     = sigma * _finite_eigvals(P, Q)
+    # real roots: drop the round-off imaginary parts
+    roots.imag[np.abs(roots.imag) <= 1e-12 * np.abs(roots)] = 0
+    return roots
+
+def _equilibrate(coeffs, sweeps=3):
+    """
+    Row and column scaling (powers of two) of all coefficient matrices, such
+    that the largest entry in each row and each column is about one. The
+    determinant changes by a constant factor only.
+    """
+    r, c      = _scaling(coeffs, sweeps)
+    return [A * r[:, None] * c[None, :] for A in coeffs]
+
+def _scaling(coeffs, sweeps=3):
+    """
+    Row and column scale factors r, c (powers of two) of _equilibrate().
+    """
+    stack     = np.abs(np.array(coeffs))
+    r         = np.ones(stack.shape[1])
+    c         = np.ones(stack.shape[2])
+    for i in range(sweeps):
+        rmax  = np.max(stack * r[None, :, None] * c[None, None, :], axis=(0, 2))
+        r    /= np.exp2(np.round(np.log2(np.where(rmax > 0, rmax, 1))))
+        cmax  = np.max(stack * r[None, :, None] * c[None, None, :], axis=(0, 1))
+        c    /= np.exp2(np.round(np.log2(np.where(cmax > 0, cmax, 1))))
+    return r, c
+
+def mna_pz(coeffs, Iv=None, c=None):
+    """
+    Poles and zeros of the transfer c^T M(s)^-1 Iv(s) with the MNA matrix
+    M(s) = sum_k s^k coeffs[k] and Iv(s) = sum_k s^k Iv[k] (float arrays,
+    ascending powers of s) -> (poles, zeros, H) with H(s0) a function that
+    evaluates the transfer.
+
+    The zeros are the roots of the Rosenbrock (bordered) matrix
+    [[M(s), Iv(s)], [c^T, 0]], its determinant equals -c^T adj(M(s)) Iv(s).
+    Without Iv or c, only the poles are returned (zeros = None).
+    """
+    poles     = poly_roots(coeffs)
+    if Iv is None or c is None:
+        return poles, None, None
+    n         = coeffs[0].shape[0]
+    d         = max(len(coeffs), len(Iv))
+    zero      = np.zeros((n, n))
+    rosen     = []
+    for k in range(d):
+        A     = coeffs[k] if k < len(coeffs) else zero
+        b     = Iv[k] if k < len(Iv) else np.zeros(n)
+        row   = c if k == 0 else np.zeros(n)
+        rosen.append(np.block([[A, np.reshape(b, (n, 1))],
+                               [np.reshape(row, (1, n)), np.zeros((1, 1))]]))
+    zeros     = poly_roots(rosen)
+
+    def H(s0):
+        M0    = sum(s0 ** k * np.asarray(coeffs[k], dtype=complex) for k in range(len(coeffs)))
+        b0    = sum(s0 ** k * np.asarray(Iv[k], dtype=complex) for k in range(len(Iv)))
+        return np.dot(c, np.linalg.solve(M0, b0))
+
+    return poles, zeros, H
+
+def pz_dc_value(poles, zeros, H):
+    """
+    Zero-frequency value of a transfer with the given poles and zeros, of which
+    H(s0) evaluates the transfer at any point s0 -> float, 0 or sympy.oo.
+
+    Poles and zeros in the origin cancel; the gain factor follows from H at a
+    point away from the poles and zeros. Products are taken in the log domain
+    to avoid overflow with many poles or zeros.
+    """
+    roots     = np.concatenate((np.asarray(poles), np.asarray(zeros)))
+    scale     = np.max(np.abs(roots)) if roots.size else 1.0
+    scale     = scale if scale > 0 else 1.0
+    origin    = 1e-9 * scale
+    s0        = scale * (0.6180339887 + 1j)
+    H0        = H(s0)
+    if H0 == 0:
+        return sp.N(0)
+    p_origin  = np.abs(poles) < origin
+    z_origin  = np.abs(zeros) < origin
+    if np.sum(z_origin) > np.sum(p_origin):
+        return sp.N(0)
+    elif np.sum(z_origin) < np.sum(p_origin):
+        return sp.oo
+    # H(s) = K * s^m * prod(s - z) / (s^m * prod(s - p)) with m origin roots
+    p, z      = poles[~p_origin], zeros[~z_origin]
+    logK      = np.log(H0) + np.sum(np.log(s0 - poles)) - np.sum(np.log(s0 - zeros))
+    logDC     = logK + np.sum(np.log(-z)) - np.sum(np.log(-p))
+    return sp.N(np.real(np.exp(logDC)))
+
 # =====================================================================
 #  SLiCAP-facing instruction
 # =====================================================================
-def doStateSpace(result):
+def doStateSpace(result, numeric=False, tol=None):
     """
     State-space pole/zero/gain analysis from a doMatrix() result.
 
@@ -344,6 +777,12 @@ def doStateSpace(result):
         result.DCvalue = transfer gain        (TEMPORARY, see module note)
         result.stateSpace = (A, B, C, D, P_in, P_out)   (the realization)
 
+    With numeric=True the reduction is done in floating point (numeric_state())
+    and A, B, C, D, P_in and P_out are numpy arrays; the MNA matrix must then
+    be numeric (a 'numeric' instruction with all parameters defined), and tol
+    is the relative tolerance of the rank of C. DCvalue is then the
+    zero-frequency value of the transfer.
+
     Returns a copy of the passed result; the original is not modified.
     """
     from SLiCAP.SLiCAPexecute import _makeDetPos, _makeAllMatrices   # reuse; lazy = no cycle
@@ -354,6 +793,16 @@ def doStateSpace(result):
         out.gainType = 'gain'
     _makeAllMatrices(out)
     detP, detN         = _makeDetPos(out)                      # detector positions (differential-aware)
+    if numeric:
+        coeffs, Iv     = mna_coeffs(out.M, out.Iv)
+        ss             = numeric_state(coeffs, tol)
+        A, B, C, D     = state_transfer(ss, Iv, detP, detN)
+        gain, poles, zeros = transfer_gpz(A, B, C, D)
+        out.stateSpace = (A, B, C, D, ss[1], ss[2])
+        poles, zeros   = _cancelPZ(list(poles), list(zeros))
+        out.poles, out.zeros, out.DCvalue = poles, zeros, gain
+        out.dataType   = 'pz'
+        return out
     # Rationalize float entries before descriptor reduction so that SymPy's
     # rank/nullspace/columnspace use exact arithmetic (same pattern as det() in SLiCAPmath).
     ss                 = mna_to_state(float2rational(out.M))
@@ -886,8 +886,9 @@ def measure(data, expression, step=None, run=None, variables=None,
     assigned Python names are in scope - and *step* / *run* say WHICH
     condition, which is data selection rather than mathematics.
 
-    :param data: the result, or a :class:`dataset`.
-    :type data: SLiCAPtraces.dataset, SLiCAPinstruction.instruction
+    :param data: the result, or a :class:`dataset` - anything
+                 :func:`make_traces` accepts.
+    :type data: SLiCAPtraces.dataset, SLiCAPinstruction.instruction, list
 
     :param expression: one expression, or ``{name: expression}`` for several
                        values of the same result (an operating point).
@@ -1383,8 +1384,9 @@ def make_traces(data, specs=None, variables=None):
     :param data: the numeric arrays and their step provenance - a
                  :class:`dataset`, or an analysis result a registered
                  producer can convert (an NGspice op/dc/ac/tran/noise
-                 result).
-    :type data: SLiCAPtraces.dataset, SLiCAPinstruction.instruction
+                 result, or the analysis blocks of a raw file - also
+                 memory-mapped ones, ``RawFile.open()``).
+    :type data: SLiCAPtraces.dataset, SLiCAPinstruction.instruction, list
 
     :param specs: list of trace specifications; a plain string is shorthand
                   for ``{"y": name}``. Defaults to None: one spec per signal.
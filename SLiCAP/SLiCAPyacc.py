@@ -39,9 +39,11 @@ detectors and loop gain references
 
 import os
 import pickle
+import hashlib
 import sympy as sp
 import SLiCAP.SLiCAPconfigure as ini
-from copy import deepcopy
+from copy import copy, deepcopy
+from collections import OrderedDict
 from SLiCAP.SLiCAPhtml import htmlPage
 from SLiCAP.SLiCAPlex import _tokenize, _printError
 from SLiCAP.SLiCAPprotos import _MODELS, _DEVICES, circuit, element, modelDef
@@ -94,6 +96,22 @@ _USERPARAMS      = {}
 # In-memory cache for compiled user libraries (None = not yet loaded from disk)
 _USER_LIB_CACHE  = None
 
+# Expansion templates of prototype (sub)circuits, see _expansionTemplate();
+# at most _TEMPLATES_SIZE templates are cached and each template memoizes at
+# most _TEMPLATE_MEMO_SIZE substitution results, see _templateSubs().
+# Key: (id(prototype), signature), value: template
+_TEMPLATES          = OrderedDict()
+_TEMPLATES_SIZE     = 64
+_TEMPLATE_MEMO_SIZE = 256
+
+# Postfix of the placeholders of the parameters that are renamed during
+# expansion. Substitutions with placeholders are independent of the
+# reference designator of the instance and can be shared between instances.
+_PLACEHOLDER     = '_SLiCAPtemplate'
+
+# In-memory cache for flattened circuits (None = not yet loaded from disk)
+_CIRCUIT_CACHE   = None
+
 # Validity key of the system libraries compiled in this process (None until
 # they are compiled or loaded from the on-disk cache). See _libraryCacheKey().
 _SYSLIBS_KEY     = None
@@ -101,7 +119,7 @@ _SYSLIBS_KEY     = None
 def _initializeParser():
     global _CIRCUITNAMES, _CIRCUITS, _SLiCAPMODELS, _SLiCAPPARAMS
     global _SLiCAPCIRCUITS, _USERLIBS, _USERMODELS, _USERCIRCUITS, _USERPARAMS
-    global _USER_LIB_CACHE
+    global _USER_LIB_CACHE, _CIRCUIT_CACHE
 
     # The compiled system libraries only depend on the library files and a few
     # settings, all captured in the validity key. When they are unchanged
@@ -121,6 +139,7 @@ def _initializeParser():
     _USERCIRCUITS    = {}
     _USERPARAMS      = {}
     _USER_LIB_CACHE  = None
+    _CIRCUIT_CACHE   = None
     _makeLibraries()
 
 def _resetParser():
@@ -974,6 +993,78 @@ def _expandCircuit(circuitObject):
     return circuitObject
     
 def _doExpand(el, circuitObject):
+    """
+    Expands the subcircuit element 'el' in circuitObject, using the expansion
+    template of its prototype (see _expansionTemplate()).
+
+    The element and parameter definitions are the same as those obtained with
+    _doExpandDirect(), which is used if the template cannot be applied to this
+    instance.
+
+    :param el: Subcircuit element to be expanded
+    :type el: SLiCAPprotos.element
+
+    :param circuitObject: Circuit object that holds el
+    :type circuitObject: SLiCAPprotos.circuit
+
+    :return: circuitObject with el replaced by the elements of its prototype
+    :rtype: SLiCAPprotos.circuit
+    """
+    parentRefDes = el.refDes
+    parentNodes  = el.nodes
+    parentParams = el.params
+    template     = _expansionTemplate(el.model, parentParams)
+    renames      = {sp.Symbol(str(name) + _PLACEHOLDER):
+                    sp.Symbol(str(name) + '_' + parentRefDes)
+                    for name in template['renames']}
+    if any(name in template['keys'] for name in renames.values()):
+        # A renamed parameter is also a parameter of the prototype
+        return _doExpandDirect(el, circuitObject)
+    parDefs = _templateSubs(template, 'parDefs', parentParams, renames)
+    if parDefs is None:
+        return _doExpandDirect(el, circuitObject)
+    subElements = [_templateSubs(template, i, parentParams, renames)
+                   for i in range(len(template['elements']))]
+    if None in subElements:
+        return _doExpandDirect(el, circuitObject)
+    # Parameter definitions
+    parentParDefs = circuitObject.parDefs
+    for parName in template['parDefs']['globals']:
+        parentParDefs = _addParDefsParam(parName, parentParDefs)
+    for key, value in zip(template['parDefKeys'], parDefs):
+        parentParDefs[key.xreplace(renames)] = value
+    circuitObject.parDefs = parentParDefs
+    # Elements
+    for i, subElement in enumerate(template['elements']):
+        newElement        = copy(subElement['element'])
+        newElement.refDes = newElement.refDes + '_' + parentRefDes
+        newElement.refs   = [ref + '_' + parentRefDes for ref in newElement.refs]
+        newElement.nodes  = []
+        for node in subElement['nodes']:
+            if node == None:
+                newElement.nodes.append('0')
+            elif type(node) == int:
+                newElement.nodes.append(parentNodes[node])
+            else:
+                newElement.nodes.append(node + '_' + parentRefDes)
+        newElement.params = dict(zip(subElement['params'], subElements[i]))
+        for parName in subElement['globals']:
+            if parName not in circuitObject.parDefs:
+                if str(parName) in _USERPARAMS.keys():
+                    circuitObject.parDefs[parName] = _USERPARAMS[str(parName)]
+                else:
+                    circuitObject.parDefs[parName] = _SLiCAPPARAMS[str(parName)]
+        circuitObject.elements[newElement.refDes] = newElement
+        if isinstance(newElement.model, circuit):
+            circuitObject = _doExpand(newElement, circuitObject)
+    del circuitObject.elements[el.refDes]
+    return circuitObject
+
+def _doExpandDirect(el, circuitObject):
+    """
+    Expands the subcircuit element 'el' in circuitObject by copying and
+    updating the elements of its prototype one by one.
+    """
     parentRefDes    = el.refDes
     parentNodes     = el.nodes
     parentParams    = el.params
@@ -1000,10 +1091,219 @@ def _doExpand(el, circuitObject):
         circuitObject.elements[newElement.refDes] = newElement
         # If the new element is a sub circuit, it needs to be expanded
         if isinstance(newElement.model, circuit): 
-            circuitObject = _doExpand(newElement, circuitObject)
+            circuitObject = _doExpandDirect(newElement, circuitObject)
     del circuitObject.elements[el.refDes]
     return circuitObject
 
+def _expansionTemplate(prototype, parentParams):
+    """
+    Returns the expansion template of the prototype circuit for instances
+    with the parameters parentParams.
+
+    The template holds the elements of the prototype with their nodes as
+    parent node positions or internal node names, and the classification of
+    the parameters in element expressions and parameter definitions, as done
+    by _updateElementParams() and _updateParDefs():
+
+    - 'parents': parameters of the parent element
+    - 'protos' : parameters of the prototype (dict with default values)
+    - 'globals': parameters defined in a user or system library
+    - 'renames': parameters that receive the postfix _<parent refDes>
+
+    This classification only depends on the names of the parameters of the
+    parent element; templates are made once per prototype and set of names,
+    and they are reused as long as the library parameters they refer to are
+    unchanged. Substitution results are memoized in the template (see
+    _templateSubs()).
+
+    :param prototype: Prototype (sub)circuit
+    :type prototype: SLiCAPprotos.circuit
+
+    :param parentParams: Parameters of the parent element
+    :type parentParams: dict
+
+    :return: Expansion template
+    :rtype: dict
+    """
+    signature = (frozenset(parentParams.keys()), str(ini.laplace),
+                 str(ini.frequency))
+    key = (id(prototype), signature)
+    template = _TEMPLATES.get(key)
+    if template is not None and template['prototype'] is prototype \
+       and _sameSnapshot(template['snapshot'], _prototypeSnapshot(prototype)) \
+       and template['libParams'] == tuple(
+            (name in _USERPARAMS.keys(), name in _SLiCAPPARAMS.keys())
+            for name in template['libNames']):
+        _TEMPLATES.move_to_end(key)
+        return template
+    prototypeParams = prototype.params
+    libNames = []
+    # Parameter definitions, see _updateParDefs()
+    childParDefs = prototype.parDefs
+    allParams = [sp.Symbol(parName) for parName in childParDefs.keys()]
+    for parName in childParDefs.keys():
+        allParams += childParDefs[parName].atoms(sp.Symbol)
+    parDefs = {'parents': [], 'protos': {}, 'globals': [], 'renames': []}
+    for parName in allParams:
+        if parName != ini.laplace and parName != ini.frequency:
+            if str(parName) in parentParams.keys():
+                parDefs['parents'].append(parName)
+            elif str(parName) in prototypeParams.keys():
+                parDefs['protos'][parName] = prototypeParams[str(parName)]
+            else:
+                libNames.append(str(parName))
+                if str(parName) in _USERPARAMS.keys() or str(parName) in _SLiCAPPARAMS.keys():
+                    parDefs['globals'].append(parName)
+                else:
+                    parDefs['renames'].append(parName)
+    defNames = [parName for parName in childParDefs.keys()
+                if sp.Symbol(parName) != ini.laplace and
+                sp.Symbol(parName) != ini.frequency and
+                parName not in prototypeParams.keys()]
+    parDefs['exprs'] = [childParDefs[parName] for parName in defNames]
+    names = {parName: sp.Symbol(str(parName) + _PLACEHOLDER)
+             for parName in parDefs['renames']}
+    parDefKeys = [fullSubs(sp.Symbol(parName), names) for parName in defNames]
+    # Elements, see _updateNodes() and _updateElementParams()
+    elements = []
+    for subElement in prototype.elements.values():
+        record = {'element': subElement, 'params': list(subElement.params.keys()),
+                  'parents': [], 'protos': {}, 'globals': [], 'renames': []}
+        record['exprs'] = [subElement.params[parName] for parName in record['params']]
+        # Node position in the parent node list, internal node name, or None
+        # for the ground node
+        record['nodes'] = []
+        for node in subElement.nodes:
+            if node == '0':
+                record['nodes'].append(None)
+            elif node in prototype.nodes:
+                record['nodes'].append(prototype.nodes.index(node))
+            else:
+                record['nodes'].append(node)
+        params = []
+        for expr in record['exprs']:
+            params += list(expr.atoms(sp.Symbol))
+        for parName in dict.fromkeys(params):
+            if str(parName) in parentParams.keys():
+                record['parents'].append(parName)
+            elif str(parName) in prototypeParams.keys():
+                record['protos'][parName] = prototypeParams[str(parName)]
+            else:
+                libNames.append(str(parName))
+                if str(parName) in _USERPARAMS.keys() or str(parName) in _SLiCAPPARAMS.keys():
+                    record['globals'].append(parName)
+                elif parName != ini.laplace and parName != ini.frequency:
+                    record['renames'].append(parName)
+        elements.append(record)
+    renames = list(dict.fromkeys(parDefs['renames'] +
+                   [parName for record in elements for parName in record['renames']]))
+    keys = set(parDefs['parents']) | set(parDefs['protos']) | set(parDefs['renames'])
+    for record in elements:
+        keys |= set(record['parents']) | set(record['protos']) | set(record['renames'])
+    template = {'parDefs'   : parDefs,
+                'parDefKeys': parDefKeys,
+                'elements'  : elements,
+                'renames'   : renames,
+                'keys'      : keys,
+                'libNames'  : libNames,
+                'libParams' : tuple((name in _USERPARAMS.keys(),
+                                     name in _SLiCAPPARAMS.keys())
+                                    for name in libNames),
+                'prototype' : prototype,
+                'snapshot'  : _prototypeSnapshot(prototype),
+                'memo'      : OrderedDict()}
+    _TEMPLATES[key] = template
+    _TEMPLATES.move_to_end(key)
+    while len(_TEMPLATES) > _TEMPLATES_SIZE:
+        _TEMPLATES.popitem(last=False)
+    return template
+
+def _prototypeSnapshot(prototype):
+    """
+    Returns the nodes, parameters, parameter definitions and elements of a
+    prototype circuit. The snapshot holds the value objects themselves, so
+    that they stay alive as long as the template that refers to them.
+    """
+    return (tuple(prototype.nodes),
+            tuple(prototype.params.items()),
+            tuple(prototype.parDefs.items()),
+            tuple(prototype.elements.items()))
+
+def _sameSnapshot(snapshot, other):
+    """
+    Returns True if two prototype snapshots have the same nodes and the same
+    keys with identical value objects: a template is only valid for the
+    prototype from which it has been made.
+    """
+    if snapshot[0] != other[0]:
+        return False
+    for items, otherItems in zip(snapshot[1:], other[1:]):
+        if len(items) != len(otherItems) or any(
+                key != otherKey or value is not otherValue
+                for (key, value), (otherKey, otherValue) in zip(items, otherItems)):
+            return False
+    return True
+
+def _templateSubs(template, part, parentParams, renames):
+    """
+    Returns the substituted expressions of a part of an expansion template:
+    'parDefs' or the index of an element. Returns None if the template cannot
+    be applied to the parent parameters.
+
+    The substitution is done with fullSubs(), as in _updateParDefs() and
+    _updateElementParams(), but with placeholders for renamed parameters.
+    The results are memoized per part and values of the parent parameters,
+    and the placeholders are replaced with the renamed parameters of the
+    instance: 'renames'.
+
+    :param template: Expansion template, see _expansionTemplate()
+    :type template: dict
+
+    :param part: 'parDefs' or element index
+    :type part: str, int
+
+    :param parentParams: Parameters of the parent element
+    :type parentParams: dict
+
+    :param renames: Placeholders (keys) and renamed parameters (values)
+    :type renames: dict
+
+    :return: Substituted expressions
+    :rtype: list, NoneType
+    """
+    if part == 'parDefs':
+        record = template['parDefs']
+    else:
+        record = template['elements'][part]
+    values = tuple(parentParams[str(parName)] for parName in record['parents'])
+    memoKey = (part, values)
+    memo = template['memo']
+    results = memo.get(memoKey)
+    if results is not None:
+        memo.move_to_end(memoKey)
+    else:
+        substDict = dict(record['protos'])
+        substDict.update(zip(record['parents'], values))
+        # A placeholder must not be used in the prototype or the values
+        atoms = set(substDict.keys())
+        for value in list(substDict.values()) + record['exprs']:
+            if isinstance(value, sp.Basic):
+                atoms |= value.atoms(sp.Symbol)
+        placeholders = {parName: sp.Symbol(str(parName) + _PLACEHOLDER)
+                        for parName in record['renames']}
+        if any(name in atoms for name in placeholders.values()):
+            results = False
+        else:
+            substDict.update(placeholders)
+            results = [fullSubs(expr, substDict) for expr in record['exprs']]
+        memo[memoKey] = results
+        while len(memo) > _TEMPLATE_MEMO_SIZE:
+            memo.popitem(last=False)
+    if results is False:
+        return None
+    return [result.xreplace(renames) if isinstance(result, sp.Basic) else result
+            for result in results]
+
 def _updateNodes(newElement, parentNodes, prototypeNodes, parentRefDes):
     """
     Determines the nodes of a subcircuit element.
@@ -1280,14 +1580,14 @@ def _updateCirData(circuitObject):
     # Try to find required global parameter definitions for undefined params
     
     for par in circuitObject.params:
-        if par != ini.laplace and par != ini.frequency and par not in list(circuitObject.parDefs.keys()):
+        if par != ini.laplace and par != ini.frequency and par not in circuitObject.parDefs:
             circuitObject = _addGlobalParam(par, circuitObject)
             
     # Remove parameters with definitions from the undefined parameters list
     newParams=[]
     circuitObject.params = list(set(circuitObject.params))
     for par in circuitObject.params:
-        if par != ini.laplace and par != ini.frequency and par not in list(circuitObject.parDefs.keys()):
+        if par != ini.laplace and par != ini.frequency and par not in circuitObject.parDefs:
             newParams.append(par)
     circuitObject.params = newParams
             
@@ -1366,6 +1666,17 @@ def _checkCircuit(fileName):
     f = open(fileName, 'r')
     netlist = f.read()
     f.close()
+    # A flattened circuit of an unchanged netlist and unchanged libraries
+    # is loaded from the cache
+    cacheKey = _circuitCacheKey(netlist)
+    cir = _loadCircuitCache(fileName, cacheKey)
+    if cir is not None:
+        print("Loading circuit from cache:", fileName)
+        _CIRCUITS['main'] = cir
+        ini.html_prefix = ('-'.join(cir.title.split()) + '_')
+        ini.html_index = 'index.html'
+        htmlPage(cir.title, index = True)
+        return cir
     # Check the circuit
     # PASS 1
     _parseNetlist(netlist, 'main', 'main') # Tokenize and parse the netlist to a nested circuit object
@@ -1380,6 +1691,7 @@ def _checkCircuit(fileName):
             # PASS 4
             _CIRCUITS['main'] = _updateCirData(_CIRCUITS['main']) # Complete data for instructions
         if _CIRCUITS['main'].errors == 0:
+            _saveCircuitCache(fileName, cacheKey, _CIRCUITS['main'])
             ini.html_prefix = ('-'.join(_CIRCUITS['main'].title.split()) + '_')
             ini.html_index = 'index.html'
             htmlPage(_CIRCUITS['main'].title, index = True)
@@ -1479,4 +1791,72 @@ def _saveUserLibCache():
             pickle.dump(_USER_LIB_CACHE, f)
         os.replace(tmp, path)
     except Exception:
-        pass
\ No newline at end of file
+        pass
+
+# ── flattened circuit cache ───────────────────────────────────────────────────
+
+def _circuitCachePath():
+    return os.path.join(ini.cir_path, 'circuitcache.pkl')
+
+def _circuitCacheKey(netlist):
+    """Validity key of a flattened circuit, without the included libraries:
+    versions, the netlist text, the system libraries and the Laplace and
+    frequency symbols. The keys of the included user libraries are stored
+    with the entry and checked by _loadCircuitCache()."""
+    return (ini.install_version, sp.__version__,
+            hashlib.sha256(netlist.encode()).hexdigest(),
+            repr(sorted(_SYSLIBS_KEY.items())) if _SYSLIBS_KEY else None,
+            str(ini.laplace), str(ini.frequency))
+
+def _getCircuitCache():
+    """Return the in-memory cache, loading from disk on first call per session."""
+    global _CIRCUIT_CACHE
+    if _CIRCUIT_CACHE is None:
+        try:
+            with open(_circuitCachePath(), 'rb') as f:
+                data = pickle.load(f)
+            _CIRCUIT_CACHE = data if isinstance(data, dict) else {}
+        except Exception:
+            _CIRCUIT_CACHE = {}
+    return _CIRCUIT_CACHE
+
+def _loadCircuitCache(fileName, key):
+    """Returns a new copy of the cached flattened circuit of 'fileName', or
+    None when it is absent or stale: a different key, or an included
+    library that changed or no longer exists."""
+    global _USERLIBS
+    entry = _getCircuitCache().get(fileName)
+    if entry is None or entry.get('key') != key:
+        return None
+    try:
+        for libName, libKey in entry['libs']:
+            if _userLibFileKey(libName) != libKey:
+                return None
+        cir = pickle.loads(entry['circuit'])
+    except Exception:
+        return None
+    _USERLIBS = [libName for libName, libKey in entry['libs']]
+    return cir
+
+def _saveCircuitCache(fileName, key, cir):
+    """Stores the flattened circuit of 'fileName' with the keys of the
+    included libraries, and atomically writes the cache to disk. The circuit
+    is stored pickled: every hit returns a new object, so changes to a
+    returned circuit (e.g. with defPar()) do not affect the cache."""
+    try:
+        entry = {'key'    : key,
+                 'libs'   : [(libName, _userLibFileKey(libName))
+                             for libName in _USERLIBS],
+                 'circuit': pickle.dumps(cir)}
+    except Exception:
+        return
+    cache = _getCircuitCache()
+    cache[fileName] = entry
+    try:
+        path = _circuitCachePath()
+        tmp  = path + '.tmp.' + str(os.getpid())
+        with open(tmp, 'wb') as f:
+            pickle.dump(cache, f)
+        os.replace(tmp, path)
+    except Exception:
+        pass
@@ -2,6 +2,71 @@
 """
 Spyder Editor
 
+The modules for symbolic analysis, parameter stepping and HTML reports are
+imported with the package. Plotting, NGspice, KiCad and the functions taken
+from scipy, pytexit and IPython are imported on first use of one of their
+names (PEP 562 module __getattr__), so that scripts and worker processes
+that only calculate do not import matplotlib, svglib/reportlab or IPython.
 """
+import importlib as _importlib
 from .SLiCAP import *
 __version__ = "5.2.1"
+
+# Names imported on first use, per module. Module names without a list are
+# submodules of SLiCAP that are themselves imported on first use.
+_LAZY_MODULES = {
+    "SLiCAP.SLiCAPplots"       : ("Cadence2traces", "LTspiceAC2SLiCAPtraces",
+                                  "LTspiceData2Traces", "addTraces", "axis",
+                                  "csv2traces", "defaultsPlot",
+                                  "enable_ab_cursors", "enable_polar_cursor",
+                                  "enable_pz_cursor", "fig2traces", "figure",
+                                  "fit_text_to_axis", "makeFigure", "plot",
+                                  "plotPZ", "plotSweep", "plot_defaults",
+                                  "polar_readout", "pzAxis", "pz_readout",
+                                  "stepParams", "sweepAxis", "sweepData",
+                                  "traceAxis", "traces2fig", "plt",
+                                  "plotHelp", "get_backend", "randint"),
+    "SLiCAP.SLiCAPngspice"     : ("MOS", "MOSlookup", "ngspice2traces",
+                                  "selectTraces", "make_netlist", "op", "ac",
+                                  "dc", "tran", "noise", "ngspice_control",
+                                  "NGspiceRaw2dict", "RawFile", "Analysis",
+                                  "instr2dataset"),
+    "SLiCAP.SLiCAPkicad"       : ("backAnnotateSchematic", "KiCADsch2svg"),
+    "SLiCAP.SLiCAPlibngspice"  : (),
+    "SLiCAP.SLiCAPltspice"     : (),
+    "SLiCAP.SLiCAPgschem"      : (),
+    "SLiCAP.SLiCAPsvgTools"    : (),
+    "scipy.optimize"           : ("newton", "fsolve"),
+    "scipy.integrate"          : ("quad",),
+    "pytexit"                  : ("py2tex",),
+    "IPython.core.display"     : ("HTML",)}
+
+_LAZY_NAMES = {}
+for _module, _names in _LAZY_MODULES.items():
+    if _module.startswith("SLiCAP."):
+        _LAZY_NAMES[_module[len("SLiCAP."):]] = _module
+    for _name in _names:
+        _LAZY_NAMES[_name] = _module
+
+def __getattr__(name):
+    """
+    Imports the module of a name of _LAZY_NAMES on first use and returns the
+    object with this name.
+    """
+    try:
+        module = _LAZY_NAMES[name]
+    except KeyError:
+        raise AttributeError("module 'SLiCAP' has no attribute '{}'".format(name)) from None
+    if module == "SLiCAP." + name:
+        value = _importlib.import_module(module)
+    else:
+        value = getattr(_importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES))
+
+# 'from SLiCAP import *' includes the names that are imported on first use
+__all__ = sorted(set(name for name in globals() if not name.startswith("_"))
+                 | set(_LAZY_NAMES))
@@ -10,6 +10,25 @@
 // Output: the determinant on stdout (GiNaC default syntax, '^' powers);
 // timing JSON on stderr: {"dim":..,"method":..,"reduce":..,
 //                         "parse_s":..,"compute_s":..,"print_s":..}
+//
+// --batch: the input holds any number of matrices in the format above, one
+// after the other; the determinants are printed one per line, in order.
+//
+// --server (protocol 2): a long-lived co-process for SLiCAP's det(). It
+// reads framed requests from stdin until EOF or "@quit":
+//
+//     @det <count> <method> <reduce 0|1>
+//     <count matrices in the format above>
+//
+// and answers each request with
+//
+//     @ok <count>
+//     <count determinants, one per line>
+//
+// or with a single line "@err <message>", after which it keeps serving. If
+// the length of a malformed frame is unknown (bad header or dimension line),
+// its remaining lines are skipped up to the next line starting with '@'.
+// Every response is flushed, so the caller can block on it.
 
 #include <ginac/ginac.h>
 #include <ginac/version.h>
@@ -233,12 +252,146 @@ static ex slicap_det(matrix M, const std::string &method, bool reduce)
     throw std::runtime_error("Unknown method: " + method + " (use ME or BS)");
 }
 
+// --------------------------------------------------------------------------
+// input
+
+// Next non-blank line of 'in'; false at EOF.
+static bool next_line(std::istream &in, std::string &line)
+{
+    while (std::getline(in, line)) {
+        if (!line.empty() && line.back() == '\r')
+            line.pop_back();
+        if (line.find_first_not_of(" \t") != std::string::npos)
+            return true;
+    }
+    return false;
+}
+
+// Malformed input after which the number of remaining lines of the matrix
+// is unknown: in server mode the rest of the frame must be skipped.
+struct frame_error : std::runtime_error {
+    using std::runtime_error::runtime_error;
+};
+
+// 's' on one line: the framed protocol has one line per response.
+static std::string one_line(std::string s)
+{
+    for (char &c : s)
+        if (c == '\n' || c == '\r')
+            c = ' ';
+    return s;
+}
+
+// Reads one matrix: dimension line, then n*n entries. Returns false at a
+// clean EOF before the dimension line; throws on malformed input.
+static bool read_matrix(std::istream &in, parser &reader, matrix &M)
+{
+    std::string line;
+    if (!next_line(in, line))
+        return false;
+    unsigned n = 0;
+    try {
+        n = std::stoul(line);
+    } catch (std::exception &) {
+        throw frame_error("bad dimension line: " + line);
+    }
+    if (n == 0)
+        throw frame_error("no dimension line");
+    M = matrix(n, n);
+    std::string error;
+    // All n*n lines are read before a parse error is reported: in server
+    // mode the stream must stay on a matrix boundary.
+    for (unsigned count = 0; count < n * n; ++count) {
+        if (!next_line(in, line))
+            throw std::runtime_error("expected " + std::to_string(n * n) +
+                                     " entries, got " + std::to_string(count));
+        if (!error.empty())
+            continue;
+        try {
+            M(count / n, count % n) = reader(line);
+        } catch (std::exception &e) {
+            error = "parse error at entry " + std::to_string(count) + ": " +
+                    e.what() + ": " + line;
+        }
+    }
+    if (!error.empty())
+        throw std::runtime_error(error);
+    return true;
+}
+
+// One line per determinant: GiNaC never breaks its output, but a stray
+// newline would desynchronize the framed protocol.
+static std::string det_line(const ex &D)
+{
+    std::ostringstream out;
+    out << D;
+    return one_line(out.str());
+}
+
+// --server: framed request/response loop, see the header of this file.
+static int serve(parser &reader)
+{
+    std::string line;
+    // After a frame_error the rest of the frame is skipped up to the next
+    // request line; matrix entries never start with '@'.
+    bool resync = false;
+    while (next_line(std::cin, line)) {
+        if (resync && line[line.find_first_not_of(" \t")] != '@')
+            continue;
+        resync = false;
+        std::istringstream head(line);
+        std::string tag, method;
+        unsigned count = 0;
+        int reduce = 1;
+        head >> tag;
+        if (tag == "@quit")
+            return 0;
+        if (tag != "@det" || !(head >> count >> method >> reduce)) {
+            std::cout << "@err malformed request: " << one_line(line) << std::endl;
+            resync = true;
+            continue;
+        }
+        std::vector<std::string> results;
+        std::string error;
+        // The whole frame is always consumed, also after an error, so the
+        // next request starts on a frame boundary.
+        for (unsigned k = 0; k < count; ++k) {
+            matrix M;
+            try {
+                if (!read_matrix(std::cin, reader, M))
+                    return 1;
+                if (error.empty())
+                    results.push_back(det_line(slicap_det(M, method, reduce != 0)));
+            } catch (frame_error &e) {
+                if (error.empty())
+                    error = "matrix " + std::to_string(k) + ": " + e.what();
+                resync = true;
+                break;
+            } catch (std::exception &e) {
+                if (error.empty())
+                    error = "matrix " + std::to_string(k) + ": " + e.what();
+            }
+        }
+        if (!error.empty()) {
+            std::cout << "@err " << one_line(error) << std::endl;
+            continue;
+        }
+        std::cout << "@ok " << count << "\n";
+        for (const std::string &r : results)
+            std::cout << r << "\n";
+        std::cout.flush();
+    }
+    return 0;
+}
+
 // --------------------------------------------------------------------------
 
 int main(int argc, char *argv[])
 {
     std::string method = "ME";
     bool reduce = true;   // ini.reduce_matrix default
+    bool batch = false;
+    bool server = false;
     std::string infile;
 
     for (int a = 1; a < argc; ++a) {
@@ -247,21 +400,37 @@ int main(int argc, char *argv[])
             method = argv[++a];
         else if (arg == "--no-reduce")
             reduce = false;
+        else if (arg == "--batch")
+            batch = true;
+        else if (arg == "--server")
+            server = true;
         else if (arg == "--version") {
             // protocol number first: the Python side checks it
-            std::cout << "slicap_det protocol 1 (GiNaC "
+            std::cout << "slicap_det protocol 2 (GiNaC "
                       << GINACLIB_MAJOR_VERSION << "."
                       << GINACLIB_MINOR_VERSION << "."
                       << GINACLIB_MICRO_VERSION << ")\n";
             return 0;
         } else if (arg == "--help" || arg == "-h") {
-            std::cout << "usage: slicap_det [--method ME|BS] [--no-reduce] [file]\n"
-                         "input: line 1 = n, then n*n entries one per line ('^' powers)\n";
+            std::cout << "usage: slicap_det [--method ME|BS] [--no-reduce] [--batch] [file]\n"
+                         "       slicap_det --server\n"
+                         "input: line 1 = n, then n*n entries one per line ('^' powers)\n"
+                         "--batch: any number of such matrices, one determinant per output line\n"
+                         "--server: framed requests on stdin (see det_cli.cpp)\n";
             return 0;
         } else
             infile = arg;
     }
 
+    symtab table;
+    table["pi"] = Pi;
+    table["I"] = I;
+    table["E"] = exp(1);
+    parser reader(table);   // non-strict: unknown names become symbols
+
+    if (server)
+        return serve(reader);
+
     std::istream *in = &std::cin;
     std::ifstream f;
     if (!infile.empty()) {
@@ -280,49 +449,29 @@ int main(int argc, char *argv[])
 
     // ---- parse ----
     auto t0 = clock::now();
-    std::string line;
-    unsigned n = 0;
-    while (std::getline(*in, line)) {
-        if (line.find_first_not_of(" \t\r") == std::string::npos)
-            continue;
-        n = std::stoul(line);
-        break;
-    }
-    if (n == 0) {
-        std::cerr << "no dimension line" << std::endl;
-        return 1;
-    }
-
-    symtab table;
-    table["pi"] = Pi;
-    table["I"] = I;
-    table["E"] = exp(1);
-    parser reader(table);   // non-strict: unknown names become symbols
-
-    matrix M(n, n);
-    unsigned count = 0;
-    while (count < n * n && std::getline(*in, line)) {
-        if (line.find_first_not_of(" \t\r") == std::string::npos)
-            continue;
-        try {
-            M(count / n, count % n) = reader(line);
-        } catch (std::exception &e) {
-            std::cerr << "parse error at entry " << count << ": " << e.what()
-                      << "\n  " << line << std::endl;
-            return 1;
+    std::vector<matrix> matrices;
+    try {
+        matrix M;
+        while (read_matrix(*in, reader, M)) {
+            matrices.push_back(M);
+            if (!batch)
+                break;
         }
-        ++count;
+    } catch (std::exception &e) {
+        std::cerr << e.what() << std::endl;
+        return 1;
     }
-    if (count != n * n) {
-        std::cerr << "expected " << n * n << " entries, got " << count << std::endl;
+    if (matrices.empty()) {
+        std::cerr << "no dimension line" << std::endl;
         return 1;
     }
     auto t1 = clock::now();
 
     // ---- compute ----
-    ex D;
+    std::vector<ex> dets;
     try {
-        D = slicap_det(M, method, reduce);
+        for (const matrix &M : matrices)
+            dets.push_back(slicap_det(M, method, reduce));
     } catch (std::exception &e) {
         std::cerr << "compute error: " << e.what() << std::endl;
         return 1;
@@ -330,12 +479,13 @@ int main(int argc, char *argv[])
     auto t2 = clock::now();
 
     // ---- print ----
-    std::ostringstream out;
-    out << D;
-    std::cout << out.str() << std::endl;
+    for (const ex &D : dets)
+        std::cout << det_line(D) << "\n";
+    std::cout.flush();
     auto t3 = clock::now();
 
-    std::cerr << "{\"dim\": " << n
+    std::cerr << "{\"dim\": " << matrices.front().rows()
+              << ", \"count\": " << matrices.size()
               << ", \"method\": \"" << method << "\""
               << ", \"reduce\": " << (reduce ? "true" : "false")
               << ", \"parse_s\": " << secs(t0, t1)
@@ -20,6 +20,8 @@ Public API::
 """
 from __future__ import annotations
 
+import warnings
+
 import numpy as np
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -68,6 +70,94 @@ def _find_raw_marker(raw: bytes, marker: bytes, start: int):
         pos = i + len(marker)
 
 
+def _ascii_matrix(
+    data: bytes, n_pts: int, n_vars: int, is_complex: bool,
+) -> np.ndarray | None:
+    """Bulk parse of the Values: section *data* (bytes) of an ASCII block:
+    the (n_pts, n_vars) data matrix, or None when *data* is not the regular
+    layout and must be parsed line by line (:func:`_ascii_lines`).
+
+    Every point is its index followed by its n_vars values; a complex value
+    is ``real,imag``.  With the commas turned into white space, the section
+    is one sequence of numbers that ``np.fromstring`` converts in C at once,
+    whatever the line endings (LF or CRLF) and the line breaks within a
+    point."""
+    width = 1 + (2 if is_complex else 1) * n_vars
+    size  = n_pts * width
+    if is_complex:
+        data = data.replace(b",", b" ")
+    with warnings.catch_warnings():
+        # Text that is not a number ends the parse with a DeprecationWarning
+        # (a ValueError in later numpy versions); the size check rejects it
+        warnings.simplefilter("ignore", DeprecationWarning)
+        try:
+            values = np.fromstring(data.decode("latin-1"), dtype=np.float64,
+                                   sep=" ")
+        except ValueError:
+            return None
+    if values.size < size:
+        return None
+    values = values[:size].reshape(n_pts, width)
+    if not np.array_equal(values[:, 0], np.arange(n_pts)):
+        return None
+    if is_complex:
+        return values[:, 1::2] + 1j * values[:, 2::2]
+    return values[:, 1:]
+
+
+def _ascii_lines(
+    data: bytes, n_pts: int, n_vars: int, is_complex: bool,
+) -> np.ndarray:
+    """Line-by-line parse of a Values: block that :func:`_ascii_matrix`
+    does not accept (incomplete or irregular); missing values are 0."""
+    block  = data.decode("ascii", errors="replace")
+    dtype  = np.complex128 if is_complex else np.float64
+    matrix = np.zeros((n_pts, n_vars), dtype=dtype)
+    pt     = -1
+    col    = 0
+
+    for line in block.splitlines():
+        parts = line.split()
+        if not parts:
+            continue
+        # Check if a new data point is starting (line has an integer index
+        # as its first token, followed by a value)
+        try:
+            int(parts[0])
+            # New data point
+            pt  += 1
+            col  = 0
+            if pt >= n_pts:
+                break
+            val_str = parts[1] if len(parts) > 1 else ""
+        except ValueError:
+            # Continuation line: the only token is the value
+            val_str = parts[0] if parts else ""
+
+        if not val_str:
+            continue
+
+        try:
+            if is_complex:
+                # NGspice ASCII complex is "real,imag" (comma-separated), NOT
+                # Python's "real+imagj" — complex(val_str) raises here and the
+                # value would be silently dropped as 0.  This is the Windows
+                # bug: that build writes ASCII raws (Linux writes binary), so
+                # a stepped AC there parsed as all-zeros.
+                re_s, _, im_s = val_str.partition(",")
+                val = complex(float(re_s), float(im_s) if im_s else 0.0)
+            else:
+                val = float(val_str)
+        except ValueError:
+            continue
+
+        if pt >= 0 and col < n_vars:
+            matrix[pt, col] = val
+        col += 1
+
+    return matrix
+
+
 class RawFile:
     """Static-method parser for NGspice Nutmeg raw files."""
 
@@ -225,52 +315,10 @@ class RawFile:
         # Find the end of this block: next Title: header or EOF
         next_block = raw.find(b"Title:", data_start)
         end = next_block if next_block != -1 else len(raw)
-        block = raw[data_start:end].decode("ascii", errors="replace")
-
-        dtype  = np.complex128 if is_complex else np.float64
-        matrix = np.zeros((n_pts, n_vars), dtype=dtype)
-        pt     = -1
-        col    = 0
-
-        for line in block.splitlines():
-            parts = line.split()
-            if not parts:
-                continue
-            # Check if a new data point is starting (line has an integer index
-            # as its first token, followed by a value)
-            try:
-                int(parts[0])
-                # New data point
-                pt  += 1
-                col  = 0
-                if pt >= n_pts:
-                    break
-                val_str = parts[1] if len(parts) > 1 else ""
-            except ValueError:
-                # Continuation line: the only token is the value
-                val_str = parts[0] if parts else ""
-
-            if not val_str:
-                continue
-
-            try:
-                if is_complex:
-                    # NGspice ASCII complex is "real,imag" (comma-separated), NOT
-                    # Python's "real+imagj" — complex(val_str) raises here and the
-                    # value would be silently dropped as 0.  This is the Windows
-                    # bug: that build writes ASCII raws (Linux writes binary), so
-                    # a stepped AC there parsed as all-zeros.
-                    re_s, _, im_s = val_str.partition(",")
-                    val = complex(float(re_s), float(im_s) if im_s else 0.0)
-                else:
-                    val = float(val_str)
-            except ValueError:
-                continue
-
-            if pt >= 0 and col < n_vars:
-                matrix[pt, col] = val
-            col += 1
-
+        matrix = _ascii_matrix(raw[data_start:end], n_pts, n_vars, is_complex)
+        if matrix is None:
+            matrix = _ascii_lines(raw[data_start:end], n_pts, n_vars,
+                                  is_complex)
         return RawFile._build_analysis(plotname, var_info, matrix, n_vars), end
 
     @staticmethod
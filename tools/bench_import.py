@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Measure the time of `import SLiCAP` and guard its budget.
+
+    python tools/bench_import.py                # report, fail over budget
+    python tools/bench_import.py --budget 0.5   # other budget in seconds
+    python tools/bench_import.py --runs 10      # best of 10 fresh processes
+
+Each run imports SLiCAP in a fresh interpreter, so the numbers are what a
+script or a worker process pays. Plotting, NGspice, KiCad, IPython and the
+scipy functions are imported on first use (SLiCAP/__init__.py); the check
+fails when one of the modules in DEFERRED is imported with the package, or
+when the best time exceeds the budget.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that `import SLiCAP` must not import
+DEFERRED = ("matplotlib", "scipy.optimize", "scipy.integrate", "scipy.signal",
+            "scipy.linalg", "IPython", "svglib", "reportlab", "pytexit",
+            "requests", "SLiCAP.SLiCAPplots", "SLiCAP.SLiCAPngspice",
+            "SLiCAP.SLiCAPkicad")
+
+PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import SLiCAP
+t = time.perf_counter() - t
+print(json.dumps({"time": t, "modules": sorted(sys.modules)}))
+"""
+
+
+def _run() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (str(ROOT), env.get("PYTHONPATH", "")) if p)
+    out = subprocess.run([sys.executable, "-c", PROBE], env=env, check=True,
+                         capture_output=True, text=True).stdout
+    # SLiCAP may print while importing; the result is the last line
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="maximum import time in seconds (default: 1.0)")
+    parser.add_argument("--runs", type=int, default=5,
+                        help="number of fresh processes (default: 5)")
+    args = parser.parse_args()
+    results = [_run() for _ in range(max(1, args.runs))]
+    best = min(r["time"] for r in results)
+    loaded = [m for m in DEFERRED if m in results[0]["modules"]]
+    print("import SLiCAP: best {0:.3f} s of {1} runs (budget {2:.3f} s)".format(
+        best, len(results), args.budget))
+    status = 0
+    if loaded:
+        print("Imported with the package: " + ", ".join(loaded))
+        status = 1
+    if best > args.budget:
+        print("Over budget.")
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
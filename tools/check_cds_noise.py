@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Check that the CDS noise integration methods agree.
+
+    python tools/check_cds_noise.py             # report, fail out of tolerance
+    python tools/check_cds_noise.py --rtol 1e-6 # other relative tolerance
+
+The CDS weighted variance of a numeric noise spectrum is integrated with
+_doCDSint() for the methods 'scipy', 'lin' and 'log', and with the frequency
+grid of _doVarNoiseGrid(). All of them split the integral at the notches
+f = k/tau of the CDS weighting function; the check fails when one of them
+differs more than the tolerance from the 'scipy' result.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import sympy as sp
+
+from SLiCAP.SLiCAPmath import _doCDSint, _doVarNoiseGrid
+import SLiCAP.SLiCAPconfigure as ini
+
+# (fmin, fmax, tau): notch inside the range, fmin > 1/tau, tau not a
+# divisor of the range
+CASES = ((1e3, 1e5, 1e-4), (2e4, 1e5, 1e-4), (1e3, 1e5, 1.3e-5))
+
+
+def _spectrum():
+    f = ini.frequency
+    return 1e-16*(1 + 1e4/f)/(1 + (f/3e4)**2)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rtol", type=float, default=1e-5,
+                        help="relative tolerance (default: 1e-5)")
+    parser.add_argument("--points", type=int, default=2000,
+                        help="points per segment for lin/log (default: 2000)")
+    args = parser.parse_args()
+    spectrum = _spectrum()
+    status = 0
+    for fmin, fmax, tau in CASES:
+        ref = _doCDSint(spectrum, tau, fmin, fmax, "scipy")
+        results = {method: _doCDSint(spectrum, tau, fmin, fmax, method,
+                                     points=args.points)
+                   for method in ("lin", "log")}
+        results["grid"] = _doVarNoiseGrid({"V1": spectrum}, ["V1"], 1,
+                                          sp.Integer(1), "lin", fmin, fmax,
+                                          args.points, CDS=True, tau=tau)[0]
+        print("fmin={0:g} fmax={1:g} tau={2:g}: scipy {3:.6e}".format(
+            fmin, fmax, tau, ref))
+        for method, value in results.items():
+            value = complex(value)
+            error = abs(value - ref)/abs(ref)
+            print("    {0:5s} {1:.6e} (rel. error {2:.1e})".format(
+                method, value.real, error))
+            if value.imag != 0 or error > args.rtol:
+                status = 1
+    if status:
+        print("CDS integration methods do not agree.")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())